@@ -1,43 +1,70 @@
+import time
+_STARTUP_START = time.perf_counter()  # 启动计时起点，主窗口显示后输出各阶段耗时
+
 import os
 import sys
 import logging
 import json
-from jinja2 import Environment, FileSystemLoader
+import threading
+from collections import deque
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import QDesktopServices
-from PyQt5 import QtWidgets, QtCore, QtGui, QtWebEngineWidgets
+from PyQt5 import QtWidgets, QtCore, QtGui
 from static.UI.mkgui import Ui_Form
 from static.UI.AboutUi import AboutWindow
-from module.mk_to_json import parse_markdown_file_to_json
-from threading import Thread
+# 解析器（mk_to_json）、渲染缓存与 Jinja2 渲染引擎在首次使用时导入，
+# 主窗口显示后再在后台线程中预热，不占用启动时间
+from module.job_queue import JobCancelled, JobQueue
+from module.tracing import StageTracer, memory_tracing_enabled
+from module.log_queue import start_queue_logging, stop_queue_logging
 
 
-# 自定义日志处理器，用于将日志消息发送到 GUI
+# 自定义日志处理器：在日志监听线程中缓存消息，由界面定时器批量取出显示
 class LogHandler(logging.Handler):
-    def __init__(self, signal):
+    def __init__(self, max_buffered=5000):
         super().__init__()
-        self.signal = signal
+        self.buffer = deque(maxlen=max_buffered)  # 超出上限时丢弃最早的消息
+        self.dropped = 0
+        self.buffer_lock = threading.Lock()
 
     def emit(self, record):
         msg = self.format(record)
-        self.signal.emit(msg)  # 通过信号将日志发送到主线程
+        with self.buffer_lock:
+            if len(self.buffer) == self.buffer.maxlen:
+                self.dropped += 1
+            self.buffer.append(msg)
+
+    def take_all(self):
+        """取出缓存的全部消息及丢弃的条数"""
+        with self.buffer_lock:
+            messages = list(self.buffer)
+            self.buffer.clear()
+            dropped, self.dropped = self.dropped, 0
+        return messages, dropped
 
 
 
 class MyAppWindow(QWidget):
-    log_signal = pyqtSignal(str)  # 日志信号
     finished = pyqtSignal(str)  # 处理完成信号
+    job_succeeded = pyqtSignal(str)  # 生成成功信号，参数为输出 HTML 路径
+    preview_ready = pyqtSignal(int, str, str)  # 实时预览渲染完成：刷新序号，HTML，模板目录
 
     def __init__(self):
+        self._init_start = time.perf_counter()
         super().__init__()
         self.ui = Ui_Form()  # 创建 UI 对象
         self.ui.setupUi(self)  # 设置 UI
         self.setup_logging()  # 初始化日志系统
-        self.templates_file()  # 调用函数加载模板文件
         self.template_path = None
         self.input_path = None
         self.output_path = None
+        self.job_queue = JobQueue(max_workers=2, max_pending=8)  # 生成任务队列
+        self.pdf_exporter = None  # PDF 导出服务，首次导出时创建
+        self.render_cache = None  # 按内容寻址的渲染缓存，首次生成时创建
+        self._render_cache_lock = threading.Lock()
+        self.setup_live_preview()  # 初始化实时预览
+        self.templates_file()  # 调用函数加载模板文件
 
         # 添加外部qss样式文件
         self.load_style("static/style/ui.qss")
@@ -45,10 +72,46 @@ class MyAppWindow(QWidget):
         self.ui.Button_mk.clicked.connect(self.select_input_file)
         self.ui.comboBox_tem.currentIndexChanged.connect(self.on_combobox_changed)
         self.ui.Button_html.clicked.connect(self.process_files)
-        self.log_signal.connect(self.ui.log_text.append)
+        self.finished.connect(self.ui.log_text.append)
+        self.job_succeeded.connect(self._on_job_succeeded)
+        self.preview_ready.connect(self._on_preview_ready)
         self.ui.Button_op.clicked.connect(self.opne_file)
         self.ui.Button_see.clicked.connect(self.preview_html_file)
         self.ui.Button_dow.clicked.connect(self.print_html_to_pdf)
+        self._init_end = time.perf_counter()
+
+    def on_first_shown(self):
+        """主窗口显示后调用：输出启动耗时，并在后台预热解析器与模板引擎"""
+        now = time.perf_counter()
+        logging.info(f"主窗口已显示，启动耗时 {(now - _STARTUP_START) * 1000:.0f} ms"
+                     f"（导入 {(self._init_start - _STARTUP_START) * 1000:.0f} ms，"
+                     f"创建窗口 {(self._init_end - self._init_start) * 1000:.0f} ms）")
+        threading.Thread(target=self._warm_up, name="warm-up", daemon=True).start()
+
+    def _warm_up(self):
+        """在后台线程中导入解析器、Markdown、BeautifulSoup 与 Jinja2，并预先编译当前模板"""
+        start = time.perf_counter()
+        try:
+            import markdown  # noqa: F401  html 解析引擎使用
+            import bs4  # noqa: F401
+            from module.mk_to_json import get_config_template
+            from module.render_engine import get_render_engine
+
+            get_config_template()
+            self.get_render_cache()
+            if self.template_path:
+                get_render_engine().get_template(self.template_path)
+            logging.info(f"解析器与模板引擎预热完成，用时 {(time.perf_counter() - start) * 1000:.0f} ms")
+        except Exception as e:
+            logging.warning(f"预热失败，将在首次使用时加载：{e}")
+
+    def get_render_cache(self):
+        """渲染缓存（首次调用时创建，可在工作线程中调用）"""
+        with self._render_cache_lock:
+            if self.render_cache is None:
+                from module.render_cache import RenderCache
+                self.render_cache = RenderCache()
+            return self.render_cache
 
 
     # 加载外部qss样式文件
@@ -76,6 +139,7 @@ class MyAppWindow(QWidget):
             logging.info(f"文件选择成功：{file_path}")
             self.ui.mk_flie.setText(f"文件路径: {file_path}")
             self.input_path = file_path
+            self.watch_input_file()
         else:
             logging.info(f"用户取消了文件选择")
 
@@ -90,6 +154,7 @@ class MyAppWindow(QWidget):
 
         files = os.listdir(template_folder)  # 获取文件夹中的文件
         html_files = [file for file in files if file.endswith(".html")]  # 筛选 HTML 文件
+        self.ui.comboBox_tem.clear()  # 去掉界面文件中预置的空白选项
         self.ui.comboBox_tem.addItems(html_files)  # 将文件名添加到 QComboBox 中
 
         if html_files:  # 如果有模板文件
@@ -104,6 +169,7 @@ class MyAppWindow(QWidget):
             template_file = self.ui.comboBox_tem.currentText()
             logging.info(f"用户选择了模板：{template_file}")
             self.template_path = os.path.join("templates", template_file).replace(os.sep, "/")  # 使用完整路径
+            self.schedule_live_preview()
         except Exception as e:
             logging.error(f"在 on_combobox_changed 中发生错误：{e}")
 
@@ -126,44 +192,100 @@ class MyAppWindow(QWidget):
             save_path = f"{base_path} ({counter}){extension}"
             counter += 1
 
-        # 启动线程处理文件
-        thread = Thread(target=self._process, args=(self.input_path, self.template_path, save_path))
-        thread.start()
-        logging.info("开始处理文件")
-
-    def _process(self, input_path, template_path, save_path):
+        # 提交到任务队列；同一输入文件的旧任务会被取消
+        job = self.job_queue.submit(self.input_path, self._process, self.input_path, self.template_path, save_path,
+                                    on_done=self._on_job_done)
+        if job is None:
+            QMessageBox.warning(self, "错误", "任务过多，请稍后再试")
+            return
+        logging.info(f"开始处理文件（任务 {job.id}）")
+
+    def _on_job_done(self, job, result, error):
+        """任务完成回调（在工作线程中执行），通过 finished 信号通知主线程"""
+        if isinstance(error, JobCancelled):
+            logging.info(f"任务 {job.id} 已取消")
+        elif error is not None:
+            self.finished.emit(f"错误: {str(error)}")
+        else:
+            self.job_succeeded.emit(result)
+            self.finished.emit(f"生成完成: {result}")
+
+    def _on_job_succeeded(self, save_path):
+        """生成成功（在主线程中执行）：记录输出路径，供打开、预览与导出 PDF 使用"""
+        self.output_path = save_path
+
+    def _process(self, job, input_path, template_path, save_path):
+        # 记录每个阶段的耗时与内存峰值，结束时在日志面板输出一行摘要并写入指标文件
+        from module.mk_to_json import parse_markdown_file_to_json, save_json_to_file
+        from module.render_cache import make_cache_key
+
+        # 设置 MKRESUME_TRACE_MEMORY=1 时额外统计 tracemalloc 内存峰值（会拖慢生成）
+        tracer = StageTracer(f"任务 {job.id}", trace_memory=memory_tracing_enabled(), input=input_path,
+                             template=os.path.basename(template_path))
+        status = 'error'
+        render_cache = self.get_render_cache()
         try:
             # 解析 Markdown 文件
-            with open(input_path, 'r', encoding='utf-8') as file:
-                markdown_content = file.read()
-            resume_data = parse_markdown_file_to_json(markdown_content, save_to_file=True, output_file_name="output.json")
-
-            # 数据完整性验证
-            required_fields = ['name', 'job_intention', 'personal_info', 'education', 'skills', 'certificates']
-            for field in required_fields:
-                if field not in resume_data:
-                    raise ValueError(f"缺失必要字段: {field}")
-
-            logging.info("Markdown 文件解析完成，开始生成 HTML 内容")
-            # 生成 HTML 内容
-            html_content = self.generate_html(template_path, resume_data)
-
-            # 保存 HTML 文件
-            with open(save_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+            with tracer.stage("read"):
+                with open(input_path, 'r', encoding='utf-8') as file:
+                    markdown_content = file.read()
+            job.check_cancelled()
+
+            # Markdown、模板、CSS 与解析规则都没有变化时直接使用缓存结果
+            with tracer.stage("cache"):
+                cache_key = make_cache_key(markdown_content, template_path)
+                cached = render_cache.get(cache_key)
+            if cached is not None:
+                resume_data, html_content = cached
+                logging.info("输入未变化，使用渲染缓存")
+            else:
+                with tracer.stage("parse"):
+                    resume_data = parse_markdown_file_to_json(markdown_content)
+                job.check_cancelled()
+
+                # 数据完整性验证
+                with tracer.stage("validate"):
+                    required_fields = ['name', 'job_intention', 'personal_info', 'education', 'skills',
+                                       'certificates']
+                    for field in required_fields:
+                        if field not in resume_data:
+                            raise ValueError(f"缺失必要字段: {field}")
+
+                logging.info("Markdown 文件解析完成，开始生成 HTML 内容")
+                # 生成 HTML 内容
+                with tracer.stage("render"):
+                    html_content = self.generate_html(template_path, resume_data)
+                render_cache.put(cache_key, resume_data, html_content)
+            logging.info(f"渲染缓存命中率：{render_cache.hit_rate():.0%}"
+                         f"（{render_cache.hits}/{render_cache.hits + render_cache.misses}）")
+
+            # 保存 HTML 文件与解析结果（被取代的任务不再写出文件）；
+            # 解析结果保存在 HTML 旁边，同时执行的任务各自写入自己的文件
+            job.check_cancelled()
+            with tracer.stage("write"):
+                with open(save_path, 'w', encoding='utf-8') as f:
+                    f.write(html_content)
+                save_json_to_file(resume_data, os.path.splitext(save_path)[0] + ".json")
             logging.info(f"HTML 文件已保存至: {save_path}")
-            self.finished.emit(f"生成完成: {save_path}")
-            self.output_path = save_path
+            # 输出路径由主线程在 job_succeeded 信号的槽函数中记录
+            status = 'ok'
+            return save_path
+        except JobCancelled:
+            status = 'cancelled'
+            raise
         except Exception as e:
             logging.error(f"处理文件时出错: {e}", exc_info=True)
-            self.finished.emit(f"错误: {str(e)}")
+            raise
+        finally:
+            tracer.finish(status)
 
     # 渲染html
     def generate_html(self, template_path, data):
         try:
-            env = Environment(loader=FileSystemLoader(os.path.dirname(template_path)))
-            template = env.get_template(os.path.basename(template_path))
-            html_content = template.render(data)
+            from module.render_engine import render_template
+
+            # 使用共享的渲染引擎，已编译的模板会被复用
+            html_content = render_template(template_path, data)
             return html_content
         except Exception as e:
             logging.error(f"生成HTML时出错: {e}", exc_info=True)
@@ -195,41 +317,163 @@ class MyAppWindow(QWidget):
         else:
             QtWidgets.QMessageBox.warning(self, "警告", "请先选择一个 HTML 文件！")
 
-    def print_html_to_pdf(self):
-        """将 HTML 文件打印为 PDF 文件"""
-        from PyQt5.QtCore import QUrl
-        from PyQt5.QtWebEngineWidgets import QWebEngineView
-        pdf_path, _ = QFileDialog.getSaveFileName(self, "保存 PDF 文件", "", "PDF files (*.pdf)")
-        # 创建一个临时的 QWebEngineView
-        view = QWebEngineView()
-        view.setUrl(QUrl.fromLocalFile(self.output_path))  # 加载 HTML 文件
+    # 实时预览
+    def setup_live_preview(self):
+        """初始化实时预览：监视 Markdown 文件，变化后防抖重新渲染"""
+        self.live_preview_box = QCheckBox("实时预览", self)
+        self.live_preview_box.toggled.connect(self.toggle_live_preview)
+        self.ui.verticalLayout_2.addWidget(self.live_preview_box)
+
+        self.preview_watcher = QFileSystemWatcher(self)
+        self.preview_watcher.fileChanged.connect(self.on_input_file_changed)
+
+        # 编辑器保存时往往连续触发多次修改事件，合并为一次刷新；间隔很短，不影响更新的及时性
+        self.preview_timer = QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(40)
+        self.preview_timer.timeout.connect(self.refresh_live_preview)
+
+        # 解析与渲染在单独的工作线程中执行，新的刷新会取代尚未完成的旧刷新
+        self.preview_queue = JobQueue(max_workers=1, max_pending=2)
+        self._preview_generation = 0  # 最新一次刷新的序号，只显示最新一次刷新的结果
+        self._live_markdown = None  # 上次解析的 Markdown 内容（仅在预览线程中使用）
+        self._live_data = None  # 上次解析的结果（仅在预览线程中使用）
+        self.section_cache = None  # 按部分缓存解析结果，只重新解析修改过的部分；首次预览时创建
+
+    def toggle_live_preview(self, checked):
+        if checked:
+            logging.info("已开启实时预览")
+            self.watch_input_file()
+        else:
+            logging.info("已关闭实时预览")
+            self.preview_timer.stop()
+            self._preview_generation += 1  # 丢弃进行中的刷新结果
+            self.preview_queue.cancel_all()
+            files = self.preview_watcher.files()
+            if files:
+                self.preview_watcher.removePaths(files)
+
+    def watch_input_file(self):
+        """监视当前选择的 Markdown 文件，并立即刷新一次预览"""
+        if not self.live_preview_box.isChecked() or not self.input_path:
+            return
+        files = self.preview_watcher.files()
+        if files:
+            self.preview_watcher.removePaths(files)
+        self.preview_watcher.addPath(self.input_path)
+        self.schedule_live_preview()
+
+    def on_input_file_changed(self, path):
+        # 部分编辑器以“写临时文件再重命名”的方式保存，监视会失效，需要重新添加
+        if path not in self.preview_watcher.files() and os.path.exists(path):
+            self.preview_watcher.addPath(path)
+        self.schedule_live_preview()
+
+    def schedule_live_preview(self):
+        if self.live_preview_box.isChecked():
+            self.preview_timer.start()  # 重新计时，实现防抖
+
+    def refresh_live_preview(self):
+        """在预览线程中重新解析（仅在内容变化时）并渲染，完成后把 HTML 推送到预览界面，不写任何文件"""
+        if not self.input_path or not self.template_path:
+            return
+        self._preview_generation += 1
+        self.preview_queue.submit('preview', self._render_live_preview, self._preview_generation, self.input_path,
+                                  self.template_path)
 
-        def print_pdf():
-            """等待页面加载完成后打印为 PDF"""
-            view.page().pdfPrintingFinished.connect(lambda: logging.info("PDF 打印完成"))
-            view.page().printToPdf(pdf_path)
+    def _render_live_preview(self, job, generation, input_path, template_path):
+        """预览线程：解析与渲染，结果通过 preview_ready 信号交给主线程"""
+        from module.mk_to_json import SectionCache, parse_markdown_file_to_json
 
-        view.loadFinished.connect(print_pdf)  # 页面加载完成后触发打印操作
+        if self.section_cache is None:
+            self.section_cache = SectionCache()
+        try:
+            with open(input_path, 'r', encoding='utf-8') as file:
+                markdown_content = file.read()
+            if markdown_content != self._live_markdown or self._live_data is None:
+                self._live_data = parse_markdown_file_to_json(markdown_content, engine='tokens',
+                                                              section_cache=self.section_cache)
+                self._live_markdown = markdown_content
+            if not self._live_data:
+                return
+            job.check_cancelled()
+            html_content = self.generate_html(template_path, self._live_data)
+            job.check_cancelled()
+            self.preview_ready.emit(generation, html_content, os.path.dirname(os.path.abspath(template_path)))
+        except FileNotFoundError:
+            logging.warning(f"实时预览：文件不存在 {input_path}")
+        except JobCancelled:
+            raise
+        except Exception as e:
+            logging.error(f"实时预览失败：{e}")
+
+    def _on_preview_ready(self, generation, html_content, template_dir):
+        """主线程：只显示最新一次刷新的结果，之后又有修改时丢弃"""
+        if generation != self._preview_generation or not self.live_preview_box.isChecked():
+            return
+        # 以模板所在目录为基准地址，模板中的相对路径（CSS、图片）可以正常加载
+        self.ui.webview_2.setHtml(html_content, QUrl.fromLocalFile(template_dir + "/"))
+
+    def print_html_to_pdf(self):
+        """将生成的 HTML 文件打印为 PDF 文件"""
+        if not self.output_path or not os.path.isfile(self.output_path):
+            logging.warning("请先生成 HTML 文件")
+            return
+        default_path = os.path.splitext(self.output_path)[0] + ".pdf"
+        pdf_path, _ = QFileDialog.getSaveFileName(self, "保存 PDF 文件", default_path, "PDF files (*.pdf)")
+        if not pdf_path:
+            return
+        # 复用同一个离屏页面导出，导出任务依次排队
+        if self.pdf_exporter is None:
+            from module.pdf_export import PdfExporter
+            self.pdf_exporter = PdfExporter(pool_size=1, parent=self)
+        self.pdf_exporter.export_file(self.output_path, pdf_path)
+
+    def closeEvent(self, event):
+        # 关闭窗口时取消未完成的任务
+        self.job_queue.shutdown(wait=False)
+        self.preview_queue.shutdown(wait=False)
+        if self.pdf_exporter is not None:
+            self.pdf_exporter.close()
+        self.log_timer.stop()
+        stop_queue_logging(self.log_listener)
+        super().closeEvent(event)
 
     def setup_logging(self):
         log_format = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
         file_handler = logging.FileHandler("app.log", mode="a", encoding="utf-8")
         file_handler.setFormatter(log_format)
 
-        gui_handler = LogHandler(self.log_signal)
-        gui_handler.setFormatter(log_format)
+        self.gui_handler = LogHandler()
+        self.gui_handler.setFormatter(log_format)
+
+        # 记录经由队列交给后台线程写文件和缓存，工作线程不会被磁盘 I/O 或界面刷新阻塞
+        self.log_listener = start_queue_logging([file_handler, self.gui_handler], level=logging.INFO)
+
+        # 定时把缓存的日志批量追加到日志面板，面板只保留最近的记录
+        self.ui.log_text.document().setMaximumBlockCount(5000)
+        self.log_timer = QTimer(self)
+        self.log_timer.setInterval(100)
+        self.log_timer.timeout.connect(self.flush_log_buffer)
+        self.log_timer.start()
 
-        logger = logging.getLogger()
-        logger.setLevel(logging.DEBUG)
-        logger.addHandler(file_handler)
-        logger.addHandler(gui_handler)
+        logging.info("日志系统已启动！")
 
-        logger.info("日志系统已启动！")
+    def flush_log_buffer(self):
+        messages, dropped = self.gui_handler.take_all()
+        if dropped:
+            messages.insert(0, f"（日志过多，已省略 {dropped} 条，完整内容见 app.log）")
+        if messages:
+            self.ui.log_text.append("\n".join(messages))
 
 
 if __name__ == "__main__":
+    # 预览组件在首次使用时才导入 QtWebEngineWidgets，需要在创建 QApplication 之前开启 OpenGL 上下文共享
+    QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
     app = QApplication(sys.argv)
     main_window = MyAppWindow()  # 创建主窗口实例
+    main_window.show()  # 首先显示主窗口
     about_window = AboutWindow(main_window)  # 创建关于窗口实例
-    about_window.show()  # 首先显示关于窗口
+    about_window.show()  # 关于窗口显示在主窗口之上
+    QTimer.singleShot(0, main_window.on_first_shown)  # 事件循环开始后（窗口绘制完成）再预热
     sys.exit(app.exec_())
\ No newline at end of file
@@ -0,0 +1,400 @@
+"""
+批量生成简历（命令行）
+
+用法示例：
+
+    python -m module.batch 测试 -t 模板1.html -o output -w 4
+    python -m module.batch "resumes/**/*.md" -t templates/模板2.html -o output
+    python -m module.batch resumes --jsonl parsed.jsonl.gz
+    python -m module.batch 测试 -t 模板1.html -o output --cache
+    python -m module.batch 测试 -t 模板1.html -o output --inline
+    python -m module.batch resumes --store parsed.mkrs
+    python -m module.batch --from-store parsed.mkrs -t 模板2.html -o output
+
+在进程池中并行执行 Markdown 解析与 Jinja2 渲染，按输入顺序输出进度，
+最后打印吞吐量汇总（files/s、p50/p95 单文件耗时）。
+指定 ``--jsonl`` 时，每份简历解析完成后即追加一行 JSON 记录；
+只导出解析结果时可以不指定模板和输出目录。
+指定 ``--cache`` 时，Markdown、模板、CSS 与解析规则都没有变化的文件直接使用缓存结果。
+指定 ``--inline`` 时，CSS 与图片内联到 HTML 中，生成的文件可以单独移动或分发。
+指定 ``--store`` 时，解析结果同时写入二进制存储；之后用 ``--from-store`` 换模板重新生成，
+直接从存储中读取每份简历，跳过 Markdown 解析，此时输入参数是要生成的简历 ID 的通配符（可省略）。
+"""
+import argparse
+import fnmatch
+import glob
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from module.binary_store import BinaryStore, BinaryStoreWriter
+from module.inline_assets import inline_html
+from module.jsonl_export import JsonlWriter
+from module.mk_to_json import ENGINES, parse_markdown_file_to_json
+from module.render_cache import DEFAULT_CACHE_DIR, RenderCache, make_cache_key
+from module.render_engine import configure_render_engine, get_render_engine
+
+# 项目根目录下的模板文件夹
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+
+# 生成 HTML 前需要校验的字段
+REQUIRED_FIELDS = ['name', 'job_intention', 'personal_info', 'education', 'skills', 'certificates']
+
+# 工作进程内的渲染状态，由 _init_worker 初始化
+_worker_template_path = None
+_worker_engine = 'html'
+_worker_return_data = False
+_worker_cache = None
+_worker_inline = False
+_worker_store = None
+
+
+def collect_markdown_files(inputs):
+    """
+    展开输入的目录或通配符，得到去重且排序后的 Markdown 文件列表
+
+    :param inputs: 目录、文件路径或通配符列表
+    :return: Markdown 文件路径列表
+    """
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, names in os.walk(item):
+                files.extend(os.path.join(root, name) for name in names if name.endswith('.md'))
+        else:
+            files.extend(path for path in glob.glob(item, recursive=True)
+                         if path.endswith('.md') and os.path.isfile(path))
+    return sorted(set(files))
+
+
+def resolve_template(template):
+    """
+    解析模板参数：可以是 templates/ 下的文件名，也可以是模板文件路径
+
+    :param template: 模板文件名或路径
+    :return: 模板文件的绝对路径
+    """
+    candidates = [template, os.path.join(TEMPLATES_DIR, template)]
+    for candidate in candidates:
+        if os.path.isfile(candidate):
+            return os.path.abspath(candidate)
+    raise FileNotFoundError(f"模板文件不存在：{template}")
+
+
+def plan_outputs(md_files, output_dir):
+    """
+    为每个输入文件分配输出路径，同名文件自动追加序号
+
+    :param md_files: Markdown 文件路径列表
+    :param output_dir: 输出目录
+    :return: 输出 HTML 路径列表，与输入一一对应
+    """
+    used = set()
+    outputs = []
+    for md_path in md_files:
+        stem = os.path.splitext(os.path.basename(md_path))[0]
+        name = f"{stem}.html"
+        counter = 1
+        while name in used:
+            name = f"{stem} ({counter}).html"
+            counter += 1
+        used.add(name)
+        outputs.append(os.path.join(output_dir, name))
+    return outputs
+
+
+def _init_worker(template_path, engine, log_level, bytecode_cache_dir=None, return_data=False, cache_dir=None,
+                 cache_bytes=None, inline=False, source_store=None):
+    """工作进程初始化：预先编译模板，之后的任务直接复用渲染引擎中的缓存"""
+    global _worker_template_path, _worker_engine, _worker_return_data, _worker_cache, _worker_inline, _worker_store
+    logging.basicConfig(level=log_level, format='%(asctime)s - %(levelname)s - %(message)s')
+    if bytecode_cache_dir:
+        configure_render_engine(bytecode_cache_dir=bytecode_cache_dir)
+    if template_path is not None:
+        get_render_engine().get_template(template_path)
+    _worker_template_path = template_path
+    _worker_engine = engine
+    _worker_return_data = return_data
+    _worker_cache = RenderCache(cache_dir, cache_bytes) if cache_dir and template_path is not None else None
+    _worker_inline = inline
+    if _worker_store is not None:
+        _worker_store.close()
+    # 每个进程各自映射存储文件，页缓存由操作系统共享
+    _worker_store = BinaryStore(source_store) if source_store else None
+
+
+def _write_if_changed(save_path, html_content):
+    """内容与已有文件相同时跳过写入"""
+    encoded = html_content.encode('utf-8')
+    try:
+        if os.path.getsize(save_path) == len(encoded):
+            with open(save_path, 'rb') as f:
+                if f.read() == encoded:
+                    return
+    except OSError:
+        pass
+    with open(save_path, 'wb') as f:
+        f.write(encoded)
+
+
+def _convert(task):
+    """
+    转换单个文件：读取 Markdown、解析、校验、渲染并写出 HTML
+
+    :param task: (Markdown 路径, 输出路径)，输出路径为 None 时只解析不渲染
+    :return: (Markdown 路径, 输出路径, 耗时秒数, 错误信息或 None, 解析结果或 None, 是否命中缓存)
+    """
+    md_path, save_path = task
+    start = time.perf_counter()
+    resume_data = None
+    hit = False
+    try:
+        with open(md_path, 'r', encoding='utf-8') as file:
+            markdown_content = file.read()
+        cached = key = None
+        if _worker_cache is not None:
+            key = make_cache_key(markdown_content, _worker_template_path, _worker_engine)
+            cached = _worker_cache.get(key)
+        if cached is not None:
+            hit = True
+            resume_data, html_content = cached
+        else:
+            resume_data = parse_markdown_file_to_json(markdown_content, engine=_worker_engine)
+            if not resume_data:
+                raise ValueError("解析失败")
+            for field in REQUIRED_FIELDS:
+                if field not in resume_data:
+                    raise ValueError(f"缺失必要字段: {field}")
+            if save_path is not None:
+                html_content = get_render_engine().render(_worker_template_path, resume_data)
+            if key is not None:
+                _worker_cache.put(key, resume_data, html_content)
+        if save_path is not None:
+            if _worker_inline:
+                # 缓存中保存的是未内联的 HTML，内联结果由资源缓存复用
+                html_content = inline_html(html_content, os.path.dirname(_worker_template_path))
+            _write_if_changed(save_path, html_content)
+        error = None
+    except Exception as e:
+        error = str(e)
+    # 只有需要导出时才把解析结果传回主进程，避免无谓的序列化
+    data = resume_data if _worker_return_data and error is None else None
+    return md_path, save_path, time.perf_counter() - start, error, data, hit
+
+
+def _render_stored(task):
+    """
+    从二进制存储中读取解析结果并渲染，不读取也不解析 Markdown
+
+    :param task: (简历 ID, 输出路径)
+    :return: 与 _convert 相同
+    """
+    resume_id, save_path = task
+    start = time.perf_counter()
+    resume_data = None
+    try:
+        resume_data = _worker_store.get(resume_id)
+        if resume_data is None:
+            raise KeyError(f"存储中没有该简历：{resume_id}")
+        if save_path is not None:
+            html_content = get_render_engine().render(_worker_template_path, resume_data)
+            if _worker_inline:
+                html_content = inline_html(html_content, os.path.dirname(_worker_template_path))
+            _write_if_changed(save_path, html_content)
+        error = None
+    except Exception as e:
+        error = str(e)
+    data = resume_data if _worker_return_data and error is None else None
+    return resume_id, save_path, time.perf_counter() - start, error, data, False
+
+
+def select_stored_ids(store_path, patterns=None):
+    """
+    列出存储中的简历 ID
+
+    :param store_path: 二进制存储文件路径
+    :param patterns: 通配符列表，为空时返回全部 ID
+    :return: 按写入顺序排列的简历 ID 列表
+    """
+    with BinaryStore(store_path) as store:
+        ids = store.ids()
+    if patterns:
+        ids = [resume_id for resume_id in ids if any(fnmatch.fnmatchcase(resume_id, pattern) for pattern in patterns)]
+    return ids
+
+
+def percentile(values, percent):
+    """
+    计算百分位数（最近秩法）
+
+    :param values: 已排序的数值列表
+    :param percent: 百分位，0~100
+    :return: 对应的百分位数值
+    """
+    if not values:
+        return 0.0
+    rank = max(1, -(-len(values) * percent // 100))
+    return values[int(rank) - 1]
+
+
+def run_batch(md_files, template_path, output_dir, workers=None, engine='html', log_level=logging.WARNING,
+              bytecode_cache_dir=None, jsonl_path=None, cache_dir=None, cache_bytes=256 * 1024 * 1024,
+              inline=False, store_path=None, source_store=None, out=sys.stdout):
+    """
+    批量转换 Markdown 简历为 HTML
+
+    :param md_files: Markdown 文件路径列表；指定 source_store 时为存储中的简历 ID 列表
+    :param template_path: 模板文件路径，为 None 时只解析不渲染
+    :param output_dir: 输出目录，为 None 时只解析不渲染
+    :param workers: 工作进程数，默认为 CPU 核数；1 表示在当前进程中执行
+    :param engine: 解析引擎
+    :param log_level: 工作进程的日志级别
+    :param bytecode_cache_dir: Jinja2 字节码缓存目录，为 None 时不启用
+    :param jsonl_path: JSON Lines 导出路径（支持 .gz 与 ``-``），为 None 时不导出
+    :param cache_dir: 渲染缓存目录，为 None 时不使用缓存（只解析不渲染时也不使用）
+    :param cache_bytes: 渲染缓存的磁盘空间上限
+    :param inline: 是否把 CSS 与图片内联到 HTML 中，生成自包含的单个文件
+    :param store_path: 解析结果的二进制存储输出路径，为 None 时不写入
+    :param source_store: 从该二进制存储读取解析结果，跳过 Markdown 解析；为 None 时解析 md_files
+    :param out: 进度与汇总的输出流
+    :return: 汇总信息字典
+    """
+    if template_path is not None and output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+        save_paths = plan_outputs(md_files, output_dir)
+    else:
+        template_path = None
+        save_paths = [None] * len(md_files)
+    tasks = list(zip(md_files, save_paths))
+    total = len(tasks)
+    workers = workers or os.cpu_count() or 1
+
+    latencies = []
+    failed = 0
+    cache_hits = 0
+    # 导出到标准输出时，进度信息改写到标准错误，避免混入记录
+    if jsonl_path == '-' and out is sys.stdout:
+        out = sys.stderr
+    writer = JsonlWriter(jsonl_path) if jsonl_path else None
+    store_writer = BinaryStoreWriter(store_path) if store_path else None
+    convert = _render_stored if source_store else _convert
+    start = time.perf_counter()
+    initargs = (template_path, engine, log_level, bytecode_cache_dir, writer is not None or store_writer is not None,
+                cache_dir, cache_bytes, inline, source_store)
+    if workers <= 1:
+        _init_worker(*initargs)
+        results = map(convert, tasks)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs)
+        # map 按提交顺序返回结果，进度输出与输入顺序一致
+        results = executor.map(convert, tasks, chunksize=max(1, total // (workers * 8)))
+    try:
+        for index, (md_path, save_path, elapsed, error, data, hit) in enumerate(results, 1):
+            latencies.append(elapsed)
+            cache_hits += hit
+            if error:
+                failed += 1
+                print(f"[{index}/{total}] 失败 {md_path}: {error}", file=out)
+                continue
+            if writer is not None:
+                writer.write({'source': md_path, 'resume': data})
+            if store_writer is not None:
+                store_writer.add(md_path, data)
+            target = save_path or jsonl_path or store_path
+            note = "，缓存" if hit else ""
+            print(f"[{index}/{total}] {md_path} -> {target} ({elapsed * 1000:.1f} ms{note})", file=out)
+        if writer is not None:
+            writer.close()
+        if store_writer is not None:
+            store_writer.close()
+    finally:
+        if writer is not None:
+            writer.abort()  # 已经关闭时不做任何事
+        if store_writer is not None:
+            store_writer.abort()
+        if executor is not None:
+            executor.shutdown()
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    summary = {
+        'files': total,
+        'failed': failed,
+        'workers': workers,
+        'seconds': wall,
+        'files_per_second': total / wall if wall > 0 else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'cache_hits': cache_hits,
+    }
+    print(f"完成 {total - failed}/{total} 个文件，用时 {wall:.2f} s，"
+          f"{summary['files_per_second']:.1f} files/s，"
+          f"p50 {summary['p50_ms']:.1f} ms，p95 {summary['p95_ms']:.1f} ms（{workers} 个进程）", file=out)
+    if cache_dir and template_path is not None:
+        rate = cache_hits / total if total else 0.0
+        print(f"渲染缓存命中 {cache_hits}/{total}（{rate:.0%}）", file=out)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量将 Markdown 简历转换为 HTML")
+    parser.add_argument('inputs', nargs='*',
+                        help="Markdown 文件所在目录、文件路径或通配符；使用 --from-store 时为简历 ID 的通配符")
+    parser.add_argument('-t', '--template', default=None, help="templates/ 下的模板文件名或模板路径")
+    parser.add_argument('-o', '--output', default=None, help="HTML 输出目录")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="工作进程数，默认为 CPU 核数")
+    parser.add_argument('--engine', choices=ENGINES, default='html', help="Markdown 解析引擎")
+    parser.add_argument('--bytecode-cache', default=None, help="Jinja2 模板字节码缓存目录，跨进程、跨运行复用编译结果")
+    parser.add_argument('--jsonl', default=None,
+                        help="将解析结果逐条写入 JSON Lines 文件，.gz 结尾时压缩，- 表示标准输出")
+    parser.add_argument('--cache', nargs='?', const=DEFAULT_CACHE_DIR, default=None,
+                        help=f"启用渲染缓存，未变化的文件跳过解析与渲染；可指定缓存目录，默认 {DEFAULT_CACHE_DIR}")
+    parser.add_argument('--cache-size', type=int, default=256, help="渲染缓存的磁盘空间上限（MB）")
+    parser.add_argument('--store', default=None, help="将解析结果写入二进制存储文件，供 --from-store 重新生成")
+    parser.add_argument('--from-store', default=None,
+                        help="从二进制存储读取解析结果，跳过 Markdown 解析，只用新模板重新渲染")
+    parser.add_argument('--inline', action='store_true', help="将 CSS 与图片内联到 HTML 中，生成可单独分发的文件")
+    parser.add_argument('-v', '--verbose', action='store_true', help="输出解析过程日志")
+    args = parser.parse_args(argv)
+    if not (args.jsonl or args.store) and not (args.template and args.output):
+        parser.error("需要同时指定 -t 与 -o，或者指定 --jsonl、--store 只导出解析结果")
+    if args.from_store and (args.store or args.cache):
+        parser.error("--from-store 不能与 --store、--cache 同时使用")
+    if not args.from_store and not args.inputs:
+        parser.error("需要指定 Markdown 文件所在目录、文件路径或通配符")
+    if bool(args.template) != bool(args.output):
+        parser.error("-t 与 -o 需要同时指定")
+
+    log_level = logging.INFO if args.verbose else logging.WARNING
+    logging.basicConfig(level=log_level, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    template_path = None
+    if args.template:
+        try:
+            template_path = resolve_template(args.template)
+        except FileNotFoundError as e:
+            parser.error(str(e))
+    if args.from_store:
+        try:
+            md_files = select_stored_ids(args.from_store, args.inputs)
+        except (OSError, ValueError) as e:
+            parser.error(f"无法读取二进制存储：{e}")
+        if not md_files:
+            parser.error("存储中没有匹配的简历")
+    else:
+        md_files = collect_markdown_files(args.inputs)
+        if not md_files:
+            parser.error("没有找到 Markdown 文件")
+
+    summary = run_batch(md_files, template_path, args.output, workers=args.workers,
+                        engine=args.engine, log_level=log_level, bytecode_cache_dir=args.bytecode_cache,
+                        jsonl_path=args.jsonl, cache_dir=args.cache, cache_bytes=args.cache_size * 1024 * 1024,
+                        inline=args.inline, store_path=args.store, source_store=args.from_store)
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
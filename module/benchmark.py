@@ -0,0 +1,566 @@
+"""
+解析器基准测试
+
+生成指定规模的合成简历（遵循 ``# 姓名`` / ``# 工作经历`` / ``## 工作1`` 等约定），
+分阶段统计 parse_markdown_to_json 的耗时，并将结果保存为 JSON，便于在版本之间比较：
+
+    python -m module.benchmark --sizes 10 100 1000 10000 -o benchmark.json
+    python -m module.benchmark --sizes 1000 --engine html tokens --repeat 5
+    python -m module.benchmark --sizes 1000 10000 --memory
+    python -m module.benchmark --sizes 10 --stress --threads 16
+    python -m module.benchmark --sizes 10 --equivalence 1500
+    python -m module.benchmark --sizes 10 --models 10000
+    python -m module.benchmark --sizes 10 --asset-check
+"""
+import argparse
+import base64
+import io
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from module.mk_to_json import (ENGINES, ResumeParser, SectionCache, build_section_index,
+                               build_section_index_from_markdown, find_section, new_config_data,
+                               parse_markdown_file_to_json, parse_markdown_incremental, parse_markdown_stream,
+                               parse_markdown_to_json)
+from module.models import Resume
+
+# 合成数据使用的素材
+_COMPANIES = ['腾讯科技', '百度研究院', '阿里巴巴', '字节跳动', '华为技术', '京东集团', '美团', '网易']
+_POSITIONS = ['算法工程师', '后端开发工程师', '前端开发工程师', '研究助理', '数据分析师', '测试工程师']
+_PROJECTS = ['智能简历生成系统', '在线教育平台', '推荐系统重构', '日志分析平台', '移动端商城', '实时风控引擎']
+_TECH = ['Python', 'TensorFlow', 'React.js', 'Vue.js', 'Redis', 'MySQL', 'Go', 'Kubernetes', 'WebSocket实时通信']
+_ACHIEVEMENTS = [
+    '开发基于深度学习的用户行为分析系统，提升点击率15%',
+    '使用Python/TensorFlow构建推荐模型，日均处理100万级数据',
+    '重构用户中心页面，首屏加载速度提升40%',
+    '实现课程直播实时弹幕功能',
+    '参与自然语言处理论文撰写，详见 [https://example.com/paper](https://example.com/paper)',
+]
+
+
+def generate_resume(work_entries=10, project_entries=None, seed=0):
+    """
+    生成合成简历
+
+    :param work_entries: 工作经历条数
+    :param project_entries: 项目经历条数，默认与工作经历相同
+    :param seed: 随机种子，相同参数生成的内容相同
+    :return: Markdown 格式的简历内容
+    """
+    if project_entries is None:
+        project_entries = work_entries
+    rng = random.Random(seed)
+    lines = [
+        '# 姓名', '', '张三', '',
+        '# 求职意向', '', '算法工程师', '',
+        '# 个人信息', '',
+        '- 性别：男', '- 民族：汉族', '- 年龄：28', '- 联系方式：138-0013-8000',
+        '- 邮箱：zhangsan@email.com', '- Github：https://github.com/zhangsan', '',
+        '# 教育背景', '',
+        '- 学校：上海大学', '- 专业：通信工程', '- 学位：学士学位', '- 开始时间：2017.09',
+        '- 结束时间：2021.06', '- GPA：3.8/4.0', '- 主修课程：数据结构、机器学习、操作系统', '',
+        '# 工作经历', '',
+    ]
+    for i in range(1, work_entries + 1):
+        year = 2000 + i % 24
+        lines += [
+            f'## 工作{i}', '',
+            f'- 公司名称：{rng.choice(_COMPANIES)}',
+            f'- 职务：{rng.choice(_POSITIONS)}',
+            f'- 开始时间：{year}.{rng.randint(1, 6):02d}',
+            f'- 结束时间：{year}.{rng.randint(7, 12):02d}',
+            '- 描述：',
+        ]
+        lines += [f'    - {item}' for item in rng.sample(_ACHIEVEMENTS, 2)]
+        lines.append('')
+    lines += ['# 项目经历', '']
+    for i in range(1, project_entries + 1):
+        lines += [
+            f'## 项目{i}', '',
+            f'- 项目名称：{rng.choice(_PROJECTS)} | 团队项目',
+            f'- 角色：{rng.choice(_POSITIONS)}',
+            '- 技术栈：',
+        ]
+        lines += [f'    - {item}' for item in rng.sample(_TECH, 3)]
+        lines.append('- 成果：')
+        lines += [f'    - {item}' for item in rng.sample(_ACHIEVEMENTS, 2)]
+        lines.append('')
+    lines += [
+        '# 技能', '',
+        '- 编程语言：Python（熟练）、Java（中级）、Go（了解）', '- 工具：PS，Word，PPT，Excel',
+        '- 框架：Django、Flask', '- 数据库：MySQL、Redis', '- 软件：PyCharm', '- 语言：英语四六级', '',
+        '# 证书', '',
+        '- 证书名称：AWS Certified Solutions Architect', '- 颁发机构：Amazon', '- 获得日期：2024.10', '',
+        '# 自我评价', '',
+        '- 职业目标：成为一名优秀的软件工程师',
+        '- 优势：', '  1.熟练掌握Python和Java编程语言', '  2.具备良好的团队合作能力和沟通能力',
+        '- 描述：', '  5年算法研发经验，主导过3个百万级用户项目', '  擅长数据建模与机器学习算法优化', '',
+    ]
+    return '\n'.join(lines)
+
+
+def _time_call(func, *args):
+    """执行一次函数调用，返回 (结果, 耗时秒数)"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def measure_once(md_content, engine='html'):
+    """
+    分阶段执行一次完整解析
+
+    html 引擎的阶段为 markdown（Markdown -> HTML）、soup（建立 BeautifulSoup 文档）、
+    index（建立标题索引）；tokens 引擎只有 index 阶段。之后是每个部分的解析（parse_<键名>），
+    最后的 total 为直接调用 parse_markdown_to_json 的耗时。
+
+    :param md_content: Markdown 格式的简历内容
+    :param engine: 解析引擎
+    :return: {阶段名: 耗时秒数}
+    """
+    timings = {}
+    if engine == 'html':
+        import markdown
+        from bs4 import BeautifulSoup
+
+        html, timings['markdown'] = _time_call(markdown.markdown, md_content)
+        soup, timings['soup'] = _time_call(BeautifulSoup, html, 'html.parser')
+        sections, timings['index'] = _time_call(build_section_index, soup)
+    elif engine == 'tokens':
+        sections, timings['index'] = _time_call(build_section_index_from_markdown, md_content)
+    else:
+        raise ValueError(f"未知的解析引擎：{engine}，可选值：{', '.join(ENGINES)}")
+
+    data = new_config_data()
+    for header_text, blocks in sections.items():
+        spec = find_section(header_text)
+        if spec is not None and f'parse_{spec.key}' not in timings:
+            _, timings[f'parse_{spec.key}'] = _time_call(spec.parse, blocks, data)
+
+    _, timings['total'] = _time_call(parse_markdown_to_json, md_content, new_config_data(), engine)
+    return timings
+
+
+def benchmark_document(md_content, engine='html', repeat=3):
+    """
+    重复测量同一文档，统计每个阶段的最小值与中位数
+
+    :param md_content: Markdown 格式的简历内容
+    :param engine: 解析引擎
+    :param repeat: 重复次数
+    :return: {阶段名: {'min_ms': ..., 'median_ms': ...}}
+    """
+    runs = [measure_once(md_content, engine) for _ in range(max(1, repeat))]
+    stages = {}
+    for stage in runs[0]:
+        values = [run[stage] * 1000 for run in runs]
+        stages[stage] = {'min_ms': round(min(values), 4), 'median_ms': round(statistics.median(values), 4)}
+    return stages
+
+
+def _read_and_parse(md_path, engine):
+    with open(md_path, 'r', encoding='utf-8') as f:
+        return parse_markdown_file_to_json(f.read(), engine=engine)
+
+
+def _stream_parse(md_path, engine):
+    with open(md_path, 'r', encoding='utf-8') as f:
+        return parse_markdown_stream(f, engine=engine)
+
+
+# 内存测量的解析方式：整体读入后解析，或逐个部分流式解析
+MEMORY_MODES = {
+    'html': lambda path: _read_and_parse(path, 'html'),
+    'tokens': lambda path: _read_and_parse(path, 'tokens'),
+    'stream': lambda path: _stream_parse(path, 'tokens'),
+}
+
+
+def measure_peak_memory(md_content):
+    """
+    把文档写入临时文件，分别统计每种解析方式从读文件到得到结果的内存峰值
+
+    :param md_content: Markdown 格式的简历内容
+    :return: {解析方式: 峰值 KB}
+    """
+    fd, md_path = tempfile.mkstemp(suffix='.md')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(md_content)
+        peaks = {}
+        for mode, parse in MEMORY_MODES.items():
+            tracemalloc.start()
+            try:
+                parse(md_path)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            peaks[mode] = round(peak / 1024, 1)
+        return peaks
+    finally:
+        os.remove(md_path)
+
+
+def _container_ids(value, ids):
+    """收集结果中所有 dict/list 对象的 id"""
+    if isinstance(value, dict):
+        ids.append(id(value))
+        for item in value.values():
+            _container_ids(item, ids)
+    elif isinstance(value, list):
+        ids.append(id(value))
+        for item in value:
+            _container_ids(item, ids)
+    return ids
+
+
+def stress_parser(threads=8, rounds=20, engines=ENGINES, seed=0, out=sys.stdout):
+    """
+    多线程压力测试：同一个 ResumeParser 实例在多个线程中并发解析，结果必须与串行解析完全相同
+
+    不同规模的合成简历打乱顺序后交给线程池反复解析，期间调小线程切换间隔以增加交错；
+    另外检查所有并发结果之间没有共享的 dict/list 对象。
+
+    :param threads: 线程数
+    :param rounds: 每份文档的解析次数
+    :param engines: 解析引擎列表
+    :param seed: 合成数据与打乱顺序的随机种子
+    :param out: 进度输出流
+    :return: {解析引擎: {'parses': ..., 'mismatches': ..., 'shared_objects': ..., 'seconds': ...}}
+    """
+    documents = [generate_resume(size, seed=seed + i) for i, size in enumerate((0, 1, 3, 10, 30, 100))]
+    order = [index for _ in range(rounds) for index in range(len(documents))]
+    random.Random(seed).shuffle(order)
+    report = {}
+    for engine in engines:
+        parser = ResumeParser(engine=engine)
+        expected = [json.dumps(parser.parse(md), ensure_ascii=False, sort_keys=True) for md in documents]
+
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                results = list(executor.map(lambda index: parser.parse(documents[index]), order))
+        finally:
+            sys.setswitchinterval(switch_interval)
+        seconds = time.perf_counter() - start
+
+        mismatches = sum(json.dumps(result, ensure_ascii=False, sort_keys=True) != expected[index]
+                         for index, result in zip(order, results))
+        ids = []
+        for result in results:
+            _container_ids(result, ids)
+        report[engine] = {
+            'threads': threads,
+            'parses': len(results),
+            'mismatches': mismatches,
+            'shared_objects': len(ids) - len(set(ids)),
+            'seconds': round(seconds, 3),
+        }
+        print(f"并发解析 {engine:<6} {len(results)} 次（{threads} 个线程），"
+              f"结果不一致 {mismatches} 次，共享对象 {report[engine]['shared_objects']} 个，用时 {seconds:.2f} s",
+              file=out)
+    return report
+
+
+def mutate_resume(md_content, rng):
+    """
+    对合成简历做随机变形，覆盖按部分切分时容易出错的写法：
+
+    - 去掉一级标题前的空行，使标题紧贴上方的列表、嵌套列表或段落；
+    - 嵌套列表前插入空行（松散列表），或在列表后追加紧贴的段落；
+    - 一级标题改为 Setext 写法（下一行为 ===）；
+    - 空行改为只含空格的行；
+    - 复制某个部分，产生同名标题；
+    - 改用 CRLF 换行。
+
+    :param md_content: Markdown 格式的简历内容
+    :param rng: random.Random 实例
+    :return: 变形后的 Markdown 内容
+    """
+    lines = []
+    for line in md_content.split('\n'):
+        if line.startswith('# ') and lines:
+            roll = rng.random()
+            if roll < 0.3:
+                while lines and not lines[-1].strip():
+                    lines.pop()
+            elif roll < 0.4:
+                lines += [line[2:], '===']
+                continue
+        elif line.startswith('    - ') and lines and not lines[-1].startswith('    ') and rng.random() < 0.3:
+            lines.append('')
+        elif not line.strip():
+            roll = rng.random()
+            if roll < 0.1:
+                line = '  '
+            elif roll < 0.15 and lines and lines[-1].startswith('- '):
+                lines.append('补充说明')
+        lines.append(line)
+    text = '\n'.join(lines)
+    if rng.random() < 0.2:
+        starts = [i for i, line in enumerate(lines) if line.startswith('# ')]
+        if starts:
+            start = rng.choice(starts)
+            end = next((i for i in starts if i > start), len(lines))
+            text += '\n\n' + '\n'.join(lines[start:end])
+    if rng.random() < 0.1:
+        text = text.replace('\n', '\r\n')
+    return text
+
+
+def _parse_incremental(md_content, engine, cache):
+    return parse_markdown_incremental(md_content, cache=cache, engine=engine)
+
+
+def _parse_stream(md_content, engine, cache):
+    return parse_markdown_stream(io.StringIO(md_content), engine=engine)
+
+
+# 与整体解析比较的解析方式：{名称: 函数(Markdown 内容, 解析引擎, 部分缓存)}
+EQUIVALENCE_MODES = {
+    'incremental': _parse_incremental,
+    'stream': _parse_stream,
+}
+
+
+def check_equivalence(count=500, engines=ENGINES, seed=0, out=sys.stdout):
+    """
+    生成变形的合成简历，检查各种按部分解析的方式与 parse_markdown_to_json 的结果完全相同
+
+    同一引擎的所有文档共用一个部分缓存，相同的部分会命中缓存，缓存路径也一并被检查。
+
+    :param count: 文档数量
+    :param engines: 解析引擎列表
+    :param seed: 随机种子
+    :param out: 进度输出流
+    :return: {解析引擎: {解析方式: {'documents': ..., 'mismatches': ..., 'first_mismatch': ...}}}
+    """
+    rng = random.Random(seed)
+    documents = [mutate_resume(generate_resume(rng.randint(0, 4), seed=seed + i), rng) for i in range(count)]
+    report = {}
+    for engine in engines:
+        report[engine] = {}
+        for mode, parse in EQUIVALENCE_MODES.items():
+            cache = SectionCache()
+            mismatches = []
+            for i, md_content in enumerate(documents):
+                if parse(md_content, engine, cache) != parse_markdown_to_json(md_content, new_config_data(), engine):
+                    mismatches.append(i)
+            report[engine][mode] = {
+                'documents': count,
+                'mismatches': len(mismatches),
+                'first_mismatch': mismatches[0] if mismatches else None,
+            }
+            print(f"等价性 {engine:<6} {mode:<12} {count} 份文档，与整体解析不一致 {len(mismatches)} 份", file=out)
+    return report
+
+
+def _retained_memory(build):
+    """
+    统计 build() 返回的对象在调用结束后仍占用的内存
+
+    :param build: 无参数函数
+    :return: (返回值, 占用的 KB)
+    """
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        result = build()
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, round((after - before) / 1024, 1)
+
+
+def compare_models(count=10000, engine='tokens', seed=0, out=sys.stdout):
+    """
+    比较大量简历常驻内存时，嵌套字典与 models.Resume 的内存占用和转换耗时
+
+    合成简历的工作经历与项目经历条数在 0 到 5 之间随机分布。每份文档只解析一次，
+    两种表示都从解析结果的 JSON 文本重新构建（字符串不与解析结果共享），只统计构建完成后仍然占用的内存；
+    同时检查每份简历 Resume.from_dict(data).to_dict() 与原字典逐键一致（包括键的顺序）。
+
+    :param count: 简历数量
+    :param engine: 解析引擎
+    :param seed: 合成数据的随机种子
+    :param out: 进度输出流
+    :return: 可直接保存为 JSON 的结果字典
+    """
+    rng = random.Random(seed)
+    parser = ResumeParser(engine=engine)
+    documents = [json.dumps(parser.parse(generate_resume(rng.randint(0, 5), seed=seed + i)), ensure_ascii=False)
+                 for i in range(min(count, 200))]
+    order = [rng.randrange(len(documents)) for _ in range(count)]
+    Resume.from_dict(json.loads(documents[0]))  # 预热，避免把配置默认值的缓存计入内存占用
+
+    dicts, dict_kb = _retained_memory(lambda: [json.loads(documents[index]) for index in order])
+    models, model_kb = _retained_memory(lambda: [Resume.from_dict(json.loads(documents[index]))
+                                                 for index in order])
+    del models
+
+    start = time.perf_counter()
+    converted = [Resume.from_dict(data) for data in dicts]
+    from_dict_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    restored = [model.to_dict() for model in converted]
+    to_dict_seconds = time.perf_counter() - start
+    mismatches = sum(json.dumps(data, ensure_ascii=False) != json.dumps(restored_data, ensure_ascii=False)
+                     for data, restored_data in zip(dicts, restored))
+
+    report = {
+        'count': count,
+        'engine': engine,
+        'dict_kb': dict_kb,
+        'model_kb': model_kb,
+        'ratio': round(model_kb / dict_kb, 3) if dict_kb else None,
+        'from_dict_us': round(from_dict_seconds / count * 1e6, 2),
+        'to_dict_us': round(to_dict_seconds / count * 1e6, 2),
+        'mismatches': mismatches,
+    }
+    print(f"{count} 份简历常驻内存：dict {dict_kb / 1024:.1f} MB，Resume {model_kb / 1024:.1f} MB"
+          f"（{report['ratio']:.0%}）；from_dict {report['from_dict_us']:.1f} us/份，"
+          f"to_dict {report['to_dict_us']:.1f} us/份，往返不一致 {mismatches} 份", file=out)
+    return report
+
+
+def check_asset_confinement(out=sys.stdout):
+    """
+    检查渲染服务内联资源时不会读取允许目录之外的本地文件
+
+    在临时目录中创建一个文件，通过照片字段以绝对路径、file: 地址、相对路径（..）等形式引用，
+    调用服务的渲染函数（inline=1，/pdf 同样使用）后检查输出中不包含该文件的内容，也不再保留指向它的地址；
+    同时检查模板自身的样式表与默认照片仍然被内联。
+
+    :param out: 进度输出流
+    :return: 可直接保存为 JSON 的结果字典
+    """
+    from module.server import _render
+    from module.batch import TEMPLATES_DIR
+
+    template_path = os.path.join(TEMPLATES_DIR, '模板1.html')
+    with tempfile.TemporaryDirectory(prefix='asset-check-') as temp_dir:
+        secret_path = os.path.join(temp_dir, 'secret.png')
+        secret = b'asset-check secret content'
+        with open(secret_path, 'wb') as f:
+            f.write(secret)
+        relative = os.path.relpath(secret_path, TEMPLATES_DIR).replace(os.sep, '/')
+        references = [secret_path, 'file://' + secret_path.replace(os.sep, '/'), relative,
+                      relative.replace('..', '%2e%2e'), '/etc/passwd']
+        leaks = []
+        for reference in references:
+            md_content = f"# 姓名\n\nX\n\n# 个人信息\n\n- 政治面貌：{reference}\n"
+            _, html_content = _render(md_content, template_path, 'tokens', True)
+            if base64.b64encode(secret).decode('ascii') in html_content or reference in html_content:
+                leaks.append(reference)
+        _, html_content = _render("# 姓名\n\nX\n", template_path, 'tokens', True)
+        assets_inlined = '<style>' in html_content and 'src="data:image/' in html_content
+
+    print(f"资源内联：{len(references)} 个越界地址，泄露 {len(leaks)} 个；模板资源"
+          f"{'已' if assets_inlined else '未'}内联", file=out)
+    return {'references': len(references), 'leaks': leaks, 'assets_inlined': assets_inlined}
+
+
+def run_benchmark(sizes, engines=('html',), repeat=3, seed=0, memory=False, out=sys.stdout):
+    """
+    对每个规模、每个解析引擎执行基准测试
+
+    :param sizes: 工作经历与项目经历的条数列表
+    :param engines: 解析引擎列表
+    :param repeat: 每个文档的重复次数
+    :param seed: 合成数据的随机种子
+    :param memory: 是否额外统计各解析方式的内存峰值（tracemalloc 会明显拖慢解析）
+    :param out: 进度输出流
+    :return: 可直接保存为 JSON 的结果字典
+    """
+    results = []
+    memory_results = []
+    for size in sizes:
+        md_content = generate_resume(size, seed=seed)
+        for engine in engines:
+            stages = benchmark_document(md_content, engine, repeat)
+            results.append({
+                'entries': size,
+                'engine': engine,
+                'bytes': len(md_content.encode('utf-8')),
+                'stages': stages,
+            })
+            print(f"{size:>6} 条 {engine:<6} total {stages['total']['median_ms']:.2f} ms", file=out)
+        if memory:
+            peaks = measure_peak_memory(md_content)
+            memory_results.append({
+                'entries': size,
+                'bytes': len(md_content.encode('utf-8')),
+                'peak_memory_kb': peaks,
+            })
+            print(f"{size:>6} 条 内存峰值 " + "，".join(f"{mode} {kb / 1024:.1f} MB" for mode, kb in peaks.items()),
+                  file=out)
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'seed': seed,
+        'results': results,
+    }
+    if memory:
+        report['memory'] = memory_results
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Markdown 简历解析器基准测试")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000],
+                        help="工作经历与项目经历的条数，可指定多个规模")
+    parser.add_argument('--engine', nargs='+', choices=ENGINES, default=['html'], help="解析引擎")
+    parser.add_argument('--repeat', type=int, default=3, help="每个文档的重复次数")
+    parser.add_argument('--seed', type=int, default=0, help="合成数据的随机种子")
+    parser.add_argument('--memory', action='store_true', help="统计整体解析与流式解析的内存峰值")
+    parser.add_argument('--stress', action='store_true', help="多线程并发解析，检查结果与串行解析一致")
+    parser.add_argument('--threads', type=int, default=8, help="并发解析的线程数")
+    parser.add_argument('--rounds', type=int, default=20, help="并发解析时每份文档的解析次数")
+    parser.add_argument('--equivalence', type=int, default=0, metavar='N',
+                        help="生成 N 份变形的简历，检查增量解析、流式解析与整体解析的结果一致")
+    parser.add_argument('--models', type=int, default=0, metavar='N',
+                        help="比较 N 份简历以 dict 与 models.Resume 常驻内存时的占用")
+    parser.add_argument('--asset-check', action='store_true',
+                        help="检查渲染服务内联资源时不会读取模板与 static 目录之外的文件")
+    parser.add_argument('-o', '--output', default='benchmark.json', help="结果 JSON 文件路径")
+    args = parser.parse_args(argv)
+
+    # 解析过程中的 info 日志会显著影响计时
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    report = run_benchmark(args.sizes, args.engine, args.repeat, args.seed, args.memory)
+    failed = False
+    if args.stress:
+        report['stress'] = stress_parser(args.threads, args.rounds, args.engine, args.seed)
+        failed = any(item['mismatches'] or item['shared_objects'] for item in report['stress'].values())
+    if args.equivalence:
+        report['equivalence'] = check_equivalence(args.equivalence, args.engine, args.seed)
+        failed = failed or any(item['mismatches'] for modes in report['equivalence'].values()
+                               for item in modes.values())
+    if args.models:
+        report['models'] = compare_models(args.models, args.engine[0], args.seed)
+        failed = failed or report['models']['mismatches'] > 0
+    if args.asset_check:
+        report['asset_check'] = check_asset_confinement()
+        failed = failed or bool(report['asset_check']['leaks']) or not report['asset_check']['assets_inlined']
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存至：{args.output}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,453 @@
+"""
+解析结果的二进制存储
+
+大量简历换模板重新生成时，逐份读取 JSON 需要每次完整解码；这里把解析结果保存为单个二进制文件：
+
+- 每份简历编码为 MessagePack 格式（安装了 msgpack 时使用其 C 实现，否则使用内置的纯 Python 实现，两者格式相同），
+  前面带 4 字节长度；
+- 文件末尾是按 ID 查找的偏移索引，打开时只读取文件头与索引；
+- 文件通过 mmap 映射，按 ID 读取时只解码这一份简历，多个进程打开同一文件时共享页缓存。
+
+文件结构（整数均为小端序）：
+
+    文件头   MAGIC(8) 版本(u16) 保留(u16) 记录数(u32) 索引偏移(u64) 索引长度(u64)
+    记录     长度(u32) MessagePack 数据 ...
+    索引     ID 长度(u16) ID(UTF-8) 记录偏移(u64) 记录长度(u32) ...
+
+用法：
+
+    with BinaryStoreWriter("parsed.mkrs") as writer:
+        writer.add("测试/resume.md", resume_data)
+
+    with BinaryStore("parsed.mkrs") as store:
+        resume_data = store.get("测试/resume.md")
+
+命令行查看存储内容：
+
+    python -m module.binary_store parsed.mkrs               # 列出全部 ID
+    python -m module.binary_store parsed.mkrs 测试/resume.md  # 输出指定简历的 JSON
+"""
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+
+try:
+    import msgpack
+except ImportError:  # msgpack 是可选依赖，没有安装时使用下面的纯 Python 实现
+    msgpack = None
+
+MAGIC = b'MKRSTORE'
+VERSION = 1
+
+_HEADER = struct.Struct('<8sHHIQQ')
+_LENGTH = struct.Struct('<I')
+_INDEX_ID = struct.Struct('<H')
+_INDEX_ENTRY = struct.Struct('<QI')
+
+_UINT8 = struct.Struct('>B')
+_UINT16 = struct.Struct('>H')
+_UINT32 = struct.Struct('>I')
+_UINT64 = struct.Struct('>Q')
+_INT8 = struct.Struct('>b')
+_INT16 = struct.Struct('>h')
+_INT32 = struct.Struct('>i')
+_INT64 = struct.Struct('>q')
+_FLOAT32 = struct.Struct('>f')
+_FLOAT64 = struct.Struct('>d')
+
+
+class StoreError(ValueError):
+    """文件不是有效的二进制存储，或内容已损坏"""
+
+
+def _pack_into(value, parts):
+    """按 MessagePack 格式编码，结果追加到 parts"""
+    if value is None:
+        parts.append(b'\xc0')
+    elif value is True:
+        parts.append(b'\xc3')
+    elif value is False:
+        parts.append(b'\xc2')
+    elif isinstance(value, str):
+        encoded = value.encode('utf-8')
+        size = len(encoded)
+        if size < 32:
+            parts.append(bytes((0xa0 | size,)))
+        elif size < 0x100:
+            parts.append(b'\xd9' + _UINT8.pack(size))
+        elif size < 0x10000:
+            parts.append(b'\xda' + _UINT16.pack(size))
+        else:
+            parts.append(b'\xdb' + _UINT32.pack(size))
+        parts.append(encoded)
+    elif isinstance(value, int):
+        if 0 <= value < 0x80:
+            parts.append(bytes((value,)))
+        elif -32 <= value < 0:
+            parts.append(bytes((value & 0xff,)))
+        elif 0 <= value < 0x10000:
+            parts.append(b'\xcc' + _UINT8.pack(value) if value < 0x100 else b'\xcd' + _UINT16.pack(value))
+        elif 0 <= value < 0x100000000:
+            parts.append(b'\xce' + _UINT32.pack(value))
+        elif 0 <= value < 0x10000000000000000:
+            parts.append(b'\xcf' + _UINT64.pack(value))
+        elif -0x80 <= value < 0:
+            parts.append(b'\xd0' + _INT8.pack(value))
+        elif -0x8000 <= value < 0:
+            parts.append(b'\xd1' + _INT16.pack(value))
+        elif -0x80000000 <= value < 0:
+            parts.append(b'\xd2' + _INT32.pack(value))
+        elif -0x8000000000000000 <= value < 0:
+            parts.append(b'\xd3' + _INT64.pack(value))
+        else:
+            raise OverflowError(f"整数超出 64 位范围：{value}")
+    elif isinstance(value, float):
+        parts.append(b'\xcb' + _FLOAT64.pack(value))
+    elif isinstance(value, (list, tuple)):
+        size = len(value)
+        if size < 16:
+            parts.append(bytes((0x90 | size,)))
+        elif size < 0x10000:
+            parts.append(b'\xdc' + _UINT16.pack(size))
+        else:
+            parts.append(b'\xdd' + _UINT32.pack(size))
+        for item in value:
+            _pack_into(item, parts)
+    elif isinstance(value, dict):
+        size = len(value)
+        if size < 16:
+            parts.append(bytes((0x80 | size,)))
+        elif size < 0x10000:
+            parts.append(b'\xde' + _UINT16.pack(size))
+        else:
+            parts.append(b'\xdf' + _UINT32.pack(size))
+        for key, item in value.items():
+            _pack_into(key, parts)
+            _pack_into(item, parts)
+    else:
+        raise TypeError(f"无法编码的类型：{type(value).__name__}")
+
+
+def _unpack_from(data, pos):
+    """从 pos 处解码一个值，返回 (值, 下一个位置)"""
+    code = data[pos]
+    pos += 1
+    if code < 0x80:
+        return code, pos
+    if code >= 0xe0:
+        return code - 0x100, pos
+    if 0xa0 <= code <= 0xbf:
+        end = pos + (code & 0x1f)
+        return data[pos:end].decode('utf-8'), end
+    if 0x90 <= code <= 0x9f:
+        return _unpack_array(data, pos, code & 0x0f)
+    if 0x80 <= code <= 0x8f:
+        return _unpack_map(data, pos, code & 0x0f)
+    if code == 0xc0:
+        return None, pos
+    if code == 0xc2:
+        return False, pos
+    if code == 0xc3:
+        return True, pos
+    if code in (0xd9, 0xda, 0xdb):
+        length = (_UINT8, _UINT16, _UINT32)[code - 0xd9]
+        size = length.unpack_from(data, pos)[0]
+        pos += length.size
+        return data[pos:pos + size].decode('utf-8'), pos + size
+    if code == 0xdc:
+        return _unpack_array(data, pos + 2, _UINT16.unpack_from(data, pos)[0])
+    if code == 0xdd:
+        return _unpack_array(data, pos + 4, _UINT32.unpack_from(data, pos)[0])
+    if code == 0xde:
+        return _unpack_map(data, pos + 2, _UINT16.unpack_from(data, pos)[0])
+    if code == 0xdf:
+        return _unpack_map(data, pos + 4, _UINT32.unpack_from(data, pos)[0])
+    number = _NUMBERS.get(code)
+    if number is None:
+        raise StoreError(f"不支持的 MessagePack 类型：0x{code:02x}")
+    return number.unpack_from(data, pos)[0], pos + number.size
+
+
+def _unpack_array(data, pos, size):
+    items = []
+    for _ in range(size):
+        item, pos = _unpack_from(data, pos)
+        items.append(item)
+    return items, pos
+
+
+def _unpack_map(data, pos, size):
+    mapping = {}
+    for _ in range(size):
+        key, pos = _unpack_from(data, pos)
+        mapping[key], pos = _unpack_from(data, pos)
+    return mapping, pos
+
+
+# 定长数值类型：{类型码: 结构}
+_NUMBERS = {
+    0xca: _FLOAT32, 0xcb: _FLOAT64,
+    0xcc: _UINT8, 0xcd: _UINT16, 0xce: _UINT32, 0xcf: _UINT64,
+    0xd0: _INT8, 0xd1: _INT16, 0xd2: _INT32, 0xd3: _INT64,
+}
+
+
+def pack(value):
+    """
+    把解析结果编码为 MessagePack
+
+    :param value: 由 dict、list、str、int、float、bool、None 组成的数据
+    :return: 编码后的字节串
+    """
+    if msgpack is not None:
+        return msgpack.packb(value, use_bin_type=True)
+    parts = []
+    _pack_into(value, parts)
+    return b''.join(parts)
+
+
+def unpack(data):
+    """
+    解码 pack 的结果
+
+    :param data: 字节串
+    :return: 解码后的数据，数组解码为 list
+    """
+    if msgpack is not None:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+    value, end = _unpack_from(data, 0)
+    if end != len(data):
+        raise StoreError("记录末尾有多余的数据")
+    return value
+
+
+class BinaryStoreWriter:
+    """
+    二进制存储写入器
+
+    与 JsonlWriter 一样先写入同目录下的临时文件，close() 时写入索引并原子替换目标文件，
+    中途出错不会留下不完整的存储文件。close() 或 abort() 之后写入器不能再使用，重复调用 close() / abort() 不做任何事。
+
+    :param path: 输出文件路径
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._file = None
+        self._temp_path = None
+        self._closed = False
+        self._index = {}  # {ID: (记录偏移, 记录长度)}
+
+    def open(self):
+        if self._file is not None:
+            return self
+        if self._closed:
+            raise ValueError(f"写入器已关闭：{self.path}")
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, self._temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(self.path)}.", suffix='.tmp',
+                                               dir=directory)
+        self._file = os.fdopen(fd, 'wb')
+        self._file.write(b'\0' * _HEADER.size)  # 文件头在 close() 时写入
+        return self
+
+    def add(self, resume_id, data):
+        """
+        写入一份简历
+
+        :param resume_id: 简历 ID（通常为 Markdown 文件路径），不能重复
+        :param data: 解析结果
+        """
+        if self._file is None:
+            self.open()
+        if resume_id in self._index:
+            raise ValueError(f"简历 ID 重复：{resume_id}")
+        if len(resume_id.encode('utf-8')) >= 0x10000:
+            raise ValueError(f"简历 ID 过长：{resume_id[:50]}...")
+        payload = pack(data)
+        offset = self._file.tell() + _LENGTH.size
+        self._file.write(_LENGTH.pack(len(payload)))
+        self._file.write(payload)
+        self._index[resume_id] = (offset, len(payload))
+        self.count += 1
+
+    def close(self):
+        """写入索引与文件头，并把临时文件原子替换为目标文件"""
+        if self._closed:
+            return
+        if self._file is None:  # 没有写入任何简历，生成空的存储文件
+            self.open()
+        file, self._file = self._file, None
+        self._closed = True
+        try:
+            index_offset = file.tell()
+            for resume_id, (offset, length) in self._index.items():
+                encoded = resume_id.encode('utf-8')
+                file.write(_INDEX_ID.pack(len(encoded)) + encoded + _INDEX_ENTRY.pack(offset, length))
+            index_length = file.tell() - index_offset
+            file.seek(0)
+            file.write(_HEADER.pack(MAGIC, VERSION, 0, self.count, index_offset, index_length))
+            file.close()
+            os.chmod(self._temp_path, 0o644)
+            os.replace(self._temp_path, self.path)
+        except BaseException:
+            file.close()
+            self._remove_temp()
+            raise
+        self._temp_path = None
+
+    def abort(self):
+        """放弃写入，删除临时文件"""
+        self._closed = True
+        if self._file is None:
+            return
+        file, self._file = self._file, None
+        file.close()
+        self._remove_temp()
+
+    def _remove_temp(self):
+        try:
+            os.remove(self._temp_path)
+        except OSError as e:
+            logging.warning(f"无法删除临时文件：{self._temp_path} - {e}")
+        self._temp_path = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+class BinaryStore:
+    """
+    只读打开二进制存储
+
+    打开时只读取文件头与索引；get() 按 ID 从映射的文件中解码单份简历，可以在多个线程中同时调用。
+
+    :param path: 存储文件路径
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._index = {}
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER.size:
+                raise StoreError(f"不是有效的简历存储文件：{path}")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._read_index(size)
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def _read_index(self, size):
+        magic, version, _, count, index_offset, index_length = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise StoreError(f"不是有效的简历存储文件：{self.path}")
+        if version != VERSION:
+            raise StoreError(f"不支持的存储版本 {version}：{self.path}")
+        if index_offset + index_length != size:
+            raise StoreError(f"存储文件不完整：{self.path}")
+        index = self._mmap[index_offset:index_offset + index_length]
+        pos = 0
+        for _ in range(count):
+            id_length = _INDEX_ID.unpack_from(index, pos)[0]
+            pos += _INDEX_ID.size
+            resume_id = index[pos:pos + id_length].decode('utf-8')
+            pos += id_length
+            self._index[resume_id] = _INDEX_ENTRY.unpack_from(index, pos)
+            pos += _INDEX_ENTRY.size
+        if pos != index_length:
+            raise StoreError(f"存储索引已损坏：{self.path}")
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, resume_id):
+        return resume_id in self._index
+
+    def ids(self):
+        """按写入顺序返回全部简历 ID"""
+        return list(self._index)
+
+    def get_bytes(self, resume_id):
+        """
+        读取单份简历编码后的数据，不解码
+
+        :param resume_id: 简历 ID
+        :return: MessagePack 字节串
+        """
+        offset, length = self._index[resume_id]
+        return self._mmap[offset:offset + length]
+
+    def get(self, resume_id, default=None):
+        """
+        按 ID 读取单份简历
+
+        :param resume_id: 简历 ID
+        :param default: ID 不存在时的返回值
+        :return: 解析结果字典
+        """
+        if resume_id not in self._index:
+            return default
+        return unpack(self.get_bytes(resume_id))
+
+    def __getitem__(self, resume_id):
+        return unpack(self.get_bytes(resume_id))
+
+    def items(self):
+        """按写入顺序逐份解码，生成 (ID, 解析结果)"""
+        for resume_id in self._index:
+            yield resume_id, self[resume_id]
+
+    def close(self):
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="查看解析结果的二进制存储")
+    parser.add_argument('store', help="存储文件路径")
+    parser.add_argument('ids', nargs='*', help="要输出的简历 ID，不指定时列出全部 ID")
+    args = parser.parse_args(argv)
+
+    try:
+        store = BinaryStore(args.store)
+    except (OSError, StoreError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    with store:
+        if not args.ids:
+            for resume_id in store.ids():
+                print(resume_id)
+            print(f"共 {len(store)} 份简历", file=sys.stderr)
+            return 0
+        missing = [resume_id for resume_id in args.ids if resume_id not in store]
+        for resume_id in args.ids:
+            if resume_id in store:
+                print(json.dumps({'source': resume_id, 'resume': store[resume_id]}, ensure_ascii=False, indent=2))
+        for resume_id in missing:
+            print(f"找不到简历：{resume_id}", file=sys.stderr)
+        return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""
+多简历合集文件的并行解析
+
+招聘系统导出的合集文件把多份简历首尾相接写在同一个 Markdown 文件中。
+这里以每个 ``# 姓名`` 一级标题（包括 schema.json 中的别名，如 ``# Name``）
+作为一份简历的开始，逐行读取并切分，再把各份简历分批交给进程池解析，
+结果按原文件中的顺序返回：
+
+    python -m module.bundle resumes.md --jsonl parsed.jsonl.gz -w 8
+    python -m module.bundle resumes.md --jsonl - | head
+
+同一时刻只有有限批次在途，整个文件不会被完整读入内存。
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from module.jsonl_export import JsonlWriter
+from module.mk_to_json import ENGINES, find_section, new_config_data, parse_markdown_to_json
+
+
+def _is_resume_start(line):
+    """是否为一份简历的开始：对应 name 部分的一级标题"""
+    if not line.startswith('#') or line.startswith('##'):
+        return False
+    spec = find_section(line.lstrip('#').strip())
+    return spec is not None and spec.key == 'name'
+
+
+def iter_resume_chunks(file_obj):
+    """
+    逐行读取合集文件，按 ``# 姓名`` 标题切分出每一份简历
+
+    第一个 ``# 姓名`` 之前的内容归入第一份简历；文件中没有 ``# 姓名`` 时整个文件视为一份简历。
+
+    :param file_obj: 以文本模式打开的文件对象（或任意可逐行迭代的对象）
+    :return: (起始行号, 简历源文本) 的生成器，行号从 1 开始
+    """
+    lines = []
+    start_line = 1
+    seen_start = False
+    for line_no, line in enumerate(file_obj, 1):
+        if _is_resume_start(line):
+            if seen_start:
+                yield start_line, ''.join(lines)
+                lines = []
+                start_line = line_no
+            seen_start = True
+        lines.append(line)
+    if lines and ''.join(lines).strip():
+        yield start_line, ''.join(lines)
+
+
+def _init_worker(log_level):
+    logging.basicConfig(level=log_level, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def _parse_chunks(chunks, engine):
+    """
+    在工作进程中解析一批简历
+
+    :param chunks: 简历源文本列表
+    :param engine: 解析引擎
+    :return: [(解析结果或 None, 错误信息或 None), ...]
+    """
+    results = []
+    for chunk in chunks:
+        try:
+            config = new_config_data()
+            if not config:
+                raise ValueError("配置文件加载失败")
+            results.append((parse_markdown_to_json(chunk, config, engine=engine), None))
+        except Exception as e:
+            results.append((None, str(e)))
+    return results
+
+
+def _iter_batches(chunks, batch_size):
+    batch = []
+    for item in chunks:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_bundle(file_obj, engine='tokens', workers=None, batch_size=32, log_level=logging.WARNING):
+    """
+    并行解析合集文件中的每一份简历，按原顺序返回结果
+
+    简历按 batch_size 份一批提交给进程池，在途批次数不超过进程数的两倍，
+    读取速度会跟随解析速度，内存占用与文件大小无关。
+
+    :param file_obj: 以文本模式打开的文件对象
+    :param engine: 解析引擎，html 或 tokens
+    :param workers: 工作进程数，默认为 CPU 核数；1 表示在当前进程中执行
+    :param batch_size: 每批提交给工作进程的简历份数
+    :param log_level: 工作进程的日志级别
+    :return: (序号, 起始行号, 解析结果或 None, 错误信息或 None) 的生成器，序号从 1 开始
+    """
+    workers = workers or os.cpu_count() or 1
+    batches = _iter_batches(iter_resume_chunks(file_obj), max(1, batch_size))
+    index = 0
+    if workers <= 1:
+        for batch in batches:
+            for (line_no, _), (data, error) in zip(batch, _parse_chunks([chunk for _, chunk in batch], engine)):
+                index += 1
+                yield index, line_no, data, error
+        return
+
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(log_level,)) as executor:
+        for batch in batches:
+            pending.append(([line_no for line_no, _ in batch],
+                            executor.submit(_parse_chunks, [chunk for _, chunk in batch], engine)))
+            # 在途批次过多时先按顺序取回最早的批次
+            while len(pending) >= workers * 2:
+                line_nos, future = pending.popleft()
+                for line_no, (data, error) in zip(line_nos, future.result()):
+                    index += 1
+                    yield index, line_no, data, error
+        while pending:
+            line_nos, future = pending.popleft()
+            for line_no, (data, error) in zip(line_nos, future.result()):
+                index += 1
+                yield index, line_no, data, error
+
+
+def iter_bundle_file(bundle_path, **kwargs):
+    """
+    并行解析合集文件，参数同 iter_bundle
+
+    :param bundle_path: 合集 Markdown 文件路径
+    :return: (序号, 起始行号, 解析结果或 None, 错误信息或 None) 的生成器
+    """
+    with open(bundle_path, 'r', encoding='utf-8') as f:
+        yield from iter_bundle(f, **kwargs)
+
+
+def export_bundle_jsonl(bundle_path, jsonl_path, out=sys.stderr, **kwargs):
+    """
+    并行解析合集文件并按原顺序写入 JSON Lines，每份简历一行
+
+    记录格式为 ``{"source": 文件路径, "index": 序号, "line": 起始行号, "resume": 解析结果}``，
+    解析失败的简历不写入记录，只输出错误信息。
+
+    :param bundle_path: 合集 Markdown 文件路径
+    :param jsonl_path: JSON Lines 导出路径（支持 .gz 与 ``-``）
+    :param out: 错误与汇总信息的输出流
+    :return: 汇总信息字典
+    """
+    start = time.perf_counter()
+    total = failed = 0
+    with JsonlWriter(jsonl_path) as writer:
+        for index, line_no, data, error in iter_bundle_file(bundle_path, **kwargs):
+            total += 1
+            if error:
+                failed += 1
+                print(f"第 {index} 份简历（第 {line_no} 行）解析失败：{error}", file=out)
+                continue
+            writer.write({'source': bundle_path, 'index': index, 'line': line_no, 'resume': data})
+    wall = time.perf_counter() - start
+    summary = {
+        'resumes': total,
+        'failed': failed,
+        'seconds': wall,
+        'resumes_per_second': total / wall if wall > 0 else 0.0,
+    }
+    print(f"完成 {total - failed}/{total} 份简历，用时 {wall:.2f} s，"
+          f"{summary['resumes_per_second']:.1f} resumes/s", file=out)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="并行解析包含多份简历的 Markdown 合集文件")
+    parser.add_argument('bundle', help="合集 Markdown 文件路径，每份简历以 # 姓名 开始")
+    parser.add_argument('--jsonl', required=True, help="JSON Lines 输出路径，.gz 结尾时压缩，- 表示标准输出")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="工作进程数，默认为 CPU 核数")
+    parser.add_argument('--engine', choices=ENGINES, default='tokens', help="Markdown 解析引擎")
+    parser.add_argument('--batch-size', type=int, default=32, help="每批提交给工作进程的简历份数")
+    parser.add_argument('-v', '--verbose', action='store_true', help="输出解析过程日志")
+    args = parser.parse_args(argv)
+    if not os.path.isfile(args.bundle):
+        parser.error(f"文件不存在：{args.bundle}")
+
+    log_level = logging.INFO if args.verbose else logging.WARNING
+    logging.basicConfig(level=log_level, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    summary = export_bundle_jsonl(args.bundle, args.jsonl, workers=args.workers, engine=args.engine,
+                                  batch_size=args.batch_size, log_level=log_level)
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+启动导入耗时报告
+
+在子进程中以 ``python -X importtime`` 导入目标模块，汇总每个模块自身与累计的导入耗时，
+以及按顶层包合计的耗时，用于检查启动路径上是否混入了不必要的重量级依赖：
+
+    python -m module.import_report              # 默认分析 Qt界面.py
+    python -m module.import_report module.batch --top 15
+    python -m module.import_report Qt界面 --json import_report.json
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+# 项目根目录，子进程在这里运行，以便导入 Qt界面.py、static.UI 等
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_IMPORTTIME_RE = re.compile(r'^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)\s*$')
+
+
+def parse_importtime(text):
+    """
+    解析 ``-X importtime`` 的输出
+
+    :param text: 子进程的标准错误输出
+    :return: [{'module': 模块名, 'self_ms': 自身耗时, 'cumulative_ms': 累计耗时, 'depth': 嵌套层级}, ...]
+    """
+    records = []
+    for line in text.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        records.append({
+            'module': name,
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': int(cumulative_us) / 1000,
+            'depth': (len(indent) - 1) // 2,
+        })
+    return records
+
+
+def collect_import_times(target='Qt界面', python=sys.executable):
+    """
+    在全新的子进程中导入目标模块并记录导入耗时
+
+    导入 Qt界面 不会创建窗口（窗口只在作为主程序运行时创建）。
+
+    :param target: 模块名
+    :param python: Python 解释器路径
+    :return: parse_importtime 的结果
+    """
+    result = subprocess.run([python, '-X', 'importtime', '-c', f'import {target}'], cwd=PROJECT_DIR,
+                            capture_output=True, text=True, encoding='utf-8', errors='replace')
+    if result.returncode != 0:
+        raise RuntimeError(f"导入 {target} 失败：{result.stderr.strip().splitlines()[-1:]}")
+    return parse_importtime(result.stderr)
+
+
+def build_report(records, top=20):
+    """
+    汇总导入耗时
+
+    :param records: parse_importtime 的结果
+    :param top: 列出的模块数
+    :return: 报告字典
+    """
+    packages = {}
+    for record in records:
+        package = record['module'].split('.', 1)[0]
+        packages[package] = packages.get(package, 0.0) + record['self_ms']
+    return {
+        'total_ms': round(sum(record['self_ms'] for record in records), 1),
+        'modules': len(records),
+        'packages': [{'package': name, 'self_ms': round(ms, 1)}
+                     for name, ms in sorted(packages.items(), key=lambda item: -item[1])[:top]],
+        'slowest': sorted(records, key=lambda record: -record['cumulative_ms'])[:top],
+    }
+
+
+def print_report(target, report, out=sys.stdout):
+    print(f"导入 {target}：{report['modules']} 个模块，合计 {report['total_ms']:.1f} ms", file=out)
+    print("\n按顶层包合计（自身耗时）：", file=out)
+    for item in report['packages']:
+        print(f"  {item['self_ms']:>9.1f} ms  {item['package']}", file=out)
+    print("\n累计耗时最长的模块：", file=out)
+    for record in report['slowest']:
+        print(f"  {record['cumulative_ms']:>9.1f} ms  {'  ' * record['depth']}{record['module']}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="统计启动时各模块的导入耗时")
+    parser.add_argument('target', nargs='?', default='Qt界面', help="要导入的模块名，默认为 Qt界面")
+    parser.add_argument('--top', type=int, default=20, help="列出的模块与包数量")
+    parser.add_argument('--json', default=None, help="同时把报告保存为 JSON 文件")
+    args = parser.parse_args(argv)
+
+    try:
+        records = collect_import_times(args.target)
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+    report = build_report(records, args.top)
+    print_report(args.target, report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(dict(report, target=args.target), f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,373 @@
+"""
+生成自包含的单文件 HTML
+
+模板通过相对路径引用 ``../static/css/模板1.css`` 与 ``../封面.jpg``，
+生成的 HTML 移动位置后样式和照片就会丢失，预览和导出 PDF 时也要额外读取这些文件。
+这里把渲染后的 HTML 处理为单个文件：
+
+- 本地样式表压缩后内联为 ``<style>``，其中的 ``url(...)`` 一并内联；
+- 本地图片编码为 data URI；安装了 Pillow 时，超过指定尺寸的照片先缩小再编码；
+- 去掉 HTML 注释和多余的空白。
+
+编码结果按文件内容的哈希缓存，批量生成时同一份 CSS 和照片只处理一次：
+
+    html_content = inline_html(html_content, base_dir=os.path.dirname(template_path))
+
+渲染后的 HTML 中的地址可能来自 Markdown（如照片路径），只内联允许的目录（默认为项目目录与 base_dir）中的文件，
+其他地址保持原样；处理不可信的输入（渲染服务）时使用 strict=True，不允许的地址直接移除。
+"""
+import base64
+import hashlib
+import io
+import logging
+import mimetypes
+import os
+import re
+import threading
+from urllib.parse import unquote, urlparse
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow 是可选依赖，没有安装时图片按原样编码
+    Image = None
+
+# 照片的最大边长（像素），模板中头像打印尺寸约 42mm，300dpi 下约 500 像素
+DEFAULT_MAX_IMAGE_SIZE = 480
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_STYLESHEET_RE = re.compile(r'<link\b[^>]*?\brel\s*=\s*["\']?stylesheet["\']?[^>]*>', re.IGNORECASE)
+_HREF_RE = re.compile(r'\bhref\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+_IMG_SRC_RE = re.compile(r'(<img\b[^>]*?\bsrc\s*=\s*)(["\'])([^"\']+)\2', re.IGNORECASE)
+_CSS_URL_RE = re.compile(r'url\(\s*(["\']?)([^"\')]+)\1\s*\)', re.IGNORECASE)
+
+_CSS_STRING_RE = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')')
+_CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+_CSS_PUNCTUATION_RE = re.compile(r'\s*([{};,>])\s*')
+# 冒号前的空白可能是后代选择器（如 ``div :first-child``），只删除冒号后的空白
+_CSS_COLON_RE = re.compile(r':\s+')
+
+# 内容原样保留的标签
+_RAW_BLOCK_RE = re.compile(r'(<(pre|textarea|script|style)\b.*?</\2\s*>)', re.IGNORECASE | re.DOTALL)
+_HTML_COMMENT_RE = re.compile(r'<!--(?!\[if).*?-->', re.DOTALL)
+_BETWEEN_TAGS_RE = re.compile(r'(<(/?)([a-zA-Z][a-zA-Z0-9]*)[^>]*>)\s+(?=<(/?)([a-zA-Z][a-zA-Z0-9]*|!))')
+_WHITESPACE_RE = re.compile(r'\s+')
+# 块级标签两侧的空白不影响显示，可以直接删除
+_BLOCK_TAGS = frozenset([
+    'html', 'head', 'body', 'meta', 'link', 'title', 'style', 'script', 'div', 'p', 'h1', 'h2', 'h3', 'h4',
+    'h5', 'h6', 'ul', 'ol', 'li', 'section', 'header', 'footer', 'main', 'nav', 'article', 'aside', 'table',
+    'thead', 'tbody', 'tr', 'td', 'th', 'br', 'hr', 'form', 'pre', 'blockquote',
+])
+
+
+def minify_css(css):
+    """
+    压缩 CSS：去掉注释与多余空白，字符串内容保持不变
+
+    :param css: CSS 源码
+    :return: 压缩后的 CSS
+    """
+    parts = _CSS_STRING_RE.split(_CSS_COMMENT_RE.sub('', css))
+    for i in range(0, len(parts), 2):  # 偶数位置是字符串之外的内容
+        text = _WHITESPACE_RE.sub(' ', parts[i])
+        text = _CSS_COLON_RE.sub(':', _CSS_PUNCTUATION_RE.sub(r'\1', text))
+        parts[i] = text.replace(';}', '}')
+    return ''.join(parts).strip()
+
+
+def minify_html(html):
+    """
+    压缩 HTML：去掉注释，合并空白，删除块级标签之间的空白
+
+    pre、textarea、script、style 中的内容保持不变。
+
+    :param html: HTML 源码
+    :return: 压缩后的 HTML
+    """
+    def between_tags(match):
+        if match.group(3).lower() in _BLOCK_TAGS or match.group(5).lower() in _BLOCK_TAGS:
+            return match.group(1)
+        return match.group(1) + ' '
+
+    parts = _RAW_BLOCK_RE.split(html)
+    result = []
+    # split 的结果依次为：普通内容、原样保留的整块、标签名
+    for i in range(0, len(parts), 3):
+        text = _HTML_COMMENT_RE.sub('', parts[i])
+        text = _BETWEEN_TAGS_RE.sub(between_tags, text)
+        result.append(_WHITESPACE_RE.sub(' ', text))
+        if i + 1 < len(parts):
+            result.append(parts[i + 1])
+    return ''.join(result).strip()
+
+
+def _local_path(reference, base_dir):
+    """把 HTML/CSS 中引用的地址转换为本地文件路径，远程地址和 data URI 返回 None"""
+    if reference.startswith(('data:', '#', '//')):
+        return None
+    parsed = urlparse(reference)
+    if parsed.scheme == 'file':
+        return unquote(parsed.path)
+    if parsed.scheme and len(parsed.scheme) > 1:  # 单个字母视为 Windows 盘符
+        return None
+    path = unquote(reference.split('?', 1)[0].split('#', 1)[0])
+    return os.path.normpath(path if os.path.isabs(path) else os.path.join(base_dir, path))
+
+
+def _is_plain_relative(reference):
+    """地址是否为不含 .. 的相对路径（不是绝对路径、file: 地址或 Windows 盘符路径）"""
+    if urlparse(reference).scheme:
+        return False
+    path = unquote(reference.split('?', 1)[0].split('#', 1)[0]).replace('\\', '/')
+    return not path.startswith('/') and '..' not in path.split('/')
+
+
+def resolve_roots(roots):
+    """
+    把允许内联的目录（或单个文件）转换为比较用的规范路径
+
+    :param roots: 路径列表
+    :return: 规范路径元组
+    """
+    return tuple(os.path.normcase(os.path.realpath(root)) for root in roots)
+
+
+def is_within_roots(path, roots):
+    """
+    解析符号链接后，判断路径是否位于某个允许的目录中（或就是允许的文件）
+
+    :param path: 本地文件路径
+    :param roots: resolve_roots 的结果
+    :return: bool
+    """
+    real = os.path.normcase(os.path.realpath(path))
+    return any(real == root or real.startswith(root.rstrip(os.sep) + os.sep) for root in roots)
+
+
+class AssetCache:
+    """
+    内联资源缓存，可在多个线程间共享
+
+    文件先按 (路径, 修改时间, 大小) 找到内容哈希，再按 (类型, 内容哈希, 参数) 找到编码结果，
+    不同路径下内容相同的文件也只编码一次。
+    """
+
+    def __init__(self):
+        self._digests = {}  # {(路径, 修改时间, 大小): 内容哈希}
+        self._encoded = {}  # {(类型, 内容哈希, 参数): 编码结果}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def digest(self, path):
+        """
+        文件内容的哈希，按 (路径, 修改时间, 大小) 缓存
+
+        :param path: 文件路径
+        :return: 16 字节哈希
+        """
+        return self._read(path)[0]
+
+    def _read(self, path):
+        """读取文件，返回 (内容哈希, 内容)；内容哈希已缓存时不读取内容"""
+        stat = os.stat(path)
+        stat_key = (path, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            digest = self._digests.get(stat_key)
+        if digest is not None:
+            return digest, None
+        with open(path, 'rb') as f:
+            content = f.read()
+        digest = hashlib.blake2b(content, digest_size=16).digest()
+        with self._lock:
+            self._digests[stat_key] = digest
+        return digest, content
+
+    def get_or_create(self, kind, path, options, encode):
+        """
+        读取缓存的编码结果，未命中时调用 encode(文件内容) 生成
+
+        :param kind: 资源类型，如 css、image
+        :param path: 文件路径
+        :param options: 影响编码结果的参数（可哈希）
+        :param encode: 编码函数
+        :return: 编码结果
+        """
+        digest, content = self._read(path)
+        key = (kind, digest, options)
+        with self._lock:
+            encoded = self._encoded.get(key)
+            if encoded is not None:
+                self.hits += 1
+                return encoded
+            self.misses += 1
+        if content is None:
+            with open(path, 'rb') as f:
+                content = f.read()
+        encoded = encode(content)
+        with self._lock:
+            self._encoded[key] = encoded
+        return encoded
+
+    def clear(self):
+        with self._lock:
+            self._digests.clear()
+            self._encoded.clear()
+
+
+_default_asset_cache = AssetCache()
+
+
+def get_asset_cache():
+    """获取进程内共享的内联资源缓存"""
+    return _default_asset_cache
+
+
+def _downscale_image(content, max_size):
+    """
+    照片超过最大边长时等比缩小，返回 (图片内容, MIME 类型)；无需处理或无法处理时返回 (原内容, None)
+    """
+    if Image is None or not max_size:
+        return content, None
+    try:
+        with Image.open(io.BytesIO(content)) as image:
+            if max(image.size) <= max_size:
+                return content, None
+            image.thumbnail((max_size, max_size))
+            output = io.BytesIO()
+            if image.format == 'PNG' or image.mode in ('RGBA', 'LA', 'P'):
+                image.save(output, format='PNG', optimize=True)
+                return output.getvalue(), 'image/png'
+            image.convert('RGB' if image.mode not in ('RGB', 'L') else image.mode).save(
+                output, format='JPEG', quality=85, optimize=True, progressive=True)
+            return output.getvalue(), 'image/jpeg'
+    except Exception as e:
+        logging.warning(f"图片缩放失败，使用原图：{e}")
+        return content, None
+
+
+def image_data_uri(path, max_size=DEFAULT_MAX_IMAGE_SIZE, cache=None):
+    """
+    把图片编码为 data URI
+
+    :param path: 图片文件路径
+    :param max_size: 最大边长（像素），需要 Pillow；为 None 时不缩放
+    :param cache: AssetCache 实例，默认使用进程内共享的缓存
+    :return: data URI 字符串
+    """
+    cache = cache or _default_asset_cache
+
+    def encode(content):
+        data, mime = _downscale_image(content, max_size)
+        mime = mime or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        return f"data:{mime};base64,{base64.b64encode(data).decode('ascii')}"
+
+    return cache.get_or_create('image', path, (max_size, mimetypes.guess_type(path)[0]), encode)
+
+
+def inline_stylesheet(path, max_image_size=DEFAULT_MAX_IMAGE_SIZE, cache=None, allowed_roots=None):
+    """
+    读取并压缩样式表，其中引用的本地文件（图片、字体）内联为 data URI
+
+    结果按 (CSS 内容, CSS 所在目录, 被引用文件的内容) 缓存，被引用的图片修改后重新生成；
+    内容相同但位于不同目录的 CSS 分别处理。
+
+    :param path: CSS 文件路径
+    :param max_image_size: 图片的最大边长（像素）
+    :param cache: AssetCache 实例，默认使用进程内共享的缓存
+    :param allowed_roots: 允许内联的目录，默认为项目目录与 CSS 所在目录
+    :return: 压缩后的 CSS
+    """
+    cache = cache or _default_asset_cache
+    css_dir = os.path.dirname(os.path.abspath(path))
+    roots = resolve_roots(allowed_roots if allowed_roots is not None else (PROJECT_DIR, css_dir))
+
+    def referenced_file(reference):
+        local = _local_path(reference, css_dir)
+        if local is None or not is_within_roots(local, roots) or not os.path.isfile(local):
+            return None
+        return local
+
+    references = cache.get_or_create(
+        'css-urls', path, None,
+        lambda content: tuple(match.group(2) for match in _CSS_URL_RE.finditer(content.decode('utf-8'))))
+    assets = []
+    for reference in references:
+        local = referenced_file(reference)
+        if local is not None:
+            assets.append((local, cache.digest(local)))
+
+    def encode(content):
+        def replace_url(match):
+            local = referenced_file(match.group(2))
+            if local is None:
+                return match.group(0)
+            return f'url("{image_data_uri(local, max_image_size, cache)}")'
+
+        return minify_css(_CSS_URL_RE.sub(replace_url, content.decode('utf-8')))
+
+    return cache.get_or_create('css', path, (max_image_size, css_dir, roots, tuple(assets)), encode)
+
+
+def inline_html(html, base_dir, max_image_size=DEFAULT_MAX_IMAGE_SIZE, minify=True, cache=None,
+                allowed_roots=None, strict=False, trusted_references=()):
+    """
+    把渲染后的 HTML 处理为自包含的单个文件
+
+    找不到的本地文件保持原来的引用，并输出警告；不在允许目录中的本地文件不读取，保持原来的引用。
+    strict 为 True 时，绝对路径、file: 地址与含 .. 的地址（trusted_references 中的除外，通常是模板自身的引用）
+    以及允许目录之外的地址都会被移除：图片的 src 置空，样式表的 link 删除，之后导出 PDF 时也不会再被加载。
+
+    :param html: 渲染后的 HTML
+    :param base_dir: 解析相对路径的基准目录，通常是模板所在目录
+    :param max_image_size: 图片的最大边长（像素），需要 Pillow；为 None 时不缩放
+    :param minify: 是否压缩 HTML
+    :param cache: AssetCache 实例，默认使用进程内共享的缓存
+    :param allowed_roots: 允许内联的目录（或单个文件），默认为项目目录与 base_dir
+    :param strict: 是否移除不允许的本地地址
+    :param trusted_references: strict 时仍然允许的地址（仍然限制在允许的目录中）
+    :return: 处理后的 HTML
+    """
+    cache = cache or _default_asset_cache
+    roots = allowed_roots if allowed_roots is not None else (PROJECT_DIR, base_dir)
+    resolved_roots = resolve_roots(roots)
+
+    def allowed_path(reference):
+        """返回 (允许内联的本地路径, 是否拒绝)；远程地址返回 (None, False)"""
+        local = _local_path(reference, base_dir)
+        if local is None:
+            return None, False
+        if strict and reference not in trusted_references and not _is_plain_relative(reference):
+            logging.warning(f"拒绝内联绝对路径或含 .. 的地址：{reference}")
+            return None, True
+        if not is_within_roots(local, resolved_roots):
+            logging.warning(f"地址不在允许内联的目录中：{reference}")
+            return None, True
+        return local, False
+
+    def replace_stylesheet(match):
+        href = _HREF_RE.search(match.group(0))
+        local, rejected = allowed_path(href.group(1)) if href else (None, False)
+        if local is None:
+            return '' if rejected and strict else match.group(0)
+        try:
+            return f"<style>{inline_stylesheet(local, max_image_size, cache, roots)}</style>"
+        except OSError as e:
+            logging.warning(f"无法内联样式表：{local} - {e}")
+            return match.group(0)
+
+    def replace_image(match):
+        local, rejected = allowed_path(match.group(3))
+        if local is None:
+            if rejected and strict:
+                return f"{match.group(1)}{match.group(2)}{match.group(2)}"
+            return match.group(0)
+        try:
+            return f"{match.group(1)}{match.group(2)}{image_data_uri(local, max_image_size, cache)}{match.group(2)}"
+        except OSError as e:
+            logging.warning(f"无法内联图片：{local} - {e}")
+            return match.group(0)
+
+    html = _STYLESHEET_RE.sub(replace_stylesheet, html)
+    html = _IMG_SRC_RE.sub(replace_image, html)
+    return minify_html(html) if minify else html
@@ -0,0 +1,132 @@
+"""
+有界任务队列
+
+在固定大小的线程池中执行生成任务，每个任务有唯一 ID，可以取消；
+同一个键（例如同一个输入文件）提交新任务时，会取消仍在排队或执行中的旧任务。
+任务函数通过 ``job.check_cancelled()`` 在各阶段之间检查取消状态。
+"""
+import itertools
+import logging
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+
+class JobCancelled(Exception):
+    """任务已被取消或被新任务取代"""
+
+
+class Job:
+    """队列中的一个任务"""
+
+    def __init__(self, job_id, key):
+        self.id = job_id
+        self.key = key
+        self.future = None
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        """请求取消：尚未开始的任务直接移出队列，执行中的任务在下一次检查时退出"""
+        self._cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def check_cancelled(self):
+        """在任务的各阶段之间调用，已取消时抛出 JobCancelled"""
+        if self._cancel_event.is_set():
+            raise JobCancelled(f"任务 {self.id} 已取消")
+
+
+class JobQueue:
+    """
+    有界任务队列
+
+    :param max_workers: 同时执行的任务数
+    :param max_pending: 排队与执行中的任务总数上限，超过时拒绝新任务
+    """
+
+    def __init__(self, max_workers=2, max_pending=8):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._ids = itertools.count(1)
+        self._jobs = {}  # {任务 ID: Job}
+        self._latest = {}  # {键: 最新的 Job}
+        # 取消尚未开始的任务时，完成回调会在当前线程中立即执行，因此使用可重入锁
+        self._lock = threading.RLock()
+
+    def submit(self, key, func, *args, on_done=None):
+        """
+        提交任务
+
+        :param key: 任务键，相同键的新任务会取代旧任务
+        :param func: 任务函数，调用方式为 func(job, *args)
+        :param on_done: 完成回调，调用方式为 on_done(job, result, error)，在工作线程中执行；
+                        被取消的任务 error 为 JobCancelled
+        :return: Job 对象；队列已满时返回 None
+        """
+        with self._lock:
+            previous = self._latest.get(key)
+            # 将被取代的旧任务不计入容量；队列已满时拒绝新任务，旧任务继续执行
+            active = sum(1 for job in self._jobs.values() if not job.cancelled and job is not previous)
+            if active >= self.max_pending:
+                logging.warning(f"任务队列已满（{self.max_pending}），请稍后再试")
+                return None
+            job = Job(next(self._ids), key)
+            self._jobs[job.id] = job
+            self._latest[key] = job
+            job.future = self._executor.submit(self._run, job, func, args)
+            job.future.add_done_callback(lambda future: self._finish(job, future, on_done))
+            # 新任务已经加入队列后再取消旧任务
+            if previous is not None:
+                logging.info(f"任务 {previous.id} 被新任务取代，已取消")
+                previous.cancel()
+        return job
+
+    def _run(self, job, func, args):
+        job.check_cancelled()
+        return func(job, *args)
+
+    def _finish(self, job, future, on_done):
+        with self._lock:
+            self._jobs.pop(job.id, None)
+            if self._latest.get(job.key) is job:
+                del self._latest[job.key]
+        try:
+            result, error = future.result(), None
+        except (CancelledError, JobCancelled):
+            result, error = None, JobCancelled(f"任务 {job.id} 已取消")
+        except Exception as e:
+            result, error = None, e
+        if on_done is not None:
+            try:
+                on_done(job, result, error)
+            except Exception as e:
+                logging.error(f"任务 {job.id} 的完成回调出错：{e}", exc_info=True)
+
+    def cancel(self, job_id):
+        """取消指定 ID 的任务"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            job.cancel()
+        return job is not None
+
+    def cancel_all(self):
+        """取消所有排队和执行中的任务"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.cancel()
+
+    def pending_count(self):
+        """排队与执行中的任务数"""
+        with self._lock:
+            return len(self._jobs)
+
+    def shutdown(self, wait=True):
+        """取消所有任务并关闭线程池"""
+        self.cancel_all()
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,131 @@
+"""
+JSON Lines 导出
+
+每份简历一行紧凑的 JSON 记录，边解析边写出，不需要把全部结果保存在内存中。
+路径以 ``.gz`` 结尾时使用 gzip 压缩；路径为 ``-`` 时写到标准输出。
+写文件时先写入同目录下的临时文件，全部完成后再用 os.replace 原子替换，
+中途出错不会留下不完整的输出文件：
+
+    with JsonlWriter("parsed.jsonl.gz") as writer:
+        for record in records:
+            writer.write(record)
+"""
+import gzip
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+
+
+def dumps_record(record):
+    """将一条记录序列化为紧凑的单行 JSON"""
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+
+
+class JsonlWriter:
+    """
+    JSON Lines 写入器
+
+    :param path: 输出路径，``-`` 表示标准输出
+    :param compress: 是否 gzip 压缩，默认根据扩展名 ``.gz`` 判断
+    """
+
+    def __init__(self, path, compress=None):
+        self.path = path
+        self.compress = path.endswith('.gz') if compress is None else compress
+        self.count = 0
+        self._temp_path = None
+        self._raw = None
+        self._stream = None
+
+    def open(self):
+        if self._stream is not None:
+            return self
+        if self.path == '-':
+            if self.compress:
+                self._stream = io.TextIOWrapper(gzip.GzipFile(fileobj=sys.stdout.buffer, mode='wb'),
+                                                encoding='utf-8')
+            else:
+                self._stream = sys.stdout
+            return self
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, self._temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(self.path)}.", suffix='.tmp',
+                                               dir=directory)
+        self._raw = os.fdopen(fd, 'wb')
+        binary = gzip.GzipFile(fileobj=self._raw, mode='wb') if self.compress else self._raw
+        self._stream = io.TextIOWrapper(binary, encoding='utf-8', newline='\n')
+        return self
+
+    def write(self, record):
+        """
+        写入一条记录
+
+        :param record: 可序列化为 JSON 的对象
+        """
+        if self._stream is None:
+            self.open()
+        self._stream.write(dumps_record(record) + '\n')
+        self.count += 1
+        if self.path == '-':
+            self._stream.flush()  # 标准输出逐条可见，便于管道中的下游程序处理
+
+    def close(self):
+        """写入完成：刷新缓冲并把临时文件原子替换为目标文件"""
+        if self._stream is None:
+            return
+        stream, self._stream = self._stream, None
+        if self.path == '-':
+            if stream is sys.stdout:
+                stream.flush()
+            else:
+                stream.close()  # 写出 gzip 结尾，但不关闭标准输出
+            return
+        stream.close()  # 刷新缓冲并写出 gzip 结尾
+        self._raw.close()
+        os.chmod(self._temp_path, 0o644)  # mkstemp 创建的文件只有所有者可读写
+        os.replace(self._temp_path, self.path)
+        self._temp_path = None
+        logging.info(f"已写入 {self.count} 条记录：{self.path}")
+
+    def abort(self):
+        """放弃写入：删除临时文件，目标文件保持原样"""
+        if self._stream is None:
+            return
+        stream, self._stream = self._stream, None
+        if self.path == '-':
+            return
+        for closable in (stream, self._raw):
+            try:
+                closable.close()
+            except Exception:
+                pass
+        if self._temp_path and os.path.exists(self._temp_path):
+            os.remove(self._temp_path)
+        self._temp_path = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def read_jsonl(path):
+    """
+    逐条读取 JSON Lines 文件（支持 .gz）
+
+    :param path: 文件路径
+    :return: 记录生成器
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
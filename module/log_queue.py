@@ -0,0 +1,47 @@
+"""
+队列化日志
+
+工作线程只把日志记录放入内存队列（QueueHandler），由后台监听线程
+（QueueListener）依次交给文件、界面等处理器，写磁盘不再阻塞生成任务。
+"""
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+
+def start_queue_logging(handlers, level=logging.INFO, logger=None):
+    """
+    将日志器的输出改为经由队列交给后台线程处理
+
+    :param handlers: 实际输出日志的处理器列表（文件、界面等）
+    :param level: 日志器级别
+    :param logger: 日志器，默认为根日志器
+    :return: 已启动的 QueueListener，退出时调用 stop_queue_logging 停止
+    """
+    logger = logger or logging.getLogger()
+    # 移除之前安装的队列处理器，重复调用时不会重复输出
+    for handler in list(logger.handlers):
+        if isinstance(handler, QueueHandler):
+            logger.removeHandler(handler)
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    logger.addHandler(QueueHandler(log_queue))
+    logger.setLevel(level)
+    listener.start()
+    return listener
+
+
+def stop_queue_logging(listener, logger=None):
+    """
+    停止后台监听线程，队列中剩余的记录会先处理完
+
+    :param listener: start_queue_logging 返回的监听器
+    :param logger: 日志器，默认为根日志器
+    """
+    logger = logger or logging.getLogger()
+    for handler in list(logger.handlers):
+        if isinstance(handler, QueueHandler) and handler.queue is listener.queue:
+            logger.removeHandler(handler)
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
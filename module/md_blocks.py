@@ -0,0 +1,460 @@
+"""
+Markdown 块级解析器
+
+直接把 Markdown 文本解析为标题、段落、列表组成的轻量节点树，
+按 Python-Markdown 的块处理规则（4 空格缩进嵌套、惰性续行、松散列表等）
+切分，并按 BeautifulSoup ``get_text()`` 的规则还原节点文本。
+这样可以跳过 “Markdown -> HTML -> BeautifulSoup” 的序列化与反序列化，
+同时与原有解析路径得到相同的结果。
+"""
+import html
+import re
+
+TAB_LENGTH = 4
+_INDENT = ' ' * TAB_LENGTH
+
+# 块级元素
+BLOCK_TAGS = frozenset(['p', 'li', 'ul', 'ol', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+                        'pre', 'blockquote', 'hr'])
+LIST_TAGS = ('ul', 'ol')
+
+# 块级语法
+_HASH_HEADER_RE = re.compile(r'(?:^|\n)(?P<level>#{1,6})(?P<header>(?:\\.|[^\\])*?)#*(?:\n|$)')
+_SETEXT_HEADER_RE = re.compile(r'^.*?\n[=-]+[ ]*(\n|$)', re.MULTILINE)
+_HR_RE = re.compile(
+    r'^[ ]{0,3}(?=(?P<atomicgroup>(-+[ ]{0,2}){3,}|(_+[ ]{0,2}){3,}|(\*+[ ]{0,2}){3,}))'
+    r'(?P=atomicgroup)[ ]*$',
+    re.MULTILINE
+)
+_OLIST_RE = re.compile(r'^[ ]{0,3}\d+\.[ ]+(.*)')
+_ULIST_RE = re.compile(r'^[ ]{0,3}[*+-][ ]+(.*)')
+_CHILD_RE = re.compile(r'^[ ]{0,3}((\d+\.)|[*+-])[ ]+(.*)')
+_INDENT_ITEM_RE = re.compile(r'^[ ]{4,7}((\d+\.)|[*+-])[ ]+.*')
+_INDENT_LEVEL_RE = re.compile(r'^(([ ]{4})+)')
+_QUOTE_RE = re.compile(r'(^|\n)[ ]{0,3}>[ ]?(.*)')
+_REFERENCE_RE = re.compile(
+    r'^[ ]{0,3}\[([^\[\]]*)\]:[ ]*\n?[ ]*([^\s]+)[ ]*(?:\n[ ]*)?((["\'])(.*)\4[ ]*|\((.*)\)[ ]*)?$',
+    re.MULTILINE
+)
+_BLANK_LINE_RE = re.compile(r'(?<=\n) +\n')
+
+# 行内语法（只保留文本，去掉标记）
+_ESCAPED_CHARS = frozenset('\\`*_{}[]()>#+-.!')
+_ESCAPE_RE = re.compile(r'\\(.)')
+_CODE_SPAN_RE = re.compile(r'(?<!\\)(`+)(.+?)(?<!`)\1(?!`)', re.DOTALL)
+_PLACEHOLDER_RE = re.compile('\x02(\\d+)\x03')
+_IMAGE_RE = re.compile(r'!\[[^\]]*\]\([^)]*\)')
+_IMAGE_REF_RE = re.compile(r'!\[[^\]]*\] ?\[[^\]]*\]')
+_LINK_RE = re.compile(r'(?<!!)\[([^\]]*)\]\([^)]*\)')
+_REF_LINK_RE = re.compile(r'(?<!!)\[([^\]]*)\] ?\[([^\]]*)\]')
+_SHORT_REF_RE = re.compile(r'(?<![!\]])\[([^\]]+)\](?![\[(])')
+_AUTOLINK_RE = re.compile(r'<((?:[Ff]|[Hh][Tt])[Tt][Pp][Ss]?://[^<>]*)>')
+_AUTOMAIL_RE = re.compile(r'<([^<> !]+@[^@<> ]+)>')
+_HTML_TAG_RE = re.compile(r'<!--.*?-->|</?[A-Za-z][^<>]*>', re.DOTALL)
+_LINE_BREAK_RE = re.compile(r'  \n')
+_NOT_STRONG_RE = re.compile(r'((^|(?<=\s))(\*{1,3}|_{1,3})(?=\s|$))')
+_STRONG_EM_RE = re.compile(r'(\*{3}|_{3})(?=\S)(.+?)(?<=\S)\1')
+_STRONG_RE = re.compile(r'(\*\*|__)(?=\S)(.+?)(?<=\S)\1')
+_EM_STAR_RE = re.compile(r'\*([^*]+)\*')
+_EM_UNDERSCORE_RE = re.compile(r'(?<!\w)_(?=\S)(.+?)(?<=\S)_(?!\w)')
+_ENTITY_RE = re.compile(r'&(?:#[0-9]+|#x[0-9a-fA-F]+|[a-zA-Z0-9]+);')
+
+
+class Element:
+    """节点树中的一个元素，只保存提取文本所需的信息"""
+    __slots__ = ('tag', 'text', 'tail', 'children')
+
+    def __init__(self, tag, text=None):
+        self.tag = tag
+        self.text = text
+        self.tail = None
+        self.children = []
+
+    def append(self, tag, text=None):
+        child = Element(tag, text)
+        self.children.append(child)
+        return child
+
+    def last_child(self):
+        return self.children[-1] if self.children else None
+
+
+class BlockParser:
+    """
+    按 Python-Markdown 的块处理器顺序解析 Markdown 文本
+
+    处理器优先级：空块、列表缩进、代码块、ATX 标题、Setext 标题、分隔线、
+    有序/无序列表、引用、链接引用定义、段落。
+    """
+
+    def __init__(self):
+        self.state = []
+        self.references = set()
+
+    def parse_document(self, md_content):
+        """
+        解析完整文档
+
+        :param md_content: Markdown 文本
+        :return: 根元素
+        """
+        root = Element('div')
+        if not md_content.strip():
+            return root
+        source = md_content.replace('\r\n', '\n').replace('\r', '\n') + '\n\n'
+        source = source.expandtabs(TAB_LENGTH)
+        source = _BLANK_LINE_RE.sub('\n', source)
+        self.parse_chunk(root, source)
+        return root
+
+    def parse_chunk(self, parent, text):
+        self.parse_blocks(parent, text.split('\n\n'))
+
+    def parse_blocks(self, parent, blocks):
+        while blocks:
+            block = blocks[0]
+            if not block or block.startswith('\n'):
+                self._run_empty(blocks)
+            elif block.startswith(_INDENT) and self._test_list_indent(parent):
+                self._run_list_indent(parent, blocks)
+            elif block.startswith(_INDENT):
+                self._run_code(parent, blocks)
+            elif _HASH_HEADER_RE.search(block):
+                self._run_hash_header(parent, blocks)
+            elif _SETEXT_HEADER_RE.match(block):
+                self._run_setext_header(parent, blocks)
+            elif _HR_RE.search(block):
+                self._run_hr(parent, blocks)
+            elif _OLIST_RE.match(block) or _ULIST_RE.match(block):
+                self._run_list(parent, blocks, 'ol' if _OLIST_RE.match(block) else 'ul')
+            elif _QUOTE_RE.search(block):
+                self._run_quote(parent, blocks)
+            elif _REFERENCE_RE.search(block) and self._run_reference(blocks):
+                continue
+            else:
+                self._run_paragraph(parent, blocks)
+
+    # ---- 各块处理器 ----
+
+    def _run_empty(self, blocks):
+        block = blocks.pop(0)
+        rest = block[1:]
+        if rest:
+            blocks.insert(0, rest)
+
+    def _test_list_indent(self, parent):
+        if self.state and self.state[-1] == 'detabbed':
+            return False
+        if parent.tag == 'li':
+            return True
+        last = parent.last_child()
+        return last is not None and last.tag in LIST_TAGS
+
+    def _run_list_indent(self, parent, blocks):
+        block = blocks.pop(0)
+        level, sibling = self._get_level(parent, block)
+        block = _loose_detab(block, level)
+        self.state.append('detabbed')
+        if parent.tag == 'li':
+            last = parent.last_child()
+            if last is not None and last.tag in LIST_TAGS:
+                self.parse_blocks(last, [block])
+            else:
+                self.parse_blocks(parent, [block])
+        elif sibling.tag == 'li':
+            self.parse_blocks(sibling, [block])
+        elif sibling.children and sibling.children[-1].tag == 'li':
+            item = sibling.children[-1]
+            if item.text:
+                # 松散列表：把列表项已有的文本移入 <p>
+                p = Element('p', item.text)
+                item.text = ''
+                item.children.insert(0, p)
+            self.parse_chunk(item, block)
+        else:
+            item = sibling.append('li')
+            self.parse_blocks(item, [block])
+        self.state.pop()
+
+    def _get_level(self, parent, block):
+        m = _INDENT_LEVEL_RE.match(block)
+        indent_level = len(m.group(1)) // TAB_LENGTH if m else 0
+        level = 1 if self.state and self.state[-1] == 'list' else 0
+        while indent_level > level:
+            child = parent.last_child()
+            if child is not None and (child.tag in LIST_TAGS or child.tag == 'li'):
+                if child.tag in LIST_TAGS:
+                    level += 1
+                parent = child
+            else:
+                break
+        return level, parent
+
+    def _run_code(self, parent, blocks):
+        block = blocks.pop(0)
+        sibling = parent.last_child()
+        lines = block.split('\n')
+        code_lines = []
+        for line in lines:
+            if line.startswith(_INDENT):
+                code_lines.append(line[TAB_LENGTH:])
+            elif not line.strip():
+                code_lines.append('')
+            else:
+                break
+        rest = '\n'.join(lines[len(code_lines):])
+        code = '\n'.join(code_lines).rstrip() + '\n'
+        if sibling is not None and sibling.tag == 'pre':
+            sibling.text = f"{sibling.text}\n{code}"
+        else:
+            parent.append('pre', code)
+        if rest:
+            blocks.insert(0, rest)
+
+    def _run_hash_header(self, parent, blocks):
+        block = blocks.pop(0)
+        m = _HASH_HEADER_RE.search(block)
+        before = block[:m.start()]
+        after = block[m.end():]
+        if before:
+            self.parse_blocks(parent, [before])
+        parent.append(f"h{len(m.group('level'))}", m.group('header').strip())
+        if after:
+            blocks.insert(0, after)
+
+    def _run_setext_header(self, parent, blocks):
+        lines = blocks.pop(0).split('\n')
+        level = 1 if lines[1].startswith('=') else 2
+        parent.append(f"h{level}", lines[0].strip())
+        if len(lines) > 2:
+            blocks.insert(0, '\n'.join(lines[2:]))
+
+    def _run_hr(self, parent, blocks):
+        block = blocks.pop(0)
+        m = _HR_RE.search(block)
+        before = block[:m.start()].rstrip('\n')
+        if before:
+            self.parse_blocks(parent, [before])
+        parent.append('hr')
+        after = block[m.end():].lstrip('\n')
+        if after:
+            blocks.insert(0, after)
+
+    def _run_list(self, parent, blocks, tag):
+        items = _get_list_items(blocks.pop(0))
+        sibling = parent.last_child()
+        if sibling is not None and sibling.tag in LIST_TAGS:
+            # 空行之后继续上一个列表，列表变为松散列表
+            lst = sibling
+            last_item = lst.children[-1]
+            if last_item.text:
+                p = Element('p', last_item.text)
+                last_item.text = ''
+                last_item.children.insert(0, p)
+            last = last_item.last_child()
+            if last is not None and last.tail:
+                last_item.append('p', last.tail.lstrip())
+                last.tail = ''
+            item = lst.append('li')
+            self.state.append('looselist')
+            self.parse_blocks(item, [items.pop(0)])
+            self.state.pop()
+        elif parent.tag in LIST_TAGS:
+            lst = parent
+        else:
+            lst = parent.append(tag)
+
+        self.state.append('list')
+        for item_text in items:
+            if item_text.startswith(_INDENT):
+                # 缩进的子项，以上一个列表项为父节点
+                self.parse_blocks(lst.children[-1], [item_text])
+            else:
+                item = lst.append('li')
+                self.parse_blocks(item, [item_text])
+        self.state.pop()
+
+    def _run_quote(self, parent, blocks):
+        block = blocks.pop(0)
+        m = _QUOTE_RE.search(block)
+        before = block[:m.start()]
+        if before:
+            self.parse_blocks(parent, [before])
+        block = '\n'.join(_clean_quote_line(line) for line in block[m.start():].split('\n'))
+        sibling = parent.last_child()
+        if sibling is not None and sibling.tag == 'blockquote':
+            quote = sibling
+        else:
+            quote = parent.append('blockquote')
+        self.state.append('blockquote')
+        self.parse_chunk(quote, block)
+        self.state.pop()
+
+    def _run_reference(self, blocks):
+        block = blocks.pop(0)
+        m = _REFERENCE_RE.search(block)
+        self.references.add(m.group(1).strip().lower())
+        after = block[m.end():]
+        if after.strip():
+            blocks.insert(0, after.lstrip('\n'))
+        before = block[:m.start()]
+        if before.strip():
+            blocks.insert(0, before.rstrip('\n'))
+        return True
+
+    def _run_paragraph(self, parent, blocks):
+        block = blocks.pop(0)
+        if not block.strip():
+            return
+        if self.state and self.state[-1] == 'list':
+            # 紧凑列表：文本直接挂在列表项上
+            sibling = parent.last_child()
+            if sibling is not None:
+                sibling.tail = f"{sibling.tail}\n{block}" if sibling.tail else f"\n{block}"
+            elif parent.text:
+                parent.text = f"{parent.text}\n{block}"
+            else:
+                parent.text = block.lstrip()
+        else:
+            parent.append('p', block.lstrip())
+
+
+def _loose_detab(text, level=1):
+    prefix = _INDENT * level
+    lines = text.split('\n')
+    for i, line in enumerate(lines):
+        if line.startswith(prefix):
+            lines[i] = line[len(prefix):]
+    return '\n'.join(lines)
+
+
+def _get_list_items(block):
+    items = []
+    for line in block.split('\n'):
+        m = _CHILD_RE.match(line)
+        if m:
+            items.append(m.group(3))
+        elif _INDENT_ITEM_RE.match(line):
+            if items[-1].startswith(_INDENT):
+                items[-1] = f"{items[-1]}\n{line}"
+            else:
+                items.append(line)
+        else:
+            items[-1] = f"{items[-1]}\n{line}"
+    return items
+
+
+def _clean_quote_line(line):
+    m = _QUOTE_RE.match(line)
+    if line.strip() == '>':
+        return ''
+    if m:
+        return m.group(2)
+    return line
+
+
+def strip_inline(text, references=frozenset()):
+    """
+    去掉行内 Markdown 标记，得到与渲染后 ``get_text()`` 一致的纯文本
+
+    :param text: 含行内标记的文本
+    :param references: 已定义的链接引用 ID（小写）
+    :return: 纯文本
+    """
+    if not text:
+        return text or ''
+    stash = []
+
+    def _stash(value):
+        stash.append(value)
+        return f"\x02{len(stash) - 1}\x03"
+
+    text = _CODE_SPAN_RE.sub(lambda m: _stash(m.group(2).strip()), text)
+    text = _ESCAPE_RE.sub(
+        lambda m: _stash(m.group(1)) if m.group(1) in _ESCAPED_CHARS else m.group(0), text
+    )
+    text = _IMAGE_RE.sub('', text)
+    text = _IMAGE_REF_RE.sub('', text)
+    text = _LINK_RE.sub(lambda m: m.group(1), text)
+    if references:
+        text = _REF_LINK_RE.sub(
+            lambda m: m.group(1) if (m.group(2) or m.group(1)).lower() in references else m.group(0), text
+        )
+        text = _SHORT_REF_RE.sub(
+            lambda m: m.group(1) if m.group(1).lower() in references else m.group(0), text
+        )
+    text = _AUTOLINK_RE.sub(lambda m: _stash(m.group(1)), text)
+    text = _AUTOMAIL_RE.sub(lambda m: _stash(m.group(1)), text)
+    text = _HTML_TAG_RE.sub('', text)
+    text = _LINE_BREAK_RE.sub('\n', text)
+    text = _NOT_STRONG_RE.sub(lambda m: _stash(m.group(0)), text)
+    text = _STRONG_EM_RE.sub(r'\2', text)
+    text = _STRONG_RE.sub(r'\2', text)
+    text = _EM_STAR_RE.sub(r'\1', text)
+    text = _EM_UNDERSCORE_RE.sub(r'\1', text)
+    if '&' in text:
+        text = _ENTITY_RE.sub(lambda m: html.unescape(m.group(0)), text)
+    if stash:
+        text = _PLACEHOLDER_RE.sub(lambda m: stash[int(m.group(1))], text)
+    return text
+
+
+def get_text(element, references=frozenset()):
+    """
+    按 BeautifulSoup ``get_text()`` 的规则拼接元素文本（含子元素和换行）
+
+    :param element: 节点树元素
+    :param references: 已定义的链接引用 ID
+    :return: 元素的纯文本
+    """
+    if element.tag == 'pre':
+        return element.text
+    children = element.children
+    text = element.text
+    if (not text or not text.strip()) and children and children[0].tag in BLOCK_TAGS:
+        parts = ['\n']
+    else:
+        parts = [strip_inline(text, references)]
+    for child in children:
+        parts.append(get_text(child, references))
+        tail = child.tail
+        parts.append('\n' if not tail or not tail.strip() else strip_inline(tail, references))
+    return ''.join(parts)
+
+
+def _iter_list_items(element):
+    """按文档顺序遍历元素下的所有 <li>（包括嵌套列表）"""
+    for child in element.children:
+        if child.tag == 'li':
+            yield child
+        yield from _iter_list_items(child)
+
+
+def build_section_index_from_markdown(md_content):
+    """
+    直接从 Markdown 文本建立“一级标题 -> 节点块列表”的索引
+
+    返回结构与 ``mk_to_json.build_section_index`` 相同。
+
+    :param md_content: Markdown 文本
+    :return: {标题文本: [(标签名, 内容), ...]}
+    """
+    parser = BlockParser()
+    root = parser.parse_document(md_content)
+    refs = parser.references
+    sections = {}
+    current = None
+    for node in root.children:
+        name = node.tag
+        if name == 'h1':
+            header_text = get_text(node, refs).strip()
+            if header_text in sections:
+                current = None  # 重复的标题，忽略其内容
+            else:
+                current = sections[header_text] = []
+        elif current is not None:
+            if name == 'ul':
+                current.append((name, [get_text(li, refs) for li in _iter_list_items(node)]))
+            elif name in ('p', 'h2'):
+                current.append((name, get_text(node, refs)))
+    return sections
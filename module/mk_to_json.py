@@ -1,15 +1,29 @@
+import hashlib
 import logging
-import markdown
 import json
-from bs4 import BeautifulSoup
 import re
 import os
+import tempfile
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+
+from module.md_blocks import build_section_index_from_markdown
 
 # 配置日志记录
 logger = logging.getLogger(__name__)
 
-# 分隔符配置
-SEPARATORS = ['：']
+# 分隔符配置：全角冒号或半角冒号（": " 中的空格在取值时去除）
+SEPARATORS = ['：', ':']
+# 按第一个全角或半角冒号拆分的正则，URL 中的 "://" 不视为分隔符
+_FIELD_SEPARATOR_SPLIT = re.compile(r'：|:(?!//)').split
+
+# 解析引擎：html 为 Markdown -> HTML -> BeautifulSoup，tokens 为直接解析 Markdown 块
+ENGINES = ('html', 'tokens')
+
+# 配置模板缓存：{配置文件路径: (修改时间, 冻结的配置模板)}
+_config_cache = {}
+_config_lock = threading.Lock()
 
 
 def load_config(file_name="config.json"):
@@ -33,6 +47,69 @@ def load_config(file_name="config.json"):
         return None
 
 
+def _freeze(value):
+    """把 JSON 数据转换为只读结构：dict -> MappingProxyType，list -> tuple"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    """把只读结构（或普通的 dict/list）复制为新的可修改 dict/list，相当于一次轻量的深拷贝"""
+    if isinstance(value, (MappingProxyType, dict)):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, (tuple, list)):
+        return [_thaw(item) for item in value]
+    return value
+
+
+def get_config_template(file_name="config.json"):
+    """
+    获取缓存的只读配置模板
+
+    配置文件只在首次调用或修改时间变化时重新读取，返回的模板不可修改，
+    可以在多个线程之间安全共享。
+
+    :param file_name: 配置文件名，默认为 config.json
+    :return: 只读的配置模板，加载失败时返回 None
+    """
+    config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), file_name)
+    try:
+        mtime = os.stat(config_path).st_mtime_ns
+    except OSError:
+        mtime = None
+
+    cached = _config_cache.get(config_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with _config_lock:
+        cached = _config_cache.get(config_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        config = load_config(file_name)
+        if config is None:
+            return None
+        template = _freeze(config)
+        _config_cache[config_path] = (mtime, template)
+        return template
+
+
+def new_config_data(file_name="config.json"):
+    """
+    基于缓存的配置模板生成一份新的、可修改的 JSON 数据结构
+
+    :param file_name: 配置文件名，默认为 config.json
+    :return: 配置模板的副本，加载失败时返回 None
+    """
+    template = get_config_template(file_name)
+    if template is None:
+        return None
+    return _thaw(template)
+
+
 # def read_markdown_file(file_path):
 #     """
 #     从文件中读取 Markdown 内容
@@ -51,462 +128,654 @@ def load_config(file_name="config.json"):
 #         return None
 #
 
-def parse_markdown_to_json(md_content, config):
+def build_section_index(soup):
     """
-    将 Markdown 格式的简历内容解析为 JSON 格式数据
+    单次遍历文档顶层节点，建立“一级标题 -> 节点块列表”的索引
+
+    每个节点块为 (标签名, 内容) 元组：``p``/``h2`` 的内容为文本，
+    ``ul`` 的内容为其中所有 ``<li>`` 的文本（按文档顺序，包含嵌套列表）。
+    同名标题只保留第一次出现的部分。
+
+    :param soup: BeautifulSoup 文档对象
+    :return: {标题文本: [(标签名, 内容), ...]}
+    """
+    sections = {}
+    current = None
+    for node in soup.children:
+        name = node.name
+        if name is None:
+            continue  # 跳过顶层的空白文本
+        if name == 'h1':
+            header_text = node.get_text().strip()
+            if header_text in sections:
+                current = None  # 重复的标题，忽略其内容
+            else:
+                current = sections[header_text] = []
+        elif current is not None:
+            if name == 'ul':
+                current.append((name, [li.get_text() for li in node.find_all('li')]))
+            elif name in ('p', 'h2'):
+                current.append((name, node.get_text()))
+    return sections
+
+
+def _first_block(blocks, tag_name):
+    """返回节点块列表中第一个指定类型的内容，找不到时返回 None"""
+    for name, content in blocks:
+        if name == tag_name:
+            return content
+    return None
+
+
+def _iter_subsections(blocks):
+    """
+    按二级标题切分节点块，依次返回每个 ``<h2>`` 之后、下一个 ``<h2>`` 之前的第一个列表
+
+    :param blocks: 一级标题下的节点块列表
+    :return: 每个二级标题对应的 ``<li>`` 文本列表
+    """
+    li_texts = None
+    in_subsection = False
+    for name, content in blocks:
+        if name == 'h2':
+            if in_subsection and li_texts is not None:
+                yield li_texts
+            in_subsection = True
+            li_texts = None
+        elif name == 'ul' and in_subsection and li_texts is None:
+            li_texts = content
+    if in_subsection and li_texts is not None:
+        yield li_texts
+
+
+def split_field(text):
+    """
+    列表条目的键值分词器：按第一个分隔符拆分为字段名和字段值
+
+    只含全角冒号的条目直接用 str.split，含半角冒号时才使用正则表达式。
+
+    :param text: 列表条目文本
+    :return: (字段名, 字段值)，均已去除首尾空白；没有分隔符时返回 None
+    """
+    parts = _FIELD_SEPARATOR_SPLIT(text, 1) if ':' in text else text.split('：', 1)
+    if len(parts) != 2:
+        return None
+    return parts[0].strip(), parts[1].strip()
+
+
+# 各类部分的解析函数，调用方式为 handler(spec, blocks, data)，只写入 data[spec.key]；
+# 结果总是新建的对象，不修改 data 中原有的字典或列表，传入共享的配置模板也不会被改写
+def parse_scalar(spec, blocks, data):
+    """单值部分：取第一个段落的文本（如姓名、求职意向）"""
+    text = _first_block(blocks, 'p')
+    if text is not None:
+        data[spec.key] = text.strip() if spec.strip else text
+
+
+def parse_key_value(spec, blocks, data):
+    """键值部分：第一个列表中的“字段名：字段值”条目写入同一个字典（如个人信息、技能）"""
+    initial = data.get(spec.key)
+    # 在初始值的副本上填充字段
+    target = dict(initial) if isinstance(initial, dict) else {}
+    for name in spec.line_fields:
+        target[name] = []
+
+    fields = spec.fields
+    for item_text in _first_block(blocks, 'ul') or ():
+        field = split_field(item_text)
+        if field is None:
+            continue
+        name = fields.get(field[0])
+        if name is None:
+            continue
+        if name in spec.line_fields:
+            # 多行内容按行拆分为列表
+            target[name].extend(item.strip() for item in field[1].split("\n"))
+        else:
+            target[name] = field[1]
+    data[spec.key] = target
+
+
+def parse_records(spec, blocks, data):
+    """
+    记录列表部分：每条记录是一个字典
+
+    split 为 field 时，所有条目在同一个列表中，遇到 start_field 字段时开始新记录（如证书）；
+    split 为 subsection 时，每个二级标题下的列表是一条记录（如工作经历、项目经历）。
+    """
+    # 新建列表覆盖初始值
+    records = []
+    if spec.split == 'field':
+        _collect_field_records(spec, _first_block(blocks, 'ul') or (), records)
+    else:
+        for li_items in _iter_subsections(blocks):
+            record = _build_record(spec, li_items)
+            if any(value is not None for value in record.values()):
+                records.append(record)
+    data[spec.key] = records
+
+
+def _collect_field_records(spec, li_items, records):
+    fields = spec.fields
+    current = {}
+    for li_text in li_items:
+        field = split_field(li_text)
+        if field is None:
+            continue
+        name = fields.get(field[0])
+        if name is None:
+            continue
+        # 遇到起始字段说明是一条新记录的开始
+        if name == spec.start_field and current:
+            records.append(current)
+            current = {}
+        current[name] = field[1]
+    if current:
+        records.append(current)
+
+
+def _build_record(spec, li_items):
+    """
+    由一个二级标题下的列表条目构建一条记录
+
+    - 字段条目写入对应字段；list_fields 中的字段开始一个列表，之后没有分隔符的条目归入其中
+      （多个列表字段都已开始时，归入 list_fields 中排在后面的字段）；
+    - 没有列表字段可归入时，第一个没有分隔符的条目开始 overflow 字段，之后的所有条目都归入其中。
+    """
+    fields = spec.fields
+    list_order = spec.list_order
+    record = {}
+    active = None  # 当前接收条目的列表字段
+    overflow = None  # overflow 字段的列表，开始后接收所有条目
+    for li_text in li_items:
+        li_text = li_text.strip()
+        if not li_text:
+            continue  # 跳过空的 <li>
+        if overflow is not None:
+            overflow.append(li_text)
+            continue
+
+        field = split_field(li_text)
+        if field is not None:
+            name = fields.get(field[0])
+            if name is None:
+                continue
+            if name in list_order:
+                record[name] = []
+                if active is None or list_order[name] >= list_order[active]:
+                    active = name
+            else:
+                record[name] = field[1]
+        elif active is not None:
+            record[active].append(li_text)
+        elif spec.overflow:
+            overflow = record[spec.overflow] = [li_text]
+    return record
+
+
+def parse_list(spec, blocks, data):
+    """列表部分：所有段落与列表条目的文本（如荣誉奖项、兴趣爱好）"""
+    items = []
+    for tag_name, content in blocks:
+        if tag_name == 'ul':
+            items.extend(text.strip() for text in content if text.strip())
+        elif tag_name == 'p' and content.strip():
+            items.append(content.strip())
+    data[spec.key] = items
+
+
+# 部分类型与解析函数的对应关系
+SECTION_KINDS = {
+    'scalar': parse_scalar,
+    'key_value': parse_key_value,
+    'records': parse_records,
+    'list': parse_list,
+}
+
+
+class SectionSpec:
+    """编译后的部分定义"""
+    __slots__ = ('key', 'kind', 'headings', 'fields', 'strip', 'line_fields', 'list_order', 'split',
+                 'start_field', 'overflow', 'handler')
+
+    def __init__(self, definition):
+        self.key = definition['key']
+        self.kind = definition['kind']
+        if self.kind not in SECTION_KINDS:
+            raise ValueError(f"部分 {self.key} 的类型无效：{self.kind}，可选值：{', '.join(SECTION_KINDS)}")
+        self.headings = tuple(definition['headings'])
+        self.fields = dict(definition.get('fields', {}))
+        self.strip = definition.get('strip', True)
+        self.line_fields = frozenset(definition.get('line_fields', ()))
+        self.list_order = {name: index for index, name in enumerate(definition.get('list_fields', ()))}
+        self.split = definition.get('split', 'subsection')
+        if self.split not in ('field', 'subsection'):
+            raise ValueError(f"部分 {self.key} 的 split 无效：{self.split}")
+        self.start_field = definition.get('start_field')
+        self.overflow = definition.get('overflow')
+        self.handler = SECTION_KINDS[self.kind]
+
+    def parse(self, blocks, data):
+        """解析该部分的节点块并写入 data[self.key]"""
+        self.handler(self, blocks, data)
+
+
+def _normalize_heading(text):
+    """标题匹配时忽略首尾空白和英文大小写"""
+    return text.strip().casefold()
+
+
+def compile_section_schema(file_name="schema.json"):
+    """
+    读取并编译部分定义
+
+    :param file_name: module 目录下的定义文件名
+    :return: (部分定义元组, {规范化标题: 部分定义})
+    """
+    schema_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), file_name)
+    with open(schema_path, 'r', encoding='utf-8') as file:
+        definitions = json.load(file)['sections']
+    specs = tuple(SectionSpec(definition) for definition in definitions)
+    dispatch = {}
+    for spec in specs:
+        for heading in spec.headings:
+            dispatch.setdefault(_normalize_heading(heading), spec)
+    return specs, dispatch
+
+
+# 导入时编译一次：解析每个部分只需一次字典查找
+SECTION_SCHEMA, _SECTION_DISPATCH = compile_section_schema()
+
+
+def find_section(header_text):
+    """
+    按一级标题查找部分定义
+
+    :param header_text: 一级标题文本
+    :return: SectionSpec，未定义的标题返回 None
+    """
+    return _SECTION_DISPATCH.get(_normalize_heading(header_text))
+
+
+def build_section_index_from_html(md_content):
+    """
+    将 Markdown 转换为 HTML 并用 BeautifulSoup 建立标题索引
 
     :param md_content: Markdown 格式的简历内容
-    :param config: 配置文件内容（JSON 格式）
-    :return: 解析后的 JSON 数据
+    :return: {标题文本: [(标签名, 内容), ...]}
     """
-    # 将 Markdown 转换为 HTML
+    import markdown
+    from bs4 import BeautifulSoup
+
     html = markdown.markdown(md_content)
     soup = BeautifulSoup(html, 'html.parser')
+    return build_section_index(soup)
 
-    # 初始化 JSON 数据结构，使用 config 作为模板
-    data = config
 
-    # 通用解析函数：解析标题下的内容
-    def parse_section(header_text, target_key, parser_func):
-        """
-        解析指定标题下的内容
+def build_index(md_content, engine='html'):
+    """
+    使用指定的解析引擎建立标题索引
 
-        :param header_text: 标题文本
-        :param target_key: 目标 JSON 键
-        :param parser_func: 解析函数
-        """
+    :param md_content: Markdown 格式的简历内容
+    :param engine: 解析引擎，html 或 tokens
+    :return: {标题文本: [(标签名, 内容), ...]}
+    """
+    if engine == 'tokens':
+        return build_section_index_from_markdown(md_content)
+    if engine == 'html':
+        return build_section_index_from_html(md_content)
+    raise ValueError(f"未知的解析引擎：{engine}，可选值：{', '.join(ENGINES)}")
+
+
+def parse_markdown_to_json(md_content, config, engine='html'):
+    """
+    将 Markdown 格式的简历内容解析为 JSON 格式数据
+
+    文档只遍历一次以建立标题索引，各部分的解析函数直接读取索引中的节点块，
+    解析耗时与文档长度成线性关系。
+
+    :param md_content: Markdown 格式的简历内容
+    :param config: 配置文件内容（JSON 格式），或 get_config_template() 返回的只读模板；不会被修改
+    :param engine: 解析引擎，html（经由 HTML 和 BeautifulSoup）或 tokens（直接解析 Markdown）
+    :return: 新建的 JSON 数据，多个线程可以共用同一份 config 同时调用
+    """
+    sections = build_index(md_content, engine)
+
+    # 以 config 为模板复制一份新的 JSON 数据结构，调用方的 config 保持不变
+    data = _thaw(config)
+    return _parse_sections(sections, data, _SECTION_DISPATCH)
+
+
+def _parse_sections(sections, data, dispatch):
+    """按文档顺序调用各部分的解析函数；多个标题对应同一部分时只使用第一个"""
+    parsed_keys = set()
+    for header_text, blocks in sections.items():
+        spec = dispatch.get(_normalize_heading(header_text))
+        if spec is None or spec.key in parsed_keys:
+            continue
+        parsed_keys.add(spec.key)
         logging.info(f'解析标题下内容:{header_text}')
-        section = soup.find('h1', string=header_text)
-        if section:
-            parser_func(section, target_key)
+        spec.parse(blocks, data)
+    return data
 
-    # 解析姓名
-    def parse_name(section, target_key):
-        """
-        解析姓名信息
 
-        :param section: 姓名部分的 HTML 节点
-        :param target_key: 目标 JSON 键
-        """
-        name_item = section.find_next('p')
-        if name_item:
-            name_text = name_item.get_text()
-            data[target_key] = name_text
+class ResumeParser:
+    """
+    可重入的简历解析器
 
-    # 解析求职意向
-    def parse_job_intention(section, target_key):
-        """
-        解析求职意向信息
+    构造时编译部分定义并取得只读的配置模板，之后不再修改任何状态；每次 parse 都从只读模板
+    复制一份新的数据结构，同一个实例可以在多个线程中同时调用，各次结果互不共享对象：
 
-        :param section: 求职意向部分的 HTML 节点
-        :param target_key: 目标 JSON 键
-        """
-        intention_item = section.find_next('p')
-        if intention_item:
-            data[target_key] = intention_item.get_text().strip()
+        parser = ResumeParser(engine='tokens')
+        data = parser.parse(markdown_content)
 
-    # 解析个人信息
-    def parse_personal_info(section, target_key):
-        """
-        解析个人信息
+    配置文件在构造之后的修改不会影响已有实例，需要时重新创建解析器。
 
-        :param section: 个人信息部分的 HTML 节点
-        :param target_key: 目标 JSON 键
-        """
-        # 键名映射表
-        key_mapping = {
-            "性别": "gender",
-            "民族": "ethnicity",
-            "年龄": "age",
-            "联系方式": "contact",
-            "邮箱": "e_mail",
-            "政治面貌": "face",
-            "国籍": "nationality",
-            "住址": "location",
-            "Linkedin": "linkedin",
-            "Github": "github",
-            "个人博客": "personal_website"
-        }
-        info_items = section.find_next('ul').find_all('li')
-        for item in info_items:
-            item_text = item.get_text()
-            for separator in SEPARATORS:
-                if separator in item_text:
-                    try:
-                        key, value = item_text.split(separator, 1)
-                        key = key.strip()
-                        value = value.strip()
-                        if key in key_mapping:
-                            data["personal_info"][key_mapping[key]] = value
-                        break
-                    except ValueError:
-                        logging.error(f"解析个人信息 {item_text} 时出现格式错误")
-
-    # 解析教育背景
-    def parse_education(section, target_key):
-        """解析教育背景信息"""
-        key_edu = {
-            "学位": "degree",
-            "学校": "school",
-            "专业": "major",
-            "开始时间": "start_date",
-            "结束时间": "end_date",
-            "GPA": "gpa",
-            "主修课程": "courses",
-        }
-        edu_items = section.find_next('ul').find_all('li')
-        for items in edu_items:
-            edu_text = items.get_text()
-            for separator in SEPARATORS:
-                if separator in edu_text:
-                    try:
-                        key, value = edu_text.split(separator, 1)
-                        key = key.strip()
-                        value = value.strip()
-                        if key in key_edu:
-                            data["education"][key_edu[key]] = value
-                    except Exception as e:
-                        logging.error(f"解析教育背景失败：{edu_text} - {str(e)}")
-
-    def parse_skills(section, target_key):
-        """
-        解析技能部分
+    :param schema_file: module 目录下的部分定义文件名
+    :param config_file: module 目录下的输出结构模板文件名
+    :param engine: 默认的解析引擎，html 或 tokens
+    """
 
-        :param section: 技能部分的 HTML 节点
-        :param target_key: 目标 JSON 键
-        """
-        key_skills = {
-            "编程语言": "programming_languages",
-            "工具": "tools",
-            "框架": "frameworks",
-            "数据库": "databases",
-            "软件": "software",
-            "语言": "languages"
-        }
-        # 找到技能部分的<ul>
-        skills_items = section.find_next('ul').find_all('li')
-        for items in skills_items:
-            skill_text = items.get_text()
-            for separator in SEPARATORS:
-                if separator in skill_text:
-                    try:
-                        key, value = skill_text.split(separator, 1)
-                        key = key.strip()
-                        value = value.strip()
-                        if key in key_skills:
-                            data["skills"][key_skills[key]] = value
-                    except Exception as e:
-                        logging.error(f"解析技能失败：{skill_text}－{str(e)}")
-
-    # 证书选择
-    def parse_certificates(section, target_key):
+    def __init__(self, schema_file="schema.json", config_file="config.json", engine='html'):
+        if engine not in ENGINES:
+            raise ValueError(f"未知的解析引擎：{engine}，可选值：{', '.join(ENGINES)}")
+        self.engine = engine
+        if schema_file == "schema.json":
+            self.specs, self._dispatch = SECTION_SCHEMA, _SECTION_DISPATCH
+        else:
+            self.specs, self._dispatch = compile_section_schema(schema_file)
+        self.template = get_config_template(config_file)
+        if self.template is None:
+            raise ValueError(f"配置文件加载失败：{config_file}")
+
+    def find_section(self, header_text):
+        """按一级标题查找部分定义，未定义的标题返回 None"""
+        return self._dispatch.get(_normalize_heading(header_text))
+
+    def parse(self, md_content, engine=None):
         """
-        解析证书部分
+        解析 Markdown 简历
 
-        :param section: 证书部分的 HTML 节点
-        :param target_key: 目标 JSON 键
+        :param md_content: Markdown 格式的简历内容
+        :param engine: 解析引擎，默认使用构造时指定的引擎
+        :return: 新建的 JSON 数据，调用方可以任意修改
         """
-        key_certificates = {
-            "证书名称": "certificate_name",
-            "颁发机构": "issuing_authority",
-            "获得日期": "obtained_date"
-        }
-
-        # 确保 data["certificates"] 是一个列表
-        if "certificates" not in data or not isinstance(data["certificates"], list):
-            data["certificates"] = []
-        # 清空初始值（覆盖初始值）
-        data["certificates"].clear()
-
-        # 初始化一个临时字典来存储当前证书的信息
-        current_cert = {}
-        certificates_items = section.find_next('ul').find_all('li')  # 找到所有 <li>
-
-        for item in certificates_items:
-            cer_text = item.get_text()
-            for separator in SEPARATORS:
-                if separator in cer_text:
-                    try:
-                        key, value = cer_text.split(separator, 1)
-                        key = key.strip()
-                        value = value.strip()
-                        if key in key_certificates:
-                            # 如果当前字段是“证书名称”，说明是一个新的证书的开始
-                            if key == "证书名称" and current_cert:
-                                # 保存当前证书
-                                data["certificates"].append(current_cert)
-                                current_cert = {}
-                            # 添加字段到当前证书
-                            current_cert[key_certificates[key]] = value
-                    except Exception as e:
-                        logging.error(f"解析证书失败：{cer_text} - {str(e)}")
-                    break  # 匹配到一个分隔符后跳出循环
-
-        # 保存最后一个证书
-        if current_cert:
-            data["certificates"].append(current_cert)
-
-    # 解析工作经历
-    def parse_work_experience(section, target_key):
-        """
-        解析工作经历部分
+        sections = build_index(md_content, engine or self.engine)
+        return _parse_sections(sections, _thaw(self.template), self._dispatch)
 
-        :param section: 工作经历部分的 HTML 节点
-        :param target_key: 目标 JSON 键
+    def parse_file(self, md_path, output_path=None, engine=None):
         """
-        key_experience = {
-            "公司名称": "company_name",
-            "职务": "position",
-            "开始时间": "start_date",
-            "结束时间": "end_date",
-            "描述": "description"
-        }
-
-        # 确保 data["work_experience"] 是一个列表
-        if "work_experience" not in data or not isinstance(data["work_experience"], list):
-            data["work_experience"] = []
-
-        # 清空初始值（覆盖初始值）
-        data["work_experience"].clear()
-
-        work_experience_start = soup.find('h1', string="工作经历")
-        if not work_experience_start:
-            logging.error("未找到工作经历部分的起始点")
-            return
-
-        # 找到所有 <h2> 标签，每个 <h2> 代表一个工作经历
-        # 从起始点开始，找到所有 <h2> 标签，每个 <h2> 代表一个工作经历
-        next_node = work_experience_start.find_next_sibling()
-        while next_node and next_node.name != 'h1':
-            if next_node.name == 'h2':
-                new_experience = {}  # 初始化一个空字典来存储当前工作经历的信息
-
-                # 找到 <h2> 标签之后的 <ul>
-                ul = next_node.find_next_sibling('ul')
-                if ul:
-                    li_items = ul.find_all('li')
-                    description_started = False  # 标记描述部分是否开始
-
-                    for li in li_items:
-                        li_text = li.get_text().strip()
-                        if not li_text:
-                            continue  # 跳过空的 <li>
-
-                        if not description_started:
-                            # 尝试解析字段
-                            for separator in SEPARATORS:
-                                if separator in li_text:
-                                    try:
-                                        key, value = li_text.split(separator, 1)
-                                        key = key.strip()
-                                        value = value.strip()
-                                        if key in key_experience:
-                                            new_experience[key_experience[key]] = value
-                                        break  # 匹配到分隔符后跳出循环
-                                    except Exception as e:
-                                        logging.error(f"解析工作经历失败：{li_text} - {str(e)}")
-                            else:
-                                # 如果没有匹配到字段，可能是描述部分的开始
-                                description_started = True
-                                new_experience["description"] = []
-
-                        if description_started:
-                            # 将后续的 <li> 添加到描述部分
-                            new_experience["description"].append(li_text)
-
-                    # 将解析到的工作经历添加到列表中
-                    if any(value is not None for value in new_experience.values()):
-                        data["work_experience"].append(new_experience)
-
-            # 移动到下一个节点
-            next_node = next_node.find_next_sibling()
-
-    # 解析项目经历
-    def parse_Project_experience(section, target_key):
+        读取并解析 Markdown 文件
+
+        :param md_path: Markdown 文件路径
+        :param output_path: 同时保存为 JSON 的路径，为 None 时不保存
+        :param engine: 解析引擎，默认使用构造时指定的引擎
+        :return: 解析后的 JSON 数据
         """
-    解析项目经验部分
-
-    :param soup: BeautifulSoup 对象，包含整个 HTML 文档
-    """
-
-    key_project = {
-        "项目名称": "project_name",
-        "项目描述": "project_description",
-        "技术栈": "tech_stack",
-        "角色": "role",
-        "开始时间": "start_date",
-        "结束时间": "end_date",
-        "成果": "results"
-    }
-
-    # 确保 data["project_experience"] 是一个列表
-    if "project_experience" not in data or not isinstance(data["project_experience"], list):
-        data["project_experience"] = []
-
-    # 清空初始值（覆盖初始值）
-    data["project_experience"].clear()
-
-    # 找到项目经验的起始点
-    project_experience_start = soup.find('h1', string="项目经历")
-    if not project_experience_start:
-        logging.error("未找到项目经验部分的起始点")
-        return
-
-    # 从起始点开始，找到所有 <h2> 标签，每个 <h2> 代表一个项目
-    next_node = project_experience_start.find_next_sibling()
-    while next_node and next_node.name != 'h1':
-        if next_node.name == 'h2':
-            new_project = {}  # 初始化一个空字典来存储当前项目的信息
-
-            # 找到 <h2> 标签之后的 <ul>
-            ul = next_node.find_next_sibling('ul')
-            if ul:
-                li_items = ul.find_all('li')
-                tech_stack_started = False  # 标记技术栈部分是否开始
-                results_started = False  # 标记成果部分是否开始
-
-                for li in li_items:
-                    li_text = li.get_text().strip()
-                    if not li_text:
-                        continue  # 跳过空的 <li>
-
-                    # 尝试解析字段键和字段值
-                    for separator in SEPARATORS:
-                        if separator in li_text:
-                            try:
-                                key, value = li_text.split(separator, 1)
-                                key = key.strip()
-                                value = value.strip()
-                                if key in key_project:
-                                    if key == "技术栈":
-                                        tech_stack_started = True
-                                        new_project[key_project[key]] = []
-                                    elif key == "成果":
-                                        results_started = True
-                                        new_project[key_project[key]] = []
-                                    else:
-                                        new_project[key_project[key]] = value
-                                    break  # 匹配到分隔符后跳出循环
-                            except Exception as e:
-                                logging.error(f"解析项目经验失败：{li_text} - {str(e)}")
-                            break  # 匹配到分隔符后跳出循环
-
-                    # 处理技术栈部分
-                    if tech_stack_started and not results_started:
-                        if separator not in li_text:
-                            new_project["tech_stack"].append(li_text)
-
-                    # 处理成果部分
-                    if results_started:
-                        if separator not in li_text:
-                            new_project["results"].append(li_text)
-
-                # 将解析到的项目经验添加到列表中
-                if any(value is not None for value in new_project.values()):
-                    data["project_experience"].append(new_project)
-
-        # 移动到下一个节点
-        next_node = next_node.find_next_sibling()
-
-        # 解析自我评价
-        # 解析自我评价
-        def parse_self_evaluation(section, target_key):
-            """
-            解析自我评价部分
-
-            :param section: 自我评价部分的 HTML 节点
-            :param target_key: 目标 JSON 键
-            """
-            key_evaluation = {
-                "职业目标": "career_objective",
-                "优势": "strengths",
-                "兴趣": "interests",
-                "描述": "description"
-            }
-            SEPARATORS = [': ', ':', '：']  # 定义可能的分隔符
-
-            # 确保 data["self_evaluation"] 是一个字典
-            if "self_evaluation" not in data or not isinstance(data["self_evaluation"], dict):
-                data["self_evaluation"] = {
-                    "career_objective": None,
-                    "strengths": [],
-                    "description": []
-                }
-
-            # 清空初始值（覆盖初始值）
-            data["self_evaluation"]["career_objective"] = None
-            data["self_evaluation"]["strengths"] = []
-            data["self_evaluation"]["description"] = []
-
-            # 找到自我评价的起始点
-            self_evaluation_start = soup.find('h1', string="自我评价")
-            if not self_evaluation_start:
-                logging.error("未找到自我评价部分的起始点")
+        with open(md_path, 'r', encoding='utf-8') as file:
+            data = self.parse(file.read(), engine)
+        if output_path:
+            save_json_to_file(data, output_path)
+        return data
+
+
+# 带换行符的一行
+_LINE_RE = re.compile(r'[^\n]*\n|[^\n]+')
+# 链接引用定义（[id]: url），在整个文档范围内生效
+_REFERENCE_DEFINITION_RE = re.compile(r'^[ ]{0,3}\[[^\[\]]*\]:', re.MULTILINE)
+
+
+def _is_blank_line(line):
+    """空行或只含空白的行（Markdown 解析前会把这类行视为空行）"""
+    return not line.strip(' \t\r\n')
+
+
+def _iter_section_sources(lines):
+    """
+    按一级标题把逐行输入切分为各部分的源文本
+
+    只在“前一行为空行（或位于文档开头）且以单个 # 开头”的行前切分：这样的行一定是文档顶层的新块，
+    之前的内容不会影响它之后的解析。紧贴在列表、嵌套列表或段落下方的 # 行可能被解析为列表项的一部分，
+    不在这里切分，留在上一个部分中与上下文一起解析，结果与整体解析相同。
+
+    :param lines: 带换行符的行的可迭代对象
+    :return: 各部分源文本的生成器，第一个部分可能是首个一级标题之前的内容
+    """
+    section = []
+    previous_blank = True
+    for line in lines:
+        if previous_blank and line.startswith('#') and not line.startswith('##') and section:
+            yield ''.join(section)
+            section = []
+        section.append(line)
+        previous_blank = _is_blank_line(line)
+    if section:
+        yield ''.join(section)
+
+
+def split_markdown_sections(md_content):
+    """
+    按一级标题切分 Markdown 文本，切分规则见 _iter_section_sources
+
+    :param md_content: Markdown 格式的简历内容
+    :return: 各部分的源文本列表，第一个元素是首个一级标题之前的内容（可能为空）
+    """
+    # 只按 \n 分行：str.splitlines 还会在 \u2028 等字符处分行，而 Markdown 解析不会
+    return list(_iter_section_sources(_LINE_RE.findall(md_content)))
+
+
+class SectionCache:
+    """
+    按内容哈希缓存各部分的解析结果
+
+    键为“解析引擎 + 该部分源文本”的哈希，值为该部分解析出的
+    ((标题, 目标 JSON 键, 只读结果), ...)。配置模板变化时自动清空。
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._template = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, template):
+        with self._lock:
+            if template is not self._template:
+                self._entries.clear()
+                self._template = template
+            fragment = self._entries.get(key)
+            if fragment is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return fragment
+
+    def put(self, key, template, fragment):
+        with self._lock:
+            if template is not self._template:
                 return
+            self._entries[key] = fragment
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_default_section_cache = SectionCache()
+
+
+def _iter_section_values(section_source, template, engine):
+    """
+    解析单个一级标题部分，依次返回 (标题, 目标 JSON 键, 结果)；没有对应定义的标题键与结果为 None
+
+    每个解析函数只写入自己的目标键，因此可以在一份全新的模板副本上单独运行。
+    """
+    for header_text, blocks in build_index(section_source, engine).items():
+        spec = find_section(header_text)
+        if spec is None:
+            yield header_text, None, None
+            continue
+        logging.info(f'解析标题下内容:{header_text}')
+        data = _thaw(template)
+        spec.parse(blocks, data)
+        yield header_text, spec.key, data.get(spec.key)
+
+
+def _parse_section_fragment(section_source, template, engine):
+    """解析单个一级标题部分，返回 ((标题, 目标 JSON 键, 只读结果), ...)"""
+    return tuple((header_text, target_key, _freeze(value))
+                 for header_text, target_key, value in _iter_section_values(section_source, template, engine))
+
+
+def parse_markdown_incremental(md_content, cache=None, engine='tokens'):
+    """
+    增量解析 Markdown 简历：按一级标题切分并计算哈希，未变化的部分直接复用缓存
+
+    适用于实时预览、监视模式等反复解析同一份简历的场景，只有修改过的部分会被重新解析。
 
-            # 从起始点开始，找到后续的 <ul>
-            ul = self_evaluation_start.find_next_sibling('ul')
-            if ul:
-                li_items = ul.find_all('li')
-
-                for li in li_items:
-                    li_text = li.get_text().strip()
-                    if not li_text:
-                        continue  # 跳过空的 <li>
-
-                    # 尝试解析字段键和字段值
-                    for separator in SEPARATORS:
-                        if separator in li_text:
-                            try:
-                                key, value = li_text.split(separator, 1)
-                                key = key.strip()
-                                value = value.strip()
-                                if key in key_evaluation:
-                                    if key == "优势":
-                                        # 提取优势列表
-                                        strengths = [item.strip() for item in value.split("\n")]
-                                        data["self_evaluation"]["strengths"].extend(strengths)
-                                    elif key == "描述":
-                                        # 提取描述列表
-                                        descriptions = [item.strip() for item in value.split("\n")]
-                                        data["self_evaluation"]["description"].extend(descriptions)
-                                    else:
-                                        data["self_evaluation"][key_evaluation[key]] = value
-                                    break  # 匹配到分隔符后跳出循环
-                            except Exception as e:
-                                logging.error(f"解析自我评价失败：{li_text} - {str(e)}")
-                            break  # 匹配到分隔符后跳出循环
-
-    # 调用解析函数
-    parse_section('姓名', 'name', parse_name)
-    parse_section('求职意向', 'job_intention', parse_job_intention)
-    parse_section('个人信息', 'personal_info', parse_personal_info)
-    parse_section('教育背景', 'education', parse_education)
-    parse_section('技能', 'skills', parse_skills)
-    parse_section('证书', 'certificates', parse_certificates)
-    # parse_section('技能证书', 'SC', parse_list_items)
-    parse_section('工作经历', 'work_experience', parse_work_experience)
-    parse_section('项目经历', 'Project_experience', parse_Project_experience)
-    parse_section('自我评价', 'self_evaluation', parse_self_evaluation)
+    :param md_content: Markdown 格式的简历内容
+    :param cache: SectionCache 实例，默认使用模块内共享的缓存
+    :param engine: 解析引擎，html 或 tokens
+    :return: 解析后的 JSON 数据，配置加载失败时返回 None
+    """
+    if cache is None:
+        cache = _default_section_cache
+    template = get_config_template()
+    if template is None:
+        logging.error("配置文件加载失败，无法继续解析")
+        return None
 
+    data = _thaw(template)
+    seen = set()
+    parsed_keys = set()
+    # 链接引用定义作用于整个文档，单独解析某个部分会得到不同的链接文本，这时整体作为一个部分解析
+    if _REFERENCE_DEFINITION_RE.search(md_content):
+        sections = [md_content]
+    else:
+        sections = split_markdown_sections(md_content)
+    for section_source in sections:
+        if not section_source.strip():
+            continue
+        key = hashlib.blake2b(f"{engine}\0{section_source}".encode('utf-8'), digest_size=16).digest()
+        fragment = cache.get(key, template)
+        if fragment is None:
+            fragment = _parse_section_fragment(section_source, template, engine)
+            cache.put(key, template, fragment)
+        for header_text, target_key, value in fragment:
+            # 同名标题只使用第一次出现的部分
+            if header_text in seen:
+                continue
+            seen.add(header_text)
+            if target_key is not None and target_key not in parsed_keys:
+                parsed_keys.add(target_key)
+                data[target_key] = _thaw(value)
     return data
 
 
-def parse_markdown_file_to_json(md_file_path, save_to_file=False, output_file_name="output.json"):
+def iter_markdown_sections(file_obj):
     """
-    解析 Markdown 文件并返回 JSON 数据
+    逐行读取 Markdown，按一级标题切分，每读完一个部分就返回其源文本
 
-    :param md_file_path: Markdown 文件路径
-    :return: 解析后的 JSON 数据
+    切分规则与 split_markdown_sections 相同，内存中只保留当前部分的行。
+
+    :param file_obj: 以文本模式打开的文件对象（或任意可逐行迭代的对象）
+    :return: 各部分源文本的生成器
+    """
+    return _iter_section_sources(file_obj)
+
+
+def _has_reference_definitions(file_obj):
+    """
+    预先扫描一遍文件，检查是否有链接引用定义，扫描后回到原来的位置
+
+    不能回退的输入（管道、标准输入）无法预先扫描，返回 False。
+    """
+    if not (hasattr(file_obj, 'seekable') and file_obj.seekable()):
+        return False
+    position = file_obj.tell()
+    try:
+        return any(_REFERENCE_DEFINITION_RE.match(line) for line in iter(file_obj.readline, ''))
+    finally:
+        file_obj.seek(position)
+
+
+def iter_markdown_stream(file_obj, engine='tokens'):
     """
-    # 加载配置文件
-    config = load_config()
-    if not config:
+    流式解析：逐个部分读取、解析并返回结果，峰值内存取决于最大的部分而不是整个文件
+
+    同名标题、以及对应同一目标键的多个标题只返回第一次出现的部分。
+    链接引用定义作用于整个文档，文件中有引用定义时整体作为一个部分解析；
+    不能回退的输入无法预先检查，其中的引用定义只对所在的部分生效。
+
+    :param file_obj: 以文本模式打开的文件对象
+    :param engine: 解析引擎，html 或 tokens
+    :return: (标题, 目标 JSON 键, 结果) 的生成器，只返回有对应定义的部分
+    """
+    template = get_config_template()
+    if template is None:
+        raise ValueError("配置文件加载失败，无法继续解析")
+    seen = set()
+    parsed_keys = set()
+    if _has_reference_definitions(file_obj):
+        sections = [file_obj.read()]
+    else:
+        sections = iter_markdown_sections(file_obj)
+    for section_source in sections:
+        if not section_source.strip():
+            continue
+        for header_text, target_key, value in _iter_section_values(section_source, template, engine):
+            if header_text in seen:
+                continue
+            seen.add(header_text)
+            if target_key is not None and target_key not in parsed_keys:
+                parsed_keys.add(target_key)
+                yield header_text, target_key, value
+
+
+def parse_markdown_stream(file_obj, engine='tokens'):
+    """
+    流式解析 Markdown 文件对象，返回与 parse_markdown_file_to_json 相同结构的数据
+
+    :param file_obj: 以文本模式打开的文件对象
+    :param engine: 解析引擎，html 或 tokens
+    :return: 解析后的 JSON 数据，配置加载失败时返回 None
+    """
+    template = get_config_template()
+    if template is None:
         logging.error("配置文件加载失败，无法继续解析")
         return None
+    data = _thaw(template)
+    for _, target_key, value in iter_markdown_stream(file_obj, engine):
+        data[target_key] = value
+    return data
+
 
-    # 调用解析函数，传入 Markdown 内容和配置数据
-    json_data = parse_markdown_to_json(md_file_path, config)
+def parse_markdown_file_to_json(md_file_path, save_to_file=False, output_file_name="output.json", engine='html',
+                                section_cache=None):
+    """
+    解析 Markdown 文件并返回 JSON 数据
+
+    :param md_file_path: Markdown 文件路径
+    :param engine: 解析引擎，tokens 跳过 HTML 和 BeautifulSoup，直接解析 Markdown
+    :param section_cache: SectionCache 实例，传入时按部分增量解析，只重新解析变化的部分
+    :return: 解析后的 JSON 数据
+    """
+    if section_cache is not None:
+        json_data = parse_markdown_incremental(md_file_path, cache=section_cache, engine=engine)
+    else:
+        # 缓存的只读配置模板，parse_markdown_to_json 会从中复制一份数据结构
+        config = get_config_template()
+        if not config:
+            logging.error("配置文件加载失败，无法继续解析")
+            return None
+
+        # 调用解析函数，传入 Markdown 内容和配置数据
+        json_data = parse_markdown_to_json(md_file_path, config, engine=engine)
 
     # 如果需要保存到文件，则调用保存函数
     if save_to_file and json_data:
@@ -518,20 +787,35 @@ def save_json_to_file(data, file_name="output.json"):
     """
     将 JSON 数据保存到文件中
 
+    先写入同目录下的临时文件再原子替换，多个线程同时保存同一路径时不会得到内容交错的文件。
+
     :param data: JSON 数据
-    :param file_name: 输出文件名，默认为 output.json
+    :param file_name: 输出路径；只有文件名（如默认的 output.json）时保存到 module 目录
+    :return: 实际保存的路径，失败时返回 None
     """
     try:
-        # 获取当前脚本所在的目录
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        output_path = os.path.join(current_dir, file_name)
-
-        # 将 JSON 数据写入文件
-        with open(output_path, 'w', encoding='utf-8') as file:
-            json.dump(data, file, ensure_ascii=False, indent=4)
+        if os.path.dirname(file_name):
+            output_path = os.path.abspath(file_name)
+        else:
+            # 只有文件名时保存到当前脚本所在的目录
+            output_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), file_name)
+
+        # 将 JSON 数据写入临时文件，完成后替换目标文件
+        fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(output_path)}.", suffix='.tmp',
+                                         dir=os.path.dirname(output_path))
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                json.dump(data, file, ensure_ascii=False, indent=4)
+            os.chmod(temp_path, 0o644)  # mkstemp 创建的文件只有所有者可读写
+            os.replace(temp_path, output_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
         logging.info(f"JSON 数据已成功保存到文件：{output_path}")
+        return output_path
     except Exception as e:
         logging.error(f"保存 JSON 数据到文件失败：{str(e)}")
+        return None
 
 # def main():
 #      # 从文件中读取 Markdown 内容
@@ -0,0 +1,308 @@
+"""
+紧凑的简历数据模型
+
+解析结果默认是嵌套字典，config.json 中的每个字段即使为 null 也会保存一份，
+大量简历常驻内存（去重、检索）时占用很高。这里用带 ``__slots__`` 的类表示简历：
+
+- 只保存有值的字段，未赋值的槽位不占额外空间，读取时返回 None；
+- 原字典的键顺序保存为一个元组，相同顺序的记录共用同一个元组，值为 null 的字段只体现在键顺序中；
+- 列表保存为元组，较短的字符串（性别、公司名称等）会被驻留，相同的值在所有简历之间共享；
+- 与原有字典结构可以快速互相转换，Jinja2 模板仍然使用 to_dict() 的结果：
+
+    resume = Resume.from_dict(parser.parse(markdown_content))
+    resume.personal_info.e_mail
+    html = render_template(template_path, resume.to_dict())
+
+``Resume.from_dict(data).to_dict()`` 与 data 逐键相同（包括键的顺序与值为 null 的字段）。
+"""
+import copy
+import sys
+
+from module.mk_to_json import _thaw, get_config_template
+
+# 不超过该长度的字符串会被驻留
+INTERN_MAX_LENGTH = 32
+
+
+def _compact(value):
+    """list -> tuple，短字符串驻留；dict 原样保留"""
+    if isinstance(value, str):
+        return sys.intern(value) if len(value) <= INTERN_MAX_LENGTH else value
+    if isinstance(value, list):
+        return tuple(_compact(item) for item in value)
+    return value
+
+
+# 键顺序元组的共享表：{键顺序: 同一个元组}
+_key_orders = {}
+
+
+def _shared_keys(keys):
+    """返回共享的键顺序元组，大量相同结构的记录只保存一份"""
+    keys = tuple(sys.intern(key) if isinstance(key, str) else key for key in keys)
+    return _key_orders.setdefault(keys, keys)
+
+
+def _expand(value):
+    """_compact 的逆操作：tuple -> list"""
+    if isinstance(value, tuple):
+        return [_expand(item) for item in value]
+    return value
+
+
+class Record:
+    """
+    只保存有值字段的记录基类
+
+    子类在 FIELDS 中按 config.json 的顺序列出字段名，并把同样的名字写入 ``__slots__``；
+    不在 FIELDS 中的字段（如自定义 schema.json 新增的字段）保存在 extra 中。
+    _keys 为原字典的键顺序，其中没有赋值的字段在 to_dict() 时输出为 None。
+    """
+    __slots__ = ('extra', '_keys')
+    FIELDS = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._FIELD_SET = frozenset(cls.FIELDS)
+
+    def __init__(self, **fields):
+        self._keys = _shared_keys(fields)
+        for name, value in fields.items():
+            if value is not None:
+                self._set(name, _compact(value))
+
+    def __getattr__(self, name):
+        # 只有槽位未赋值时才会调用到这里
+        if name in type(self)._FIELD_SET or name == 'extra':
+            return None
+        if name == '_keys':
+            return ()
+        raise AttributeError(f"{type(self).__name__} 没有字段 {name}")
+
+    def _set(self, name, value):
+        if name in self._FIELD_SET:
+            setattr(self, name, value)
+        else:
+            extra = self.extra
+            if extra is None:
+                extra = self.extra = {}
+            extra[name] = value
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        由字典创建记录，值为 None 的字段不保存
+
+        :param data: 与 config.json 中对应部分结构相同的字典
+        :return: 记录对象
+        """
+        record = cls.__new__(cls)
+        record._keys = _shared_keys(data)
+        for name, value in data.items():
+            if value is not None:
+                record._set(name, _compact(value))
+        return record
+
+    def _get(self, name):
+        if name in self._FIELD_SET:
+            return getattr(self, name)
+        return self.extra.get(name) if self.extra else None
+
+    def to_dict(self):
+        """
+        转换为字典：按原字典的键顺序输出，创建后才赋值的字段追加在末尾
+
+        :return: 新建的字典
+        """
+        data = {name: _expand(self._get(name)) for name in self._keys}
+        for name in self.FIELDS:
+            if name not in data:
+                value = getattr(self, name)
+                if value is not None:
+                    data[name] = _expand(value)
+        if self.extra:
+            for name, value in self.extra.items():
+                if name not in data:
+                    data[name] = _expand(value)
+        return data
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.FIELDS if getattr(self, name) is not None)
+        return f"{type(self).__name__}({fields})"
+
+
+class PersonalInfo(Record):
+    """个人信息"""
+    FIELDS = ('gender', 'ethnicity', 'age', 'contact', 'e_mail', 'face', 'nationality', 'location', 'linkedin',
+              'github', 'personal_website')
+    __slots__ = FIELDS
+
+
+class Education(Record):
+    """教育背景"""
+    FIELDS = ('degree', 'school', 'major', 'start_date', 'end_date', 'gpa', 'courses')
+    __slots__ = FIELDS
+
+
+class Skills(Record):
+    """技能"""
+    FIELDS = ('programming_languages', 'tools', 'frameworks', 'databases', 'software', 'languages')
+    __slots__ = FIELDS
+
+
+class SelfEvaluation(Record):
+    """自我评价"""
+    FIELDS = ('career_objective', 'strengths', 'interests', 'description')
+    __slots__ = FIELDS
+
+
+class Certificate(Record):
+    """一条证书"""
+    FIELDS = ('certificate_name', 'issuing_authority', 'obtained_date')
+    __slots__ = FIELDS
+
+
+class WorkExperience(Record):
+    """一段工作经历"""
+    FIELDS = ('company_name', 'position', 'start_date', 'end_date', 'description', 'achievements', 'content')
+    __slots__ = FIELDS
+
+
+class ProjectExperience(Record):
+    """一段项目经历"""
+    FIELDS = ('project_name', 'project_description', 'tech_stack', 'role', 'start_date', 'end_date', 'results')
+    __slots__ = FIELDS
+
+
+# 键值部分：{JSON 键: 记录类型}
+KEY_VALUE_TYPES = {
+    'personal_info': PersonalInfo,
+    'education': Education,
+    'skills': Skills,
+    'self_evaluation': SelfEvaluation,
+}
+# 记录列表部分：{JSON 键: 记录类型}
+RECORD_TYPES = {
+    'certificates': Certificate,
+    'work_experience': WorkExperience,
+    'project_experience': ProjectExperience,
+}
+
+# (配置模板, 展开后的默认值)，配置文件修改后 get_config_template 返回新的模板对象，缓存随之失效
+_defaults_cache = (None, None)
+
+
+def _config_defaults(template):
+    """展开后的配置默认值，用于判断某个部分是否与默认值相同"""
+    global _defaults_cache
+    cached_template, defaults = _defaults_cache
+    if cached_template is not template:
+        defaults = _thaw(template)
+        _defaults_cache = (template, defaults)
+    return defaults
+
+
+def _section_to_dict(key, value):
+    """Resume 中一个已赋值部分转换为字典结构中的值"""
+    if key in KEY_VALUE_TYPES:
+        return value.to_dict()
+    if key in RECORD_TYPES:
+        return [record.to_dict() for record in value]
+    return _expand(value)
+
+
+class Resume:
+    """
+    一份简历
+
+    未赋值的部分表示 Markdown 中没有对应标题，to_dict() 时输出 config.json 中的默认值；
+    不属于以下任何部分的键（自定义 schema.json 新增的部分）保存在 extra 中；
+    _keys 为原字典的键顺序（所有解析结果通常共用同一个元组）。
+    """
+    SCALARS = ('name', 'job_intention')
+    LISTS = ('honors', 'extracurricular_activities', 'volunteer_experience', 'hobbies')
+    SECTIONS = SCALARS + tuple(KEY_VALUE_TYPES) + tuple(RECORD_TYPES) + LISTS
+    __slots__ = SECTIONS + ('extra', '_keys')
+
+    def __getattr__(self, name):
+        if name in Resume.SECTIONS or name in ('extra', '_keys'):
+            return None
+        raise AttributeError(f"Resume 没有部分 {name}")
+
+    @classmethod
+    def from_dict(cls, data, config_template=None):
+        """
+        由解析结果创建简历对象
+
+        与配置模板默认值相同的部分视为未出现，不保存。
+
+        :param data: parse_markdown_to_json / ResumeParser.parse 的结果
+        :param config_template: 只读配置模板，默认使用 config.json
+        :return: Resume 对象
+        """
+        defaults = _config_defaults(config_template or get_config_template())
+        resume = cls.__new__(cls)
+        resume._keys = _shared_keys(data)
+        for key, value in data.items():
+            if key in defaults and value == defaults[key]:
+                continue
+            record_type = KEY_VALUE_TYPES.get(key)
+            if record_type is not None and isinstance(value, dict):
+                setattr(resume, key, record_type.from_dict(value))
+                continue
+            record_type = RECORD_TYPES.get(key)
+            if record_type is not None and isinstance(value, list) and all(isinstance(item, dict) for item in value):
+                setattr(resume, key, tuple(record_type.from_dict(item) for item in value))
+                continue
+            if key in Resume.SCALARS or key in Resume.LISTS:
+                setattr(resume, key, _compact(value))
+            else:
+                if resume.extra is None:
+                    resume.extra = {}
+                resume.extra[key] = value
+        return resume
+
+    def to_dict(self, config_template=None):
+        """
+        转换为解析结果的字典结构（模板渲染、JSON 导出使用）
+
+        :param config_template: 只读配置模板，默认使用 config.json
+        :return: 新建的字典，可以任意修改
+        """
+        template = config_template or get_config_template()
+        keys = self._keys
+        if keys is None:  # 不是由 from_dict 创建的对象，按配置模板的顺序输出
+            keys = tuple(template)
+        data = {}
+        for key in keys:
+            value = getattr(self, key) if key in Resume.SECTIONS else None
+            if value is not None:
+                data[key] = _section_to_dict(key, value)
+            elif self.extra and key in self.extra:
+                # extra 中保存的是原始值，复制一份，避免调用方修改对象内部状态
+                data[key] = copy.deepcopy(self.extra[key])
+            else:
+                data[key] = _thaw(template.get(key))
+        for key in Resume.SECTIONS:
+            value = getattr(self, key)
+            if value is not None and key not in data:
+                data[key] = _section_to_dict(key, value)
+        if self.extra:
+            for key, value in self.extra.items():
+                if key not in data:
+                    data[key] = copy.deepcopy(value)
+        return data
+
+    def __eq__(self, other):
+        if type(other) is not Resume:
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"Resume(name={self.name!r}, job_intention={self.job_intention!r})"
+
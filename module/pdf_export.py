@@ -0,0 +1,267 @@
+"""
+PDF 导出服务
+
+复用少量离屏的 QWebEnginePage，把 HTML 直接从内存加载后打印为 PDF，
+导出任务排队依次执行，不再为每次导出创建新的 QWebEngineView。
+也可以作为命令行工具批量导出整个目录（无需显示器，使用 offscreen 平台）：
+
+    python -m module.pdf_export output -o pdf --pool 2
+
+指定 ``--serve`` 时作为常驻的导出进程：从标准输入逐行读取
+``{"html": HTML 路径, "pdf": PDF 路径}``，每完成一个就向标准输出写一行
+``{"pdf": PDF 路径, "ok": true/false}``，标准输入关闭后退出。
+渲染服务（module.server）用它保持 Chromium 常驻，避免每次导出都重新启动；
+服务提交的 HTML 已经内联全部资源且内容来自客户端，常驻模式下页面不能读取本地文件。
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+from collections import deque
+
+from PyQt5.QtCore import QMarginsF, QObject, QUrl, pyqtSignal
+from PyQt5.QtGui import QPageLayout, QPageSize
+
+
+class _PageSlot:
+    """一个离屏页面及其当前任务"""
+
+    def __init__(self, page):
+        self.page = page
+        self.task = None  # (pdf 路径)
+
+
+class PdfExporter(QObject):
+    """
+    基于离屏页面池的 PDF 导出器，必须在 Qt 主线程中使用
+
+    :param pool_size: 离屏页面数量，即同时进行的导出数
+    :param allow_local_files: 页面是否可以读取本地文件（相对路径的 CSS、图片）；
+        为 False 时忽略 base_url，用于导出已内联全部资源的不可信 HTML
+    """
+    exported = pyqtSignal(str, bool)  # 单个导出完成：PDF 路径，是否成功
+    idle = pyqtSignal()  # 队列中的任务全部完成
+
+    def __init__(self, pool_size=1, parent=None, allow_local_files=True):
+        super().__init__(parent)
+        self.pool_size = max(1, pool_size)
+        self.allow_local_files = allow_local_files
+        self.page_layout = QPageLayout(QPageSize(QPageSize.A4), QPageLayout.Portrait, QMarginsF(0, 0, 0, 0))
+        self._slots = []
+        self._queue = deque()
+
+    def _create_slot(self):
+        from PyQt5.QtWebEngineWidgets import QWebEnginePage, QWebEngineSettings
+
+        slot = _PageSlot(QWebEnginePage(self))
+        if not self.allow_local_files:
+            slot.page.settings().setAttribute(QWebEngineSettings.LocalContentCanAccessFileUrls, False)
+        slot.page.loadFinished.connect(lambda ok, s=slot: self._on_load_finished(s, ok))
+        slot.page.pdfPrintingFinished.connect(lambda path, ok, s=slot: self._on_pdf_finished(s, path, ok))
+        self._slots.append(slot)
+        return slot
+
+    def export_html(self, html_content, pdf_path, base_url=None):
+        """
+        把一段 HTML 加入导出队列
+
+        :param html_content: HTML 字符串
+        :param pdf_path: 输出 PDF 路径
+        :param base_url: 解析相对路径（CSS、图片）所用的基准目录或 QUrl
+        """
+        if base_url is None or not self.allow_local_files:
+            base_url = QUrl()
+        elif not isinstance(base_url, QUrl):
+            base_url = QUrl.fromLocalFile(os.path.abspath(base_url).rstrip("/\\") + "/")
+        self._queue.append((html_content, pdf_path, base_url))
+        self._dispatch()
+
+    def export_file(self, html_path, pdf_path=None):
+        """
+        读取 HTML 文件并加入导出队列，相对路径以 HTML 文件所在目录为基准
+
+        :param html_path: HTML 文件路径
+        :param pdf_path: 输出 PDF 路径，默认与 HTML 同名
+        :return: 输出 PDF 路径
+        """
+        if pdf_path is None:
+            pdf_path = os.path.splitext(html_path)[0] + ".pdf"
+        with open(html_path, 'r', encoding='utf-8') as f:
+            html_content = f.read()
+        self.export_html(html_content, pdf_path, os.path.dirname(os.path.abspath(html_path)))
+        return pdf_path
+
+    def export_directory(self, html_dir, output_dir=None):
+        """
+        导出目录下所有 HTML 文件
+
+        :param html_dir: HTML 文件所在目录
+        :param output_dir: PDF 输出目录，默认与 HTML 相同
+        :return: 加入队列的文件数
+        """
+        names = sorted(name for name in os.listdir(html_dir) if name.endswith('.html'))
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        for name in names:
+            pdf_name = os.path.splitext(name)[0] + ".pdf"
+            self.export_file(os.path.join(html_dir, name), os.path.join(output_dir or html_dir, pdf_name))
+        return len(names)
+
+    def pending_count(self):
+        """排队和进行中的导出数"""
+        return len(self._queue) + sum(1 for slot in self._slots if slot.task is not None)
+
+    def _dispatch(self):
+        while self._queue:
+            slot = next((s for s in self._slots if s.task is None), None)
+            if slot is None:
+                if len(self._slots) >= self.pool_size:
+                    return
+                slot = self._create_slot()
+            html_content, pdf_path, base_url = self._queue.popleft()
+            slot.task = pdf_path
+            slot.page.setHtml(html_content, base_url)
+
+    def _on_load_finished(self, slot, ok):
+        if slot.task is None:
+            return
+        if not ok:
+            logging.error(f"PDF 导出失败，页面加载出错：{slot.task}")
+            self._complete(slot, slot.task, False)
+            return
+        slot.page.printToPdf(slot.task, self.page_layout)
+
+    def _on_pdf_finished(self, slot, path, ok):
+        if ok:
+            logging.info(f"PDF 导出完成：{path}")
+        else:
+            logging.error(f"PDF 导出失败：{path}")
+        self._complete(slot, path, ok)
+
+    def _complete(self, slot, path, ok):
+        slot.task = None
+        self.exported.emit(path, ok)
+        self._dispatch()
+        if self.pending_count() == 0:
+            self.idle.emit()
+
+    def close(self):
+        """释放离屏页面"""
+        self._queue.clear()
+        for slot in self._slots:
+            slot.page.deleteLater()
+        self._slots.clear()
+
+
+def prepare_headless_environment():
+    """没有显示器时使用 offscreen 平台；以 root 运行时关闭 Chromium 沙箱"""
+    if sys.platform.startswith('linux') and not os.environ.get('DISPLAY') and not os.environ.get('WAYLAND_DISPLAY'):
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    if hasattr(os, 'geteuid') and os.geteuid() == 0:
+        os.environ.setdefault('QTWEBENGINE_DISABLE_SANDBOX', '1')
+
+
+class _LineReader(QObject):
+    """在后台线程中逐行读取标准输入，通过信号交给 Qt 主线程处理"""
+    line = pyqtSignal(str)
+    closed = pyqtSignal()
+
+    def start(self, stream):
+        threading.Thread(target=self._run, args=(stream,), name="pdf-stdin", daemon=True).start()
+
+    def _run(self, stream):
+        for line in stream:
+            if line.strip():
+                self.line.emit(line)
+        self.closed.emit()
+
+
+def serve(app, exporter, stdin=sys.stdin, stdout=sys.stdout):
+    """
+    常驻导出：从 stdin 读取任务，完成后向 stdout 写出结果，stdin 关闭且任务全部完成后退出事件循环
+
+    :param app: QApplication 实例
+    :param exporter: PdfExporter 实例
+    """
+    state = {'closed': False}
+
+    def on_line(line):
+        pdf_path = None
+        try:
+            task = json.loads(line)
+            pdf_path = task['pdf']
+            exporter.export_file(task['html'], pdf_path)
+        except (ValueError, KeyError, TypeError, OSError) as e:
+            logging.error(f"无效的导出任务：{line.strip()} - {e}")
+            on_exported(pdf_path, False)
+
+    def on_exported(path, ok):
+        stdout.write(json.dumps({'pdf': path, 'ok': ok}, ensure_ascii=False) + '\n')
+        stdout.flush()
+
+    def on_closed():
+        state['closed'] = True
+        if exporter.pending_count() == 0:
+            app.quit()
+
+    def on_idle():
+        if state['closed']:
+            app.quit()
+
+    reader = _LineReader()
+    reader.line.connect(on_line)
+    reader.closed.connect(on_closed)
+    exporter.exported.connect(on_exported)
+    exporter.idle.connect(on_idle)
+    reader.start(stdin)
+    app.exec_()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="将 HTML 简历批量导出为 PDF")
+    parser.add_argument('inputs', nargs='*', help="HTML 文件或包含 HTML 文件的目录")
+    parser.add_argument('-o', '--output', default=None, help="PDF 输出目录，默认与 HTML 相同")
+    parser.add_argument('--pool', type=int, default=2, help="同时使用的离屏页面数")
+    parser.add_argument('--serve', action='store_true', help="常驻模式：从标准输入读取导出任务（JSON Lines）")
+    args = parser.parse_args(argv)
+    if not args.inputs and not args.serve:
+        parser.error("需要指定 HTML 文件或目录，或者使用 --serve")
+
+    # 常驻模式下标准输出用于返回结果，日志写到标准错误
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', stream=sys.stderr)
+    prepare_headless_environment()
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5 import QtWebEngineWidgets  # noqa: F401  必须在创建 QApplication 之前导入
+
+    app = QApplication(sys.argv[:1])
+    exporter = PdfExporter(pool_size=args.pool, allow_local_files=not args.serve)
+    if args.serve:
+        serve(app, exporter)
+        exporter.close()
+        return 0
+    results = []
+    exporter.exported.connect(lambda path, ok: results.append(ok))
+    exporter.idle.connect(app.quit)
+
+    for item in args.inputs:
+        if os.path.isdir(item):
+            exporter.export_directory(item, args.output)
+        else:
+            pdf_path = None
+            if args.output:
+                os.makedirs(args.output, exist_ok=True)
+                pdf_path = os.path.join(args.output, os.path.splitext(os.path.basename(item))[0] + ".pdf")
+            exporter.export_file(item, pdf_path)
+
+    if exporter.pending_count():
+        app.exec_()
+    exporter.close()
+    failed = results.count(False)
+    print(f"导出完成 {len(results) - failed}/{len(results)} 个 PDF")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
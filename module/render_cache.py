@@ -0,0 +1,221 @@
+"""
+按内容寻址的渲染缓存
+
+缓存键是以下内容的哈希：Markdown 内容、模板源码、模板引用的 CSS、
+config.json、schema.json 以及解析器源码（解析规则变化后旧结果自动失效）。
+每个条目同时保存解析后的 JSON 数据和渲染后的 HTML，输入没有变化时
+可以跳过解析与渲染。磁盘占用超过上限时按最近使用时间淘汰。
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+
+MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+# 默认缓存目录位于项目根目录下
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(MODULE_DIR), '.render_cache')
+# 缓存条目格式变化时修改版本号
+CACHE_VERSION = b'render-cache-1'
+# 影响解析结果的文件：输出结构模板、部分定义与解析器源码
+SCHEMA_FILES = ('config.json', 'schema.json', 'mk_to_json.py', 'md_blocks.py')
+
+_CSS_LINK_RE = re.compile(r'<link\b[^>]*?href\s*=\s*["\']([^"\']+\.css)["\']', re.IGNORECASE)
+
+# {文件路径: (修改时间, 摘要)}，避免每次计算键都重新读取未变化的文件
+_file_digests = {}
+_file_digests_lock = threading.Lock()
+
+
+def _file_digest(path):
+    """文件内容摘要（按修改时间缓存）；文件不存在时返回固定标记"""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return b'missing:' + path.encode('utf-8')
+    with _file_digests_lock:
+        cached = _file_digests.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+    with open(path, 'rb') as f:
+        digest = hashlib.blake2b(f.read(), digest_size=16).digest()
+    with _file_digests_lock:
+        _file_digests[path] = (mtime, digest)
+    return digest
+
+
+def template_dependencies(template_path):
+    """
+    模板及其引用的本地 CSS 文件
+
+    :param template_path: 模板文件路径
+    :return: 文件绝对路径列表，第一个为模板本身
+    """
+    template_path = os.path.abspath(template_path)
+    template_dir = os.path.dirname(template_path)
+    with open(template_path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    paths = [template_path]
+    for href in _CSS_LINK_RE.findall(source):
+        if '://' in href or href.startswith('//'):
+            continue  # 远程样式表不参与计算
+        paths.append(os.path.normpath(os.path.join(template_dir, href)))
+    return paths
+
+
+def make_cache_key(md_content, template_path, engine='html'):
+    """
+    计算缓存键
+
+    :param md_content: Markdown 格式的简历内容
+    :param template_path: 模板文件路径
+    :param engine: 解析引擎
+    :return: 十六进制缓存键
+    """
+    h = hashlib.blake2b(CACHE_VERSION, digest_size=20)
+    h.update(engine.encode('utf-8'))
+    for name in SCHEMA_FILES:
+        h.update(_file_digest(os.path.join(MODULE_DIR, name)))
+    for path in template_dependencies(template_path):
+        h.update(_file_digest(path))
+    h.update(md_content.encode('utf-8'))
+    return h.hexdigest()
+
+
+class RenderCache:
+    """
+    磁盘上的渲染缓存，可在多个线程间共享；多个进程可以共用同一目录
+
+    :param cache_dir: 缓存目录
+    :param max_bytes: 缓存占用的磁盘空间上限
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = None  # {缓存键: 文件大小}，按最近使用排序，首次访问时从磁盘加载
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + '.json')
+
+    def _load_index(self):
+        """扫描缓存目录，按文件修改时间（最近使用时间）建立 LRU 索引"""
+        found = []
+        if os.path.isdir(self.cache_dir):
+            for root, _, names in os.walk(self.cache_dir):
+                for name in names:
+                    if not name.endswith('.json'):
+                        continue
+                    try:
+                        stat = os.stat(os.path.join(root, name))
+                    except OSError:
+                        continue
+                    found.append((stat.st_mtime_ns, name[:-5], stat.st_size))
+        found.sort()
+        self._entries = OrderedDict((key, size) for _, key, size in found)
+        self._total_bytes = sum(size for _, _, size in found)
+
+    def get(self, key):
+        """
+        读取缓存条目
+
+        :param key: 缓存键
+        :return: (解析后的数据, HTML)；未命中时返回 None
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(path)  # 更新最近使用时间，其他进程重新加载索引时同样有效
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+            if self._entries is not None and key in self._entries:
+                self._entries.move_to_end(key)
+        return entry['resume'], entry['html']
+
+    def put(self, key, data, html):
+        """
+        写入缓存条目（先写临时文件再原子替换），超出容量时淘汰最久未使用的条目
+
+        :param key: 缓存键
+        :param data: 解析后的数据
+        :param html: 渲染后的 HTML
+        """
+        path = self._path(key)
+        payload = json.dumps({'resume': data, 'html': html}, ensure_ascii=False, separators=(',', ':'))
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(path))
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(payload)
+                os.replace(temp_path, path)
+            except BaseException:
+                # 淘汰只处理缓存条目，写入失败时留下的临时文件需要在这里删除
+                try:
+                    os.remove(temp_path)
+                except OSError as remove_error:
+                    logging.warning(f"无法删除临时文件：{temp_path} - {remove_error}")
+                raise
+            size = os.path.getsize(path)
+        except (OSError, UnicodeError) as e:
+            logging.error(f"写入渲染缓存失败：{path} - {e}")
+            return
+        with self._lock:
+            if self._entries is None:
+                self._load_index()
+            else:
+                self._total_bytes += size - self._entries.pop(key, 0)
+                self._entries[key] = size
+            self._evict()
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass  # 可能已被其他进程淘汰
+
+    def hit_rate(self):
+        """本实例的缓存命中率"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        """缓存统计信息"""
+        with self._lock:
+            if self._entries is None:
+                self._load_index()
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hit_rate(),
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+            }
+
+    def clear(self):
+        """删除所有缓存条目"""
+        with self._lock:
+            if self._entries is None:
+                self._load_index()
+            for key in list(self._entries):
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
+            self._entries.clear()
+            self._total_bytes = 0
@@ -0,0 +1,121 @@
+"""
+共享的 Jinja2 渲染引擎
+
+编译后的模板按“绝对路径 + 修改时间”缓存，超过容量时淘汰最久未使用的模板；
+可选地把编译结果（字节码）缓存到磁盘，进程重启后也无需重新编译。
+Qt 界面、tk 界面和批量命令行共用同一个引擎实例。
+"""
+import os
+import threading
+from collections import OrderedDict
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+
+class RenderEngine:
+    """带 LRU 缓存的模板渲染引擎，可在多个线程间共享"""
+
+    def __init__(self, max_templates=32, bytecode_cache_dir=None):
+        """
+        :param max_templates: 内存中最多缓存的已编译模板数
+        :param bytecode_cache_dir: 字节码缓存目录，为 None 时不启用磁盘缓存
+        """
+        self.max_templates = max_templates
+        self.bytecode_cache = None
+        if bytecode_cache_dir:
+            os.makedirs(bytecode_cache_dir, exist_ok=True)
+            self.bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+        self._environments = {}
+        self._templates = OrderedDict()  # {模板绝对路径: (修改时间, 模板对象)}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get_environment(self, template_dir):
+        env = self._environments.get(template_dir)
+        if env is None:
+            # 模板缓存由本类统一管理，关闭 Jinja2 自带的缓存和自动重载检查
+            env = Environment(loader=FileSystemLoader(template_dir), cache_size=0, auto_reload=False,
+                              bytecode_cache=self.bytecode_cache)
+            self._environments[template_dir] = env
+        return env
+
+    def get_template(self, template_path):
+        """
+        获取已编译的模板，文件修改后自动重新编译
+
+        :param template_path: 模板文件路径
+        :return: jinja2.Template 对象
+        """
+        path = os.path.abspath(template_path)
+        mtime = os.stat(path).st_mtime_ns
+        with self._lock:
+            cached = self._templates.get(path)
+            if cached is not None and cached[0] == mtime:
+                self._templates.move_to_end(path)
+                self.hits += 1
+                return cached[1]
+
+            self.misses += 1
+            env = self._get_environment(os.path.dirname(path))
+            template = env.get_template(os.path.basename(path))
+            self._templates[path] = (mtime, template)
+            self._templates.move_to_end(path)
+            while len(self._templates) > self.max_templates:
+                self._templates.popitem(last=False)
+            return template
+
+    def render(self, template_path, data):
+        """
+        渲染模板
+
+        :param template_path: 模板文件路径
+        :param data: 模板变量（解析后的简历数据）
+        :return: 渲染后的 HTML 字符串
+        """
+        return self.get_template(template_path).render(data)
+
+    def clear(self):
+        """清空内存中的模板缓存"""
+        with self._lock:
+            self._templates.clear()
+            self._environments.clear()
+
+
+_default_engine = None
+_default_lock = threading.Lock()
+
+
+def get_render_engine():
+    """获取进程内共享的渲染引擎"""
+    global _default_engine
+    if _default_engine is None:
+        with _default_lock:
+            if _default_engine is None:
+                _default_engine = RenderEngine()
+    return _default_engine
+
+
+def configure_render_engine(max_templates=32, bytecode_cache_dir=None):
+    """
+    使用新的参数替换共享的渲染引擎
+
+    :param max_templates: 内存中最多缓存的已编译模板数
+    :param bytecode_cache_dir: 字节码缓存目录
+    :return: 新的渲染引擎
+    """
+    global _default_engine
+    with _default_lock:
+        _default_engine = RenderEngine(max_templates=max_templates, bytecode_cache_dir=bytecode_cache_dir)
+    return _default_engine
+
+
+def render_template(template_path, data):
+    """
+    使用共享引擎渲染模板
+
+    :param template_path: 模板文件路径
+    :param data: 模板变量
+    :return: 渲染后的 HTML 字符串
+    """
+    return get_render_engine().render(template_path, data)
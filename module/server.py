@@ -0,0 +1,478 @@
+"""
+本地常驻渲染服务（HTTP）
+
+进程启动后一直保持配置模板、已编译的 Jinja2 模板和解析器处于加载状态，
+其他系统通过 HTTP 提交 Markdown，直接取回 JSON、HTML 或 PDF，不必每次启动新进程：
+
+    python -m module.server --port 8765 -w 4
+
+    curl --data-binary @测试/测试.md http://127.0.0.1:8765/parse
+    curl --data-binary @测试/测试.md "http://127.0.0.1:8765/render?template=模板1.html&inline=1"
+    curl --data-binary @测试/测试.md "http://127.0.0.1:8765/pdf?template=模板1.html" -o resume.pdf
+    curl http://127.0.0.1:8765/health
+
+接口（请求体均为 UTF-8 编码的 Markdown）：
+
+- ``POST /parse``：返回解析后的 JSON；
+- ``POST /render?template=名称[&inline=1]``：返回 HTML，``inline=1`` 时内联 CSS 与图片；
+- ``POST /pdf?template=名称``：返回 PDF，由常驻的 ``module.pdf_export --serve`` 子进程导出；
+- ``GET /health``：服务状态与请求统计。
+
+``inline=1`` 与 PDF 只内联 static 目录、模板目录与默认照片中的文件，Markdown 中的绝对路径、file: 地址和
+含 .. 的地址会被移除，客户端不能借此读取服务器上的其他文件。
+
+所有接口都可以用 ``engine=html|tokens`` 指定解析引擎。解析与渲染在进程池中执行，
+同时处理的请求数由信号量限制，超出的请求排队等待；模板只能是模板目录中的文件。
+读取请求行、请求头与请求体都有超时（``--read-timeout``），空闲的长连接超时后关闭。
+"""
+import argparse
+import asyncio
+import functools
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from module.batch import REQUIRED_FIELDS, TEMPLATES_DIR, percentile
+from module.mk_to_json import ENGINES, get_config_template, new_config_data, parse_markdown_to_json
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 内联时允许读取的目录与文件（另加模板目录）
+ASSET_ROOTS = (os.path.join(PROJECT_DIR, 'static'), os.path.join(PROJECT_DIR, '封面.jpg'))
+
+# 模板源码中的字符串字面量（不含模板表达式），如 href="../static/css/模板1.css"、'../封面.jpg'
+_TEMPLATE_STRING_RE = re.compile(r'"([^"{}<>]*)"|\'([^\'{}<>]*)\'')
+
+_REASONS = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 408: 'Request Timeout',
+    411: 'Length Required',
+    413: 'Payload Too Large', 422: 'Unprocessable Entity', 500: 'Internal Server Error',
+    503: 'Service Unavailable',
+}
+
+
+class HttpError(Exception):
+    """以指定状态码返回给客户端的错误"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ---- 工作进程 ----
+
+def _init_worker(log_level, templates_dir):
+    """工作进程初始化：加载配置模板并预先编译模板目录中的所有模板"""
+    from module.render_engine import get_render_engine
+
+    logging.basicConfig(level=log_level, format='%(asctime)s - %(levelname)s - %(message)s')
+    logging.getLogger().setLevel(log_level)  # fork 方式启动时会继承服务进程的日志配置
+    get_config_template()
+    for name in os.listdir(templates_dir):
+        if name.endswith('.html'):
+            get_render_engine().get_template(os.path.join(templates_dir, name))
+
+
+def _ping():
+    return os.getpid()
+
+
+def _parse(md_content, engine):
+    config = new_config_data()
+    if not config:
+        raise RuntimeError("配置文件加载失败")
+    return parse_markdown_to_json(md_content, config, engine=engine)
+
+
+@functools.lru_cache(maxsize=64)
+def _template_references(template_path, mtime_ns):
+    """模板源码中写明的地址，内联时允许其中的 ..（模板通过 ../static 引用样式表）"""
+    with open(template_path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    return frozenset(double or single for double, single in _TEMPLATE_STRING_RE.findall(source))
+
+
+def _render(md_content, template_path, engine, inline):
+    """解析、校验并渲染，返回 (解析结果, HTML)；缺少必要字段时抛出 ValueError"""
+    from module.render_engine import render_template
+
+    resume_data = _parse(md_content, engine)
+    for field in REQUIRED_FIELDS:
+        if field not in resume_data:
+            raise ValueError(f"缺失必要字段: {field}")
+    html_content = render_template(template_path, resume_data)
+    if inline:
+        from module.inline_assets import inline_html
+
+        # 渲染结果中的地址可能来自请求，只内联允许目录中的文件，其他本地地址一律移除
+        template_dir = os.path.dirname(template_path)
+        trusted = _template_references(template_path, os.stat(template_path).st_mtime_ns)
+        html_content = inline_html(html_content, template_dir, allowed_roots=ASSET_ROOTS + (template_dir,),
+                                   strict=True, trusted_references=trusted)
+    return resume_data, html_content
+
+
+# ---- PDF 导出子进程 ----
+
+class PdfWorker:
+    """
+    常驻的 PDF 导出子进程（python -m module.pdf_export --serve），首次导出时启动，退出后下次自动重启
+
+    :param pool_size: 子进程中的离屏页面数
+    """
+
+    def __init__(self, pool_size=1):
+        self.pool_size = pool_size
+        self._process = None
+        self._reader = None
+        self._waiters = {}  # {PDF 路径: Future}
+        self._start_lock = asyncio.Lock()
+
+    async def _ensure_started(self):
+        async with self._start_lock:
+            if self._process is not None and self._process.returncode is None:
+                return
+            self._process = await asyncio.create_subprocess_exec(
+                sys.executable, '-m', 'module.pdf_export', '--serve', '--pool', str(self.pool_size),
+                cwd=PROJECT_DIR, stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE)
+            self._reader = asyncio.ensure_future(self._read_results(self._process))
+            logging.info(f"PDF 导出进程已启动（pid {self._process.pid}）")
+
+    async def _read_results(self, process):
+        while True:
+            line = await process.stdout.readline()
+            if not line:
+                break
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue
+            waiter = self._waiters.pop(result.get('pdf'), None)
+            if waiter is not None and not waiter.done():
+                waiter.set_result(bool(result.get('ok')))
+        await process.wait()
+        logging.warning(f"PDF 导出进程已退出（返回码 {process.returncode}）")
+        for waiter in self._waiters.values():
+            if not waiter.done():
+                waiter.set_exception(RuntimeError("PDF 导出进程意外退出"))
+        self._waiters.clear()
+
+    async def export(self, html_path, pdf_path):
+        """
+        导出一个 HTML 文件
+
+        :return: 是否成功
+        """
+        await self._ensure_started()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[pdf_path] = waiter
+        task = json.dumps({'html': html_path, 'pdf': pdf_path}, ensure_ascii=False) + '\n'
+        self._process.stdin.write(task.encode('utf-8'))
+        await self._process.stdin.drain()
+        return await waiter
+
+    async def close(self):
+        if self._process is None or self._process.returncode is not None:
+            return
+        self._process.stdin.close()
+        try:
+            await asyncio.wait_for(self._process.wait(), timeout=10)
+        except asyncio.TimeoutError:
+            self._process.kill()
+        if self._reader is not None:
+            await self._reader
+
+
+# ---- HTTP 服务 ----
+
+class RenderServer:
+    """
+    基于 asyncio 的渲染服务
+
+    :param host: 监听地址，默认只监听本机
+    :param port: 监听端口
+    :param workers: 解析与渲染的工作进程数，默认为 CPU 核数
+    :param max_concurrency: 同时处理的请求数上限，超出的请求排队等待
+    :param engine: 默认的解析引擎
+    :param templates_dir: 模板目录，template 参数只能是其中的文件名
+    :param pdf_pool: PDF 导出进程中的离屏页面数
+    :param max_body: 请求体的最大字节数
+    """
+
+    def __init__(self, host='127.0.0.1', port=8765, workers=None, max_concurrency=64, engine='tokens',
+                 templates_dir=TEMPLATES_DIR, pdf_pool=1, max_body=5 * 1024 * 1024, read_timeout=30.0,
+                 log_level=logging.WARNING):
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.max_concurrency = max_concurrency
+        self.engine = engine
+        self.templates_dir = os.path.abspath(templates_dir)
+        self.max_body = max_body
+        self.read_timeout = read_timeout
+        self.log_level = log_level
+        self.pdf_worker = PdfWorker(pdf_pool)
+        self._executor = None
+        self._server = None
+        self._semaphore = None
+        self._in_flight = 0
+        self._started = None
+        self.requests = 0
+        self.errors = 0
+        self._latencies = []  # 最近的请求耗时（秒）
+
+    async def start(self):
+        """启动进程池并开始监听"""
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                             initargs=(self.log_level, self.templates_dir))
+        # 预先启动所有工作进程，第一个请求不必等待进程创建和模板编译
+        await asyncio.gather(*(self._run(_ping) for _ in range(self.workers)))
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._started = time.time()
+        logging.info(f"渲染服务已启动：http://{self.host}:{self.port}（{self.workers} 个工作进程）")
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.pdf_worker.close()
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    async def _run(self, func, *args):
+        """在进程池中执行 CPU 密集的任务，同时执行的数量受信号量限制"""
+        async with self._semaphore:
+            self._in_flight += 1
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+            finally:
+                self._in_flight -= 1
+
+    # ---- 请求处理 ----
+
+    async def _handle_connection(self, reader, writer):
+        """处理一个连接上的请求，支持 HTTP/1.1 长连接"""
+        try:
+            while True:
+                keep_alive = await self._handle_request(reader, writer)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read(self, awaitable):
+        """带超时的读取，超时抛出 asyncio.TimeoutError"""
+        if not self.read_timeout:
+            return await awaitable
+        return await asyncio.wait_for(awaitable, self.read_timeout)
+
+    async def _handle_request(self, reader, writer):
+        """
+        读取并响应一个请求
+
+        :return: 是否保持连接
+        """
+        # 空闲连接等待请求行超时后直接关闭
+        request_line = await self._read(reader.readline())
+        if not request_line:
+            return False
+        start = time.perf_counter()
+        headers = {}
+        try:
+            while True:
+                line = await self._read(reader.readline())
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+        except asyncio.TimeoutError:
+            await self._respond(writer, 408, *self._error_body("读取请求头超时"), keep_alive=False)
+            return False
+
+        try:
+            # 部分客户端在请求行中直接发送 UTF-8 字符（如中文模板名）
+            method, target, version = request_line.decode('utf-8', errors='replace').split()
+        except ValueError:
+            await self._respond(writer, 400, *self._error_body("无效的请求行"), keep_alive=False)
+            return False
+        keep_alive = (version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close') or \
+            headers.get('connection', '').lower() == 'keep-alive'
+
+        body_read = False
+        try:
+            if 'chunked' in headers.get('transfer-encoding', '').lower():
+                keep_alive = False
+                raise HttpError(411, "不支持分块传输，请提供 Content-Length")
+            content_length = headers.get('content-length', '0') or '0'
+            # 只接受非负的十进制整数；无法确定请求体长度时不能继续读取同一连接上的下一个请求
+            if not (content_length.isascii() and content_length.isdigit()):
+                keep_alive = False
+                raise HttpError(400, f"无效的 Content-Length：{content_length}")
+            length = int(content_length)
+            if length > self.max_body:
+                keep_alive = False  # 不读取请求体，必须关闭连接
+                raise HttpError(413, f"请求体超过上限 {self.max_body} 字节")
+            try:
+                body = await self._read(reader.readexactly(length)) if length else b''
+            except asyncio.TimeoutError:
+                keep_alive = False
+                raise HttpError(408, "读取请求体超时")
+            body_read = True
+            url = urlsplit(target)
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            status, content_type, payload = await self._dispatch(method, unquote(url.path), query, body)
+        except HttpError as e:
+            status, (content_type, payload) = e.status, self._error_body(str(e))
+        except Exception as e:
+            logging.error(f"处理请求出错：{method} {target} - {e}", exc_info=True)
+            status, (content_type, payload) = 500, self._error_body(str(e))
+            if not body_read:
+                keep_alive = False  # 请求体可能没有读完，剩余的字节不能当作下一个请求
+
+        self.requests += 1
+        if status >= 400:
+            self.errors += 1
+        self._latencies.append(time.perf_counter() - start)
+        if len(self._latencies) > 10000:
+            del self._latencies[:5000]
+        await self._respond(writer, status, content_type, payload, keep_alive)
+        return keep_alive
+
+    @staticmethod
+    def _error_body(message):
+        return 'application/json; charset=utf-8', json.dumps({'error': message}, ensure_ascii=False).encode('utf-8')
+
+    @staticmethod
+    async def _respond(writer, status, content_type, payload, keep_alive):
+        head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + payload)
+        await writer.drain()
+
+    def _resolve_template(self, query):
+        name = query.get('template')
+        if not name:
+            raise HttpError(400, "缺少 template 参数")
+        path = os.path.abspath(os.path.join(self.templates_dir, name))
+        if os.path.dirname(path) != self.templates_dir or not os.path.isfile(path):
+            raise HttpError(404, f"模板不存在：{name}")
+        return path
+
+    async def _dispatch(self, method, path, query, body):
+        """
+        按路径分发请求
+
+        :return: (状态码, Content-Type, 响应体)
+        """
+        if path == '/health':
+            return 200, 'application/json; charset=utf-8', json.dumps(self.stats(), ensure_ascii=False).encode('utf-8')
+        if path not in ('/parse', '/render', '/pdf'):
+            raise HttpError(404, f"未知的接口：{path}")
+        if method != 'POST':
+            raise HttpError(405, "请使用 POST 提交 Markdown")
+        engine = query.get('engine', self.engine)
+        if engine not in ENGINES:
+            raise HttpError(400, f"未知的解析引擎：{engine}，可选值：{', '.join(ENGINES)}")
+        try:
+            md_content = body.decode('utf-8')
+        except UnicodeDecodeError:
+            raise HttpError(400, "请求体必须是 UTF-8 编码的 Markdown")
+
+        if path == '/parse':
+            resume_data = await self._run(_parse, md_content, engine)
+            return 200, 'application/json; charset=utf-8', json.dumps(resume_data, ensure_ascii=False).encode('utf-8')
+
+        template_path = self._resolve_template(query)
+        inline = path == '/pdf' or query.get('inline', '0') not in ('', '0', 'false')
+        try:
+            _, html_content = await self._run(_render, md_content, template_path, engine, inline)
+        except ValueError as e:
+            raise HttpError(422, str(e))
+        if path == '/render':
+            return 200, 'text/html; charset=utf-8', html_content.encode('utf-8')
+        return 200, 'application/pdf', await self._export_pdf(html_content)
+
+    async def _export_pdf(self, html_content):
+        """HTML 已内联全部资源，写入临时目录后交给 PDF 导出进程"""
+        with tempfile.TemporaryDirectory(prefix='resume-pdf-') as temp_dir:
+            html_path = os.path.join(temp_dir, 'resume.html')
+            pdf_path = os.path.join(temp_dir, 'resume.pdf')
+            with open(html_path, 'w', encoding='utf-8') as f:
+                f.write(html_content)
+            try:
+                ok = await self.pdf_worker.export(html_path, pdf_path)
+            except RuntimeError as e:
+                raise HttpError(503, str(e))
+            if not ok or not os.path.isfile(pdf_path):
+                raise HttpError(500, "PDF 导出失败")
+            with open(pdf_path, 'rb') as f:
+                return f.read()
+
+    def stats(self):
+        """服务状态与请求统计"""
+        latencies = sorted(self._latencies)
+        return {
+            'status': 'ok',
+            'uptime_seconds': round(time.time() - self._started, 1) if self._started else 0,
+            'workers': self.workers,
+            'max_concurrency': self.max_concurrency,
+            'in_flight': self._in_flight,
+            'requests': self.requests,
+            'errors': self.errors,
+            'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="本地常驻的简历渲染服务（HTTP）")
+    parser.add_argument('--host', default='127.0.0.1', help="监听地址，默认只监听本机")
+    parser.add_argument('--port', type=int, default=8765, help="监听端口")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="解析与渲染的工作进程数，默认为 CPU 核数")
+    parser.add_argument('--max-concurrency', type=int, default=64, help="同时处理的请求数上限")
+    parser.add_argument('--engine', choices=ENGINES, default='tokens', help="默认的 Markdown 解析引擎")
+    parser.add_argument('--templates', default=TEMPLATES_DIR, help="模板目录")
+    parser.add_argument('--pdf-pool', type=int, default=1, help="PDF 导出进程中的离屏页面数")
+    parser.add_argument('--read-timeout', type=float, default=30.0,
+                        help="读取请求的超时时间（秒），空闲的长连接超时后关闭；0 表示不限制")
+    parser.add_argument('-v', '--verbose', action='store_true', help="输出解析过程日志")
+    args = parser.parse_args(argv)
+
+    log_level = logging.INFO if args.verbose else logging.WARNING
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    server = RenderServer(args.host, args.port, workers=args.workers, max_concurrency=args.max_concurrency,
+                          engine=args.engine, templates_dir=args.templates, pdf_pool=args.pdf_pool,
+                          read_timeout=args.read_timeout, log_level=log_level)
+
+    async def run():
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
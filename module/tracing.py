@@ -0,0 +1,182 @@
+"""
+分阶段耗时统计
+
+记录一次生成过程中每个阶段的耗时和内存峰值，生成一行摘要写入日志，
+并把结构化记录追加到 JSONL 指标文件，便于定位“生成很慢”的具体阶段：
+
+    tracer = StageTracer("任务 1", input="resume.md")
+    with tracer.stage("read"):
+        ...
+    tracer.finish()
+
+每个阶段默认记录耗时与进程的常驻内存峰值（``rss_peak_kb``，读取开销可以忽略；Windows 上没有该项）。
+常驻内存峰值只增不减，某个阶段使其上升说明该阶段分配了新的内存。
+
+更精确的 Python 内存分配峰值（``peak_kb``）需要用 ``StageTracer(..., trace_memory=True)`` 显式开启，
+Qt 界面在设置环境变量 ``MKRESUME_TRACE_MEMORY=1`` 时开启：tracemalloc 会拖慢进程中的每一次内存分配，
+不适合常开。内存峰值是整个进程的峰值——tracemalloc 只有一个全局的峰值计数器，
+多个任务并发时各阶段会互相重置、读取对方的峰值，这时的数值只作参考，需要准确数值时应单独运行一个任务。
+"""
+import json
+import logging
+import os
+import threading
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块，不记录常驻内存峰值
+    resource = None
+
+# 默认指标文件位于项目根目录下（与渲染缓存相同），不随启动时的工作目录变化
+METRICS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "metrics.jsonl")
+# 设置为 1 时 Qt 界面开启 tracemalloc 内存峰值统计
+TRACE_MEMORY_ENV = "MKRESUME_TRACE_MEMORY"
+
+_metrics_lock = threading.Lock()
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0  # 正在使用 tracemalloc 的追踪器数量
+_tracemalloc_started = False  # tracemalloc 是否由本模块启动
+
+
+def memory_tracing_enabled():
+    """环境变量 MKRESUME_TRACE_MEMORY 是否要求开启 tracemalloc 内存峰值统计"""
+    return os.environ.get(TRACE_MEMORY_ENV, '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _peak_rss_kb():
+    """进程的常驻内存峰值（KB），无法获取时返回 None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak  # macOS 的单位是字节
+
+
+def _acquire_tracemalloc():
+    """启用 tracemalloc（引用计数，最后一个使用者释放时关闭）"""
+    global _tracemalloc_users, _tracemalloc_started
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_started = True
+        _tracemalloc_users += 1
+
+
+def _release_tracemalloc():
+    """释放 tracemalloc；只关闭由本模块启动的追踪，其他代码（如 -X tracemalloc）启动的保持不变"""
+    global _tracemalloc_users, _tracemalloc_started
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_started:
+            _tracemalloc_started = False
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+
+class StageTracer:
+    """
+    单次生成过程的阶段追踪器
+
+    :param name: 追踪对象的名称，出现在摘要与记录中
+    :param trace_memory: 是否统计内存峰值，默认关闭；开启后整个进程的内存分配都会变慢，
+                         峰值为进程范围的数值，并发任务之间会互相影响
+    :param extra: 附加到结构化记录中的字段
+    """
+
+    def __init__(self, name, trace_memory=False, **extra):
+        self.name = name
+        self.trace_memory = trace_memory
+        self.extra = extra
+        self.stages = []  # [{'stage': 阶段名, 'ms': 耗时, 'rss_peak_kb': 常驻内存峰值, 'peak_kb': 内存峰值}]
+        self.status = None
+        self._started = time.time()
+        self._start = time.perf_counter()
+        self._finished = False
+        if trace_memory:
+            _acquire_tracemalloc()
+
+    @contextmanager
+    def stage(self, stage_name):
+        """统计一个阶段的耗时与内存峰值（进程范围），阶段抛出异常时同样记录"""
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = {'stage': stage_name, 'ms': round((time.perf_counter() - start) * 1000, 3)}
+            rss_peak = _peak_rss_kb()
+            if rss_peak is not None:
+                entry['rss_peak_kb'] = rss_peak
+            if self.trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                entry['peak_kb'] = round(max(0, peak - base) / 1024, 1)
+            self.stages.append(entry)
+
+    def summary(self):
+        """一行阶段耗时摘要"""
+        parts = []
+        for entry in self.stages:
+            text = f"{entry['stage']} {entry['ms']:.1f} ms"
+            if 'peak_kb' in entry:
+                text += f" ({entry['peak_kb'] / 1024:.2f} MB)"
+            elif 'rss_peak_kb' in entry:
+                text += f" (RSS {entry['rss_peak_kb'] / 1024:.0f} MB)"
+            parts.append(text)
+        total = (time.perf_counter() - self._start) * 1000
+        status = f" [{self.status}]" if self.status and self.status != 'ok' else ""
+        return f"{self.name} 耗时 {total:.1f} ms{status}：" + " | ".join(parts)
+
+    def to_record(self):
+        """结构化记录，用于写入指标文件"""
+        record = {
+            'name': self.name,
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self._started)),
+            'status': self.status,
+            'total_ms': round((time.perf_counter() - self._start) * 1000, 3),
+            'stages': self.stages,
+        }
+        record.update(self.extra)
+        return record
+
+    def finish(self, status='ok', metrics_file=METRICS_FILE):
+        """
+        结束追踪：把摘要写入日志，并把记录追加到指标文件
+
+        :param status: 结果状态，如 ok、error、cancelled
+        :param metrics_file: 指标文件路径，为 None 时不写入
+        :return: 结构化记录
+        """
+        if self._finished:
+            return None
+        self._finished = True
+        self.status = status
+        if self.trace_memory:
+            _release_tracemalloc()
+        record = self.to_record()
+        logging.info(self.summary())
+        if metrics_file:
+            append_metrics(record, metrics_file)
+        return record
+
+
+def append_metrics(record, metrics_file=METRICS_FILE):
+    """
+    追加一条记录到 JSONL 指标文件
+
+    :param record: 记录字典
+    :param metrics_file: 指标文件路径
+    """
+    line = json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+    try:
+        directory = os.path.dirname(metrics_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with _metrics_lock, open(metrics_file, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+    except OSError as e:
+        logging.error(f"写入指标文件失败：{metrics_file} - {e}")
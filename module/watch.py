@@ -0,0 +1,264 @@
+"""
+监视模式（命令行，无界面）
+
+定期检查简历目录与模板的修改时间，只重新生成受影响的输出：
+
+- Markdown 文件变化：只重新解析并渲染这一份简历；
+- 模板或其引用的 CSS（如 ``static/css/模板1.css``）变化：所有简历重新渲染，
+  直接复用内存中已解析的 JSON，不重新解析 Markdown。
+
+编辑器保存时往往在短时间内连续写入多次，检测到变化后要等待一段时间
+没有新的变化（防抖）才开始处理。用法示例：
+
+    python -m module.watch 测试 -t 模板1.html -o output
+    python -m module.watch resumes -t templates/模板2.html -o output --interval 1 --debounce 0.5
+    python -m module.watch 测试 -t 模板1.html -o output --inline
+"""
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+
+from module.batch import REQUIRED_FIELDS, _write_if_changed, collect_markdown_files, plan_outputs, resolve_template
+from module.inline_assets import inline_html
+from module.mk_to_json import ENGINES, SectionCache, parse_markdown_file_to_json
+from module.render_cache import template_dependencies
+from module.render_engine import render_template
+
+
+def _stat_signature(path):
+    """文件的 (修改时间, 大小)，文件不存在时返回 None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ResumeWatcher:
+    """
+    简历目录监视器
+
+    依赖关系为：Markdown 文件 -> 解析结果 -> 输出 HTML <- 模板及其 CSS。
+    每轮检查把变化的文件加入脏集合，防抖结束后按依赖顺序处理：
+    先刷新模板依赖，再解析变化的 Markdown，最后渲染所有受影响的简历。
+
+    :param inputs: Markdown 文件所在目录、文件路径或通配符列表
+    :param template_path: 模板文件路径
+    :param output_dir: HTML 输出目录
+    :param engine: 解析引擎
+    :param interval: 检查文件变化的间隔（秒）
+    :param debounce: 最后一次变化之后等待的时间（秒），期间没有新变化才开始处理
+    :param inline: 是否把 CSS 与图片内联到 HTML 中
+    """
+
+    def __init__(self, inputs, template_path, output_dir, engine='tokens', interval=0.5, debounce=0.3,
+                 inline=False):
+        self.inputs = inputs
+        self.template_path = os.path.abspath(template_path)
+        self.output_dir = output_dir
+        self.engine = engine
+        self.interval = interval
+        self.debounce = debounce
+        self.inline = inline
+        self.section_cache = SectionCache()
+        self._signatures = {}  # {文件路径: (修改时间, 大小)}
+        self._template_deps = []  # 模板及其引用的 CSS
+        self._outputs = {}  # {Markdown 路径: 输出 HTML 路径}
+        self._data = {}  # {Markdown 路径: 解析结果}
+        self._dirty_parse = set()
+        self._dirty_render = set()
+        self._template_dirty = False
+        self._last_change = None
+        self._stop = threading.Event()
+
+    def _refresh_template_deps(self):
+        """
+        重新计算模板依赖；模板暂时不可读（被删除、重命名）时记录日志并保留上次的依赖，
+        模板恢复后修改时间变化，会再次触发重新计算
+
+        :return: 是否读取成功
+        """
+        try:
+            self._template_deps = template_dependencies(self.template_path)
+            return True
+        except (OSError, UnicodeError) as e:
+            logging.error(f"读取模板失败，模板恢复后再重新渲染：{self.template_path} - {e}")
+            if not self._template_deps:
+                self._template_deps = [self.template_path]
+            return False
+
+    def _scan(self):
+        """
+        检查一轮文件变化，把受影响的简历加入脏集合
+
+        :return: 本轮是否有变化
+        """
+        md_files = collect_markdown_files(self.inputs)
+        if set(md_files) != set(self._outputs):
+            self._outputs = dict(zip(md_files, plan_outputs(md_files, self.output_dir)))
+        if not self._template_deps:
+            self._refresh_template_deps()
+
+        changed = False
+        current = {}
+        for path in md_files:
+            current[path] = _stat_signature(path)
+            if current[path] != self._signatures.get(path):
+                self._dirty_parse.add(path)
+                changed = True
+        for path in set(self._data) - set(current):
+            # Markdown 文件被删除：丢弃解析结果，已生成的 HTML 保持不变
+            del self._data[path]
+            self._dirty_render.discard(path)
+            logging.info(f"文件已删除：{path}")
+            changed = True
+        for path in self._template_deps:
+            current[path] = _stat_signature(path)
+            if current[path] != self._signatures.get(path):
+                self._template_dirty = True
+                changed = True
+        self._signatures = current
+        if changed:
+            self._last_change = time.monotonic()
+        return changed
+
+    def _parse(self, md_path):
+        """解析一份简历并校验必要字段，失败时返回 None"""
+        try:
+            with open(md_path, 'r', encoding='utf-8') as file:
+                markdown_content = file.read()
+            resume_data = parse_markdown_file_to_json(markdown_content, engine=self.engine,
+                                                      section_cache=self.section_cache)
+            if not resume_data:
+                raise ValueError("解析失败")
+            for field in REQUIRED_FIELDS:
+                if field not in resume_data:
+                    raise ValueError(f"缺失必要字段: {field}")
+            return resume_data
+        except Exception as e:
+            logging.error(f"解析失败：{md_path} - {e}")
+            return None
+
+    def process(self):
+        """
+        按依赖顺序处理脏集合：模板 -> 解析 -> 渲染
+
+        :return: (重新解析的文件数, 重新渲染的文件数)
+        """
+        template_ready = True
+        if self._template_dirty:
+            self._template_dirty = False
+            # 模板中引用的 CSS 可能有增减，重新计算依赖
+            template_ready = self._refresh_template_deps()
+            if template_ready:
+                for path in self._template_deps:
+                    self._signatures.setdefault(path, _stat_signature(path))
+                self._dirty_render.update(self._data)
+                logging.info(f"模板已变化，重新渲染 {len(self._data)} 份简历：{self.template_path}")
+
+        parsed = 0
+        for md_path in sorted(self._dirty_parse):
+            resume_data = self._parse(md_path)
+            parsed += 1
+            if resume_data is None:
+                self._data.pop(md_path, None)
+                self._dirty_render.discard(md_path)
+                continue
+            if resume_data != self._data.get(md_path):
+                self._data[md_path] = resume_data
+                self._dirty_render.add(md_path)
+        self._dirty_parse.clear()
+        if not template_ready:
+            # 模板不可读：Markdown 照常解析，待渲染的简历保留到模板恢复后再处理
+            return parsed, 0
+
+        rendered = 0
+        for md_path in sorted(self._dirty_render):
+            save_path = self._outputs.get(md_path)
+            if save_path is None:
+                continue
+            try:
+                html_content = render_template(self.template_path, self._data[md_path])
+                if self.inline:
+                    html_content = inline_html(html_content, os.path.dirname(self.template_path))
+                _write_if_changed(save_path, html_content)
+                rendered += 1
+                logging.info(f"已生成：{md_path} -> {save_path}")
+            except Exception as e:
+                logging.error(f"渲染失败：{md_path} - {e}")
+        self._dirty_render.clear()
+        return parsed, rendered
+
+    def poll(self):
+        """
+        检查一次文件变化，防抖时间已过时处理脏集合
+
+        :return: 处理时返回 (重新解析的文件数, 重新渲染的文件数)，否则返回 None
+        """
+        self._scan()
+        if self._last_change is None or time.monotonic() - self._last_change < self.debounce:
+            return None
+        self._last_change = None
+        return self.process()
+
+    def run(self, out=sys.stdout):
+        """
+        持续监视直到调用 stop()（或收到 Ctrl+C）
+
+        :param out: 状态信息的输出流
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        # 首轮检查会把所有文件标记为变化，立即完成一次全量生成
+        self._scan()
+        start = time.perf_counter()
+        parsed, rendered = self.process()
+        self._last_change = None
+        print(f"已生成 {rendered}/{len(self._outputs)} 份简历，用时 {time.perf_counter() - start:.2f} s，"
+              f"开始监视（Ctrl+C 退出）", file=out)
+        while not self._stop.wait(self.interval):
+            start = time.perf_counter()
+            result = self.poll()
+            if result is not None:
+                parsed, rendered = result
+                print(f"[{time.strftime('%H:%M:%S')}] 重新解析 {parsed} 份，重新渲染 {rendered} 份，"
+                      f"用时 {(time.perf_counter() - start) * 1000:.1f} ms", file=out)
+
+    def stop(self):
+        """停止监视"""
+        self._stop.set()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="监视 Markdown 简历与模板，变化时自动重新生成 HTML")
+    parser.add_argument('inputs', nargs='+', help="Markdown 文件所在目录、文件路径或通配符")
+    parser.add_argument('-t', '--template', required=True, help="templates/ 下的模板文件名或模板路径")
+    parser.add_argument('-o', '--output', required=True, help="HTML 输出目录")
+    parser.add_argument('--engine', choices=ENGINES, default='tokens', help="Markdown 解析引擎")
+    parser.add_argument('--interval', type=float, default=0.5, help="检查文件变化的间隔（秒）")
+    parser.add_argument('--debounce', type=float, default=0.3, help="最后一次变化后等待多久再处理（秒）")
+    parser.add_argument('--inline', action='store_true', help="将 CSS 与图片内联到 HTML 中，生成可单独分发的文件")
+    parser.add_argument('-v', '--verbose', action='store_true', help="输出解析与生成日志")
+    args = parser.parse_args(argv)
+
+    log_level = logging.INFO if args.verbose else logging.WARNING
+    logging.basicConfig(level=log_level, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    try:
+        template_path = resolve_template(args.template)
+    except FileNotFoundError as e:
+        parser.error(str(e))
+
+    watcher = ResumeWatcher(args.inputs, template_path, args.output, engine=args.engine,
+                            interval=args.interval, debounce=args.debounce, inline=args.inline)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
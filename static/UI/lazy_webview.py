@@ -0,0 +1,52 @@
+import logging
+import time
+
+from PyQt5.QtCore import Qt, QUrl
+from PyQt5.QtWidgets import QLabel, QVBoxLayout, QWidget
+
+
+class LazyWebView(QWidget):
+    """
+    预览区域的占位控件
+
+    QWebEngineView 的创建会初始化 Chromium，是启动过程中最慢的一步；
+    这里先显示一个普通控件，第一次加载页面时才导入 QtWebEngineWidgets 并创建真正的浏览器控件。
+    注意：延迟导入 QtWebEngineWidgets 需要在创建 QApplication 之前设置 Qt.AA_ShareOpenGLContexts。
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._view = None
+        self._layout = QVBoxLayout(self)
+        self._layout.setContentsMargins(0, 0, 0, 0)
+        self._placeholder = QLabel("点击“预览”或开启实时预览后在此显示简历", self)
+        self._placeholder.setAlignment(Qt.AlignCenter)
+        self._layout.addWidget(self._placeholder)
+
+    def is_loaded(self):
+        """浏览器控件是否已经创建"""
+        return self._view is not None
+
+    def view(self):
+        """
+        获取浏览器控件，第一次调用时创建
+
+        :return: QWebEngineView 实例
+        """
+        if self._view is None:
+            start = time.perf_counter()
+            from PyQt5.QtWebEngineWidgets import QWebEngineView
+
+            self._view = QWebEngineView(self)
+            self._layout.removeWidget(self._placeholder)
+            self._placeholder.deleteLater()
+            self._placeholder = None
+            self._layout.addWidget(self._view)
+            logging.info(f"预览组件已加载，用时 {(time.perf_counter() - start) * 1000:.0f} ms")
+        return self._view
+
+    def load(self, url):
+        self.view().load(url)
+
+    def setHtml(self, html, base_url=QUrl()):
+        self.view().setHtml(html, base_url)
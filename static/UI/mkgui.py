@@ -95,7 +95,7 @@ class Ui_Form(object):
         self.groupBox.setObjectName("groupBox")
         self.horizontalLayout_4 = QtWidgets.QHBoxLayout(self.groupBox)
         self.horizontalLayout_4.setObjectName("horizontalLayout_4")
-        self.webview_2 = QtWebEngineWidgets.QWebEngineView(self.groupBox)
+        self.webview_2 = LazyWebView(self.groupBox)
         sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Maximum)
         sizePolicy.setHorizontalStretch(0)
         sizePolicy.setVerticalStretch(8)
@@ -137,4 +137,4 @@ class Ui_Form(object):
         self.groupBox_2.setTitle(_translate("Form", "日志界面"))
 
 
-from PyQt5 import QtWebEngineWidgets
+from static.UI.lazy_webview import LazyWebView
@@ -5,9 +5,8 @@ import tkinter as tk
 from threading import Thread
 from tkinter import filedialog
 
-from jinja2 import Environment, FileSystemLoader
-
 from module.mk_to_json import parse_markdown_file_to_json
+from module.render_engine import render_template
 
 # 配置日志
 logging.basicConfig(
@@ -64,14 +63,8 @@ class ResumeBuilderGUI:
     def generate_html(self, template_path, data):
         """使用Jinja2模板生成HTML内容"""
         try:
-            # 创建模板加载器
-            env = Environment(loader=FileSystemLoader(os.path.dirname(template_path)))
-
-            # 获取模板对象
-            template = env.get_template(os.path.basename(template_path))
-
-            # 渲染模板
-            html_content = template.render(data)
+            # 使用共享的渲染引擎，已编译的模板会被复用
+            html_content = render_template(template_path, data)
 
             return html_content
         except Exception as e: